@@ -1,219 +1,117 @@
 # autoclean_app.py
 import streamlit as st
 import pandas as pd
-import numpy as np
-import re
-import time
-from typing import Tuple
+import io
+import os
+
+from autoclean import detect_column_types, jobs
+from autoclean.cache import CACHE, content_key
+from autoclean.dedupe import DEDUPE_MODES, NEAR_THRESHOLD
+from autoclean.instrument import TRACE_MEMORY, StepProfile
+from autoclean.excel import PREVIEW_ROWS, read_excel_head, sheet_names
+from autoclean.formats import (COMPRESSIONS, INPUT_EXTENSIONS, OUTPUT_FORMATS, export_file, export_name, file_format,
+                               read_table)
+from autoclean.helpers import CATEGORY_MAX_RATIO, DETECT_SAMPLE_N
+from autoclean.parallel import DEFAULT_WORKERS
+from autoclean.plan import STEP_KEYS, build_plan, run_plan
+from autoclean.stream import DEFAULT_CHUNKSIZE, iter_chunks, stream_clean
+
+try:  # Streamlit with deferred downloads: `data` may be a callable, run only when the button is clicked
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    DEFERRED_DOWNLOADS = hasattr(MediaFileManager, "add_deferred")
+except ImportError:
+    DEFERRED_DOWNLOADS = False
 
 # ---------- CONFIG ----------
 SAMPLE_PATH = "/mnt/data/MF Sample data.xlsx"  # sample/demo file (change if needed)
 st.set_page_config(layout="wide", page_title="Safe Auto Data Cleaner")
 
-# ---------- HELPERS ----------
-def clean_colnames(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = (
-        df.columns.str.strip()
-                  .str.lower()
-                  .str.replace(r"[^\w\s]", "", regex=True)
-                  .str.replace(r"\s+", "_", regex=True)
-    )
-    return df
-
-def strip_money_percent_and_units(x: str) -> str:
-    """Remove currency, commas, percent, and simple units like km/h, mph, km, m, hrs, s."""
-    if pd.isna(x):
-        return x
-    s = str(x).strip()
-    # remove currency and commas
-    s = re.sub(r"[₹$,]", "", s)
-    # common units (space or appended) -> remove but keep numeric sign and decimals
-    s = re.sub(r"\b(km/h|kmh|mph|km|m|kwh|kw|rpm|hrs|hr|s|sec|min)\b", "", s, flags=re.I)
-    s = s.replace("—", "").replace("–", "").replace("−", "-")
-    return s.strip()
-
-def looks_like_number_sample(sample_vals: list) -> int:
-    count = 0
-    for v in sample_vals:
-        s = strip_money_percent_and_units(v or "")
-        if re.fullmatch(r"-?\d+(\.\d+)?%?", s):
-            count += 1
-    return count
-
-def looks_like_date_sample(sample_vals: list) -> int:
-    """Simple regex-based date detection (common formats)"""
-    date_patterns = [
-        r"^\d{4}[-/]\d{1,2}[-/]\d{1,2}$",    # 2020-01-05 or 2020/01/05
-        r"^\d{1,2}[-/]\d{1,2}[-/]\d{2,4}$",  # 05-01-2020 or 5/1/20
-        r"^[A-Za-z]{3,9}\s+\d{1,2},\s*\d{4}$",# Jan 5, 2020
-        r"^\d{1,2}\s+[A-Za-z]{3,9}\s+\d{4}$", # 5 Jan 2020
-    ]
-    count = 0
-    for v in sample_vals:
-        s = str(v).strip()
-        for pat in date_patterns:
-            if re.match(pat, s):
-                count += 1
-                break
-        # also check for month names inside value (e.g., "Jan", "January")
-        if any(m in s.lower() for m in ["jan","feb","mar","apr","may","jun","jul","aug","sep","oct","nov","dec"]):
-            count += 1
-    return count
-
-def detect_column_types(df: pd.DataFrame, sample_n: int = 50) -> pd.DataFrame:
-    """Return a dataframe with detected types: 'numeric','date','text' with confidence metrics."""
-    rows = []
-    n_rows = len(df)
-    for col in df.columns:
-        sample = df[col].dropna().astype(str).head(sample_n).tolist()
-        numeric_like = looks_like_number_sample(sample)
-        date_like = looks_like_date_sample(sample)
-        unique_ratio = df[col].nunique(dropna=True) / max(1, n_rows)
-        dtype = str(df[col].dtype)
-        # Heuristics:
-        # - If dtype is numeric -> numeric
-        # - If many numeric_like and low date_like -> numeric
-        # - If many date_like and numeric_like is low -> date
-        # - Else text
-        if np.issubdtype(df[col].dtype, np.number):
-            detected = "numeric"
-        elif date_like >= max(3, len(sample)//10) and date_like > numeric_like:
-            detected = "date"
-        elif numeric_like >= max(3, len(sample)//2) and numeric_like > date_like:
-            detected = "numeric"
-        else:
-            detected = "text"
-        rows.append({
-            "column": col,
-            "dtype_before": dtype,
-            "detected": detected,
-            "numeric_like": numeric_like,
-            "date_like": date_like,
-            "unique_ratio": round(unique_ratio, 3)
-        })
-    return pd.DataFrame(rows)
-
-def auto_numeric(series: pd.Series) -> pd.Series:
-    cleaned = series.astype(str).map(strip_money_percent_and_units)
-    cleaned = cleaned.replace({"nan": None, "None": None, "": None})
-    # remove ending '%' if present
-    cleaned = cleaned.str.replace("%", "", regex=False)
-    return pd.to_numeric(cleaned, errors="coerce")
-
-def safe_convert_numeric(df: pd.DataFrame, cols: list, log: list) -> Tuple[pd.DataFrame, list]:
-    df = df.copy()
-    converted = []
-    for col in cols:
-        before_nonnull = int(df[col].notna().sum())
-        df[col] = auto_numeric(df[col])
-        after_nonnull = int(df[col].notna().sum())
-        converted.append((col, before_nonnull, after_nonnull))
-        log.append(f"Converted '{col}' -> numeric (non-null: {before_nonnull} -> {after_nonnull})")
-    return df, converted
-
-def safe_convert_dates(df: pd.DataFrame, cols: list, log: list) -> Tuple[pd.DataFrame, list]:
-    df = df.copy()
-    converted = []
-    for col in cols:
-        parsed = pd.to_datetime(df[col], errors="coerce", infer_datetime_format=True)
-        non_null = int(parsed.notna().sum())
-        # only keep parsed column if a meaningful number parsed
-        if non_null >= max(3, int(len(df) * 0.05)):  # >=3 or >=5% of rows
-            df[col] = parsed
-            converted.append((col, non_null))
-            log.append(f"Converted '{col}' -> datetime (parsed {non_null} values)")
-        else:
-            log.append(f"Skipped converting '{col}' to datetime (parsed {non_null} out of {len(df)})")
-    return df, converted
-
-def fill_missing(df: pd.DataFrame, numeric_strategy="median", cat_strategy="mode", log: list = None) -> pd.DataFrame:
-    df = df.copy()
-    num_cols = df.select_dtypes(include=np.number).columns
-    cat_cols = df.select_dtypes(include="object").columns
-    for col in num_cols:
-        n_missing = int(df[col].isna().sum())
-        if n_missing:
-            if numeric_strategy == "median":
-                val = df[col].median()
-            elif numeric_strategy == "mean":
-                val = df[col].mean()
-            else:
-                val = 0
-            df[col].fillna(val, inplace=True)
-            if log is not None:
-                log.append(f"Filled {n_missing} missing values in numeric '{col}' with {numeric_strategy}={val}")
-    for col in cat_cols:
-        n_missing = int(df[col].isna().sum())
-        if n_missing:
-            try:
-                val = df[col].mode().iloc[0]
-            except:
-                val = ""
-            df[col].fillna(val, inplace=True)
-            if log is not None:
-                log.append(f"Filled {n_missing} missing values in text '{col}' with mode='{val}'")
-    return df
-
-def remove_duplicates(df: pd.DataFrame, log: list = None) -> Tuple[pd.DataFrame,int]:
-    before = len(df)
-    df = df.drop_duplicates().reset_index(drop=True)
-    removed = before - len(df)
-    if log is not None:
-        log.append(f"Removed {removed} exact duplicate rows")
-    return df, removed
-
-def flag_outliers(df: pd.DataFrame, log: list = None) -> Tuple[pd.DataFrame,list]:
-    df = df.copy()
-    added = []
-    num_cols = df.select_dtypes(include=np.number).columns
-    for col in num_cols:
-        q1 = df[col].quantile(0.25)
-        q3 = df[col].quantile(0.75)
-        iqr = q3 - q1
-        low = q1 - 1.5 * iqr
-        high = q3 + 1.5 * iqr
-        out_col = f"{col}_is_outlier"
-        df[out_col] = ((df[col] < low) | (df[col] > high)).astype(int)
-        added.append(out_col)
-        if log is not None:
-            log.append(f"Flagged outliers in '{col}' -> new column '{out_col}'")
-    return df, added
-
-def standardize_text(df: pd.DataFrame, log: list = None) -> pd.DataFrame:
-    df = df.copy()
-    text_cols = df.select_dtypes(include="object").columns
-    for col in text_cols:
-        before = df[col].dropna().astype(str).head(3).tolist()
-        df[col] = df[col].astype(str).str.strip().str.title()
-        after = df[col].dropna().astype(str).head(3).tolist()
-        if log is not None:
-            log.append(f"Standardized text in '{col}' (sample: {before} -> {after})")
-    return df
-
 # ---------- UI ----------
 st.title("⚠️ Safe Auto Data Cleaner — EV-ready")
 st.markdown("""
-Upload a dataset (CSV / XLSX).  
+Upload a dataset (CSV / XLSX / Parquet / Arrow).  
 This app *detects* column types and lets you **confirm or override** before cleaning — prevents wrong conversions (like speed → datetime).  
 Sample path used for demo: `SAMPLE_PATH = {}`  
 """.format(SAMPLE_PATH))
 
 # Upload / Load
-uploaded_file = st.file_uploader("Upload your file (CSV/XLSX). Leave empty to use sample file for preview.", type=["csv","xlsx"])
-if uploaded_file is None:
+uploaded_file = st.file_uploader("Upload your file (CSV/XLSX/Parquet/Arrow). Leave empty to use sample file for preview.",
+                                 type=INPUT_EXTENSIONS)
+local_path = st.text_input("...or path to a file on the server (for exports too big to upload)").strip()
+stream_mode = st.checkbox("Streaming mode (clean in chunks; memory depends on chunk size, not file size)")
+chunksize = int(st.number_input("Chunk size (rows)", min_value=1_000, value=DEFAULT_CHUNKSIZE, step=10_000,
+                                disabled=not stream_mode))
+arrow_dtypes = st.checkbox("Keep Arrow-backed dtypes (pyarrow)", disabled=stream_mode,
+                           help="Load columns as pandas ArrowDtype instead of NumPy/object (in-memory mode).")
+source = local_path or uploaded_file
+
+def _cached_load(source, mode: str, load):
+    """(frame, data key): parsed once per file content and load mode, then from the result cache
+    on every rerun (override and checkbox changes rerun the whole script)."""
+    data_key = f"{content_key(source)}:{mode}"
+    return CACHE.get_or_compute(("load", data_key), load), data_key
+
+# Excel: pick a sheet; preview and detection read only its first rows, the whole sheet is loaded
+# by the cleaning job when Run is clicked
+load_source = source if source is not None else SAMPLE_PATH
+is_excel = file_format(load_source) == "excel"
+sheet = None
+if is_excel:
+    try:
+        sheets = CACHE.get_or_compute(("sheets", content_key(load_source)), lambda: sheet_names(load_source))
+    except Exception:
+        sheets = []
+    if len(sheets) > 1:
+        sheet = st.selectbox("Sheet", sheets)
+    elif sheets:
+        sheet = sheets[0]
+
+data_key = None     # key of the whole file (the cleaning input)
+sample_key = None   # key of df_raw when it is only the first rows
+full_load = None    # deferred whole-file load, run by the cleaning job
+if stream_mode and source is not None:
+    # only the first chunk is loaded: it drives the preview and type detection
+    try:
+        df_raw, data_key = _cached_load(source, f"stream{chunksize}:{sheet}",
+                                        lambda: next(iter_chunks(source, chunksize, sheet=sheet), pd.DataFrame()))
+        st.info(f"Streaming mode: preview and detection use the first {len(df_raw)} rows.")
+    except Exception as e:
+        st.error(f"Failed to read file: {e}")
+        df_raw = pd.DataFrame()
+elif is_excel:
+    try:
+        df_raw, sample_key = _cached_load(load_source, f"head{PREVIEW_ROWS}:{sheet}",
+                                          lambda: read_excel_head(load_source, PREVIEW_ROWS, sheet))
+        data_key = f"{content_key(load_source)}:{sheet}:arrow{arrow_dtypes:d}"
+        full_load = lambda src: read_table(src, arrow_dtypes=arrow_dtypes, sheet=sheet)
+        if source is None:
+            st.info(f"Using sample dataset at: {SAMPLE_PATH}")
+        st.info(f"Sheet '{sheet}': preview and detection use the first {len(df_raw)} rows; "
+                "the whole sheet is loaded when you run the cleaning.")
+    except Exception as e:
+        df_raw = pd.DataFrame()
+        if source is None:
+            st.warning("No sample found. Upload a dataset to proceed.")
+        else:
+            st.error(f"Failed to read {getattr(source, 'name', source)}: {e}")
+elif local_path:
+    try:
+        df_raw, data_key = _cached_load(local_path, f"arrow{arrow_dtypes:d}",  # Parquet/Arrow paths are memory-mapped
+                                        lambda: read_table(local_path, arrow_dtypes=arrow_dtypes))
+    except Exception as e:
+        st.error(f"Failed to read {local_path}: {e}")
+        df_raw = pd.DataFrame()
+elif uploaded_file is None:
     try:
-        df_raw = pd.read_excel(SAMPLE_PATH)
+        df_raw, data_key = _cached_load(SAMPLE_PATH, "sample", lambda: read_table(SAMPLE_PATH))
         st.info(f"Using sample dataset at: {SAMPLE_PATH}")
     except Exception:
         df_raw = pd.DataFrame()
         st.warning("No sample found. Upload a dataset to proceed.")
 else:
     try:
-        if uploaded_file.name.lower().endswith(".csv"):
-            df_raw = pd.read_csv(uploaded_file)
-        else:
-            df_raw = pd.read_excel(uploaded_file)
+        df_raw, data_key = _cached_load(uploaded_file, f"arrow{arrow_dtypes:d}",
+                                        lambda: read_table(uploaded_file, arrow_dtypes=arrow_dtypes))
     except Exception as e:
         st.error(f"Failed to read uploaded file: {e}")
         df_raw = pd.DataFrame()
@@ -227,7 +125,11 @@ st.dataframe(df_raw.head())
 
 # Detect types
 st.subheader("Detected column types (auto)")
-det_df = detect_column_types(df_raw)
+detect_sample = int(st.number_input("Values checked per column", min_value=50, value=DETECT_SAMPLE_N, step=500,
+                                    help="Type detection looks at this many values spread over the whole "
+                                         "column, not just the first rows."))
+det_df = CACHE.get_or_compute(("detect", sample_key or data_key, detect_sample),
+                              lambda: detect_column_types(df_raw, sample_n=detect_sample))
 # allow user override: radio for each column with default = detected
 st.write("If a column looks misclassified (e.g., 'speed' detected as date), change it below before cleaning.")
 override_cols = {}
@@ -237,7 +139,7 @@ for i, row in det_df.iterrows():
     detected = row['detected']
     cols_ui.append(col)
     override_cols[col] = st.radio(
-        f"Column: {col} (detected: {detected})",
+        f"Column: {col} (detected: {detected}, {row['confidence']:.0%} confidence)",
         options=["auto", "numeric", "date", "text"],
         index=0 if detected=="text" else (1 if detected=="numeric" else 2) if detected=="date" else 0,
         key=f"col_override_{i}",
@@ -245,106 +147,160 @@ for i, row in det_df.iterrows():
     )
 
 # Checkboxes and select all logic (safe session_state pattern)
-checkbox_keys = ["clean_names", "convert_numeric", "convert_dates", "fill_missing", "remove_dupes", "flag_outliers", "standardize_text"]
+checkbox_keys = STEP_KEYS
 for k in checkbox_keys:
     if k not in st.session_state:
         st.session_state[k] = False
 
+def _select_all():
+    # runs before the step checkboxes are instantiated, so their state can still be set
+    if st.session_state["select_all"]:
+        for k in checkbox_keys:
+            st.session_state[k] = True
+
 col_left, col_right = st.columns([1, 3])
 with col_left:
     st.header("Cleaning Steps")
-    sel_all = st.checkbox("Select ALL cleaning steps", key="select_all")
-    st.session_state["clean_names"] = st.checkbox("Clean column names", key="clean_names", value=st.session_state["clean_names"])
-    st.session_state["convert_numeric"] = st.checkbox("Convert numeric-like columns", key="convert_numeric", value=st.session_state["convert_numeric"])
-    st.session_state["convert_dates"] = st.checkbox("Convert date columns", key="convert_dates", value=st.session_state["convert_dates"])
-    st.session_state["fill_missing"] = st.checkbox("Fill missing values", key="fill_missing", value=st.session_state["fill_missing"])
-    st.session_state["remove_dupes"] = st.checkbox("Remove duplicates", key="remove_dupes", value=st.session_state["remove_dupes"])
-    st.session_state["flag_outliers"] = st.checkbox("Flag outliers", key="flag_outliers", value=st.session_state["flag_outliers"])
-    st.session_state["standardize_text"] = st.checkbox("Standardize text columns", key="standardize_text", value=st.session_state["standardize_text"])
-
-    if sel_all:
-        for k in checkbox_keys:
-            st.session_state[k] = True
+    st.checkbox("Select ALL cleaning steps", key="select_all", on_change=_select_all)
+    st.checkbox("Clean column names", key="clean_names")
+    st.checkbox("Convert numeric-like columns", key="convert_numeric")
+    st.checkbox("Convert date columns", key="convert_dates")
+    st.checkbox("Encode low-cardinality text as categories", key="encode_categories")
+    category_ratio = float(st.number_input(
+        "Max unique ratio for categories", min_value=0.0, max_value=1.0, value=CATEGORY_MAX_RATIO, step=0.01,
+        format="%.2f", help="Text columns with at most this many distinct values per row are stored as "
+                            "categories: less memory, and fill/standardize work once per distinct value."))
+    st.checkbox("Fill missing values", key="fill_missing")
+    st.checkbox("Remove duplicates", key="remove_dupes")
+    dedupe_mode = st.selectbox(
+        "Duplicate matching", DEDUPE_MODES,
+        help="exact: identical rows. normalized: text compared trimmed and case-insensitive. "
+             "near: rows with nearly the same text (MinHash similarity at or above the threshold).")
+    near_threshold = NEAR_THRESHOLD
+    if dedupe_mode == "near":
+        near_threshold = float(st.slider("Near-duplicate similarity", min_value=0.5, max_value=1.0,
+                                         value=NEAR_THRESHOLD, step=0.05))
+    st.checkbox("Flag outliers", key="flag_outliers")
+    st.checkbox("Standardize text columns", key="standardize_text")
+    workers = int(st.number_input("Conversion worker processes", min_value=1, max_value=os.cpu_count() or 1,
+                                  value=min(DEFAULT_WORKERS, os.cpu_count() or 1),
+                                  help="Numeric/date columns are converted in parallel across this many processes."))
+    out_format = st.selectbox("Output format", list(OUTPUT_FORMATS),
+                              help="Parquet and Arrow keep the cleaned column types; CSV is re-inferred on load.")
+    compression = st.selectbox("Compression", [None] + [c for c, fmts in COMPRESSIONS.items() if out_format in fmts],
+                               format_func=lambda c: c or "none",
+                               help="CSV downloads become .csv.gz / .csv.zst; Parquet and Arrow compress "
+                                    "inside the file. XLSX is always zip-compressed.")
+    log_timings = st.checkbox("Log step timings", value=True,
+                              help="Adds wall time and rows/s of each stage (each pass when streaming) to the change log.")
+    trace_memory = st.checkbox("Include peak memory (slower)", value=TRACE_MEMORY, disabled=not log_timings,
+                               help="Traces allocations with tracemalloc, which slows the run down; "
+                                    "jobs running at the same time add to each other's peaks.")
 
 with col_right:
     st.header("Preview & Run")
     st.write("Review auto-detection above, set overrides for any column, pick steps on the left, then Run.")
 
+# ---------- JOBS ----------
+# cleaning runs on the shared worker pool; the session only remembers the job ID (also kept in
+# the URL so a browser reload finds the same job)
+def _profile(timing):
+    """None (no timing lines), or a StepProfile; `timing` is None, "time" or "memory"."""
+    return StepProfile(memory=timing == "memory") if timing else None
+
+def _plan_job(source, load, plan, log, data_key, timing, progress):
+    log = list(log)
+    if load is not None:   # Excel: the preview was only the first rows
+        progress(0.0, "Loading the whole sheet...")
+        df = CACHE.get_or_compute(("load", data_key), lambda: load(source))
+    else:
+        df = source
+    # converted columns and finished stages are reused when only later steps changed
+    df_work = run_plan(df, plan, log, progress=progress, cache_key=data_key, profile=_profile(timing))
+    return {"log": log, "df_work": df_work}
+
+def _stream_job(source, steps, plan, chunksize, out_format, compression, timing, sheet, progress, workdir):
+    log = []  # stream_clean derives every log line (names included) from the whole file
+    # in the job's workdir: deleted when the job is replaced by a new run or evicted
+    out_path = os.path.join(workdir, f"cleaned_dataset{export_name(out_format, compression)[0]}")
+    summary = stream_clean(source, out_path, steps, plan["numeric_cols"], plan["date_cols"], log,
+                           chunksize=chunksize, progress=progress, workers=plan["workers"],
+                           category_ratio=plan["category_ratio"], out_format=out_format,
+                           dedupe_mode=plan["dedupe_mode"], near_threshold=plan["near_threshold"],
+                           profile=_profile(timing), sheet=sheet, compression=compression)
+    return {"log": log, "df_work": summary["head"], "out_path": out_path, "out_format": out_format,
+            "compression": compression}
+
 if st.button("🚀 Run Cleaning (with overrides)"):
     log = []
-    df_work = df_raw.copy()
-
-    # 1: Clean column names if requested (do BEFORE mapping overrides to avoid mismatch)
-    if st.session_state["clean_names"]:
-        before_cols = df_work.columns.tolist()
-        df_work = clean_colnames(df_work)
-        after_cols = df_work.columns.tolist()
-        log.append(f"Cleaned column names: {before_cols} -> {after_cols}")
-        # need to remap override keys to cleaned names: recompute det_df and override mapping
-        # Build mapping old->new quickly
-        mapping = dict(zip(before_cols, after_cols))
-        new_override = {}
-        for old_col, choice in override_cols.items():
-            new_col = mapping.get(old_col, old_col)
-            new_override[new_col] = choice
-        override_cols = new_override
-
-    # Determine final lists to convert based on detection + overrides
-    numeric_cols = []
-    date_cols = []
-    text_cols = []
-    for col, choice in override_cols.items():
-        if choice == "auto":
-            # use our initial detection (recompute if names changed)
-            det_row = det_df[det_df['column'] == col]
-            if not det_row.empty:
-                picked = det_row.iloc[0]['detected']
-            else:
-                # fallback: check dtype
-                picked = "numeric" if np.issubdtype(df_work[col].dtype, np.number) else "text"
-            choice_final = picked
-        else:
-            choice_final = choice
-
-        if choice_final == "numeric":
-            numeric_cols.append(col)
-        elif choice_final == "date":
-            date_cols.append(col)
-        else:
-            text_cols.append(col)
-
-    # Simulate processing & show spinner
-    with st.spinner("Cleaning in progress (simulating ~5 seconds)..."):
-        # Convert numeric columns
-        if st.session_state["convert_numeric"] and numeric_cols:
-            df_work, converted = safe_convert_numeric(df_work, numeric_cols, log)
-
-        # Convert dates with safe check
-        if st.session_state["convert_dates"] and date_cols:
-            df_work, date_converted = safe_convert_dates(df_work, date_cols, log)
-
-        # simulate processing time
-        time.sleep(5)
-
-        # Fill missing
-        if st.session_state["fill_missing"]:
-            df_work = fill_missing(df_work, log=log)
-
-        # Remove duplicates
-        removed = 0
-        if st.session_state["remove_dupes"]:
-            df_work, removed = remove_duplicates(df_work, log=log)
-
-        # Flag outliers
-        added_out = []
-        if st.session_state["flag_outliers"]:
-            df_work, added_out = flag_outliers(df_work, log=log)
-
-        # Standardize text
-        if st.session_state["standardize_text"]:
-            df_work = standardize_text(df_work, log=log)
-
-    st.success("Cleaning completed ✅")
+    steps = {k: st.session_state[k] for k in checkbox_keys}
+    timing = ("memory" if trace_memory else "time") if log_timings else None
+    # names, overrides and step choices resolved once; column names are cleaned before overrides are mapped
+    plan = build_plan(df_raw, steps, override_cols, det_df, workers=workers, category_ratio=category_ratio,
+                      dedupe_mode=dedupe_mode, near_threshold=near_threshold)
+    if steps["clean_names"]:
+        before_cols = df_raw.columns.tolist()
+        log.append(f"Cleaned column names: {before_cols} -> {[plan['rename'][c] for c in before_cols]}")
+
+    job_source = local_path or (SAMPLE_PATH if uploaded_file is None else None)
+    if job_source is None and (stream_mode or full_load is not None):
+        # the worker gets its own buffer: the script thread keeps seeking the upload on reruns
+        job_source = io.BytesIO(uploaded_file.getvalue())
+        job_source.name = uploaded_file.name
+    if stream_mode:
+        job_id = jobs.submit(_stream_job, job_source, steps, plan, chunksize, out_format, compression, timing, sheet,
+                             label="streaming", scratch=True)
+    elif full_load is not None:
+        job_id = jobs.submit(_plan_job, job_source, full_load, plan, log, data_key, timing, label="in-memory")
+    else:
+        job_id = jobs.submit(_plan_job, df_raw, None, plan, log, data_key, timing, label="in-memory")
+    previous = st.session_state.get("job_id") or st.query_params.get("job")
+    if previous and previous != job_id:
+        jobs.discard(previous)   # this session's earlier run: its output files are no longer reachable
+    st.session_state["job_id"] = job_id
+    st.query_params["job"] = job_id
+
+job_id = st.session_state.get("job_id") or st.query_params.get("job")
+job = jobs.get_job(job_id) if job_id else None
+
+@st.fragment(run_every=1.0)
+def job_progress(job_id: str):
+    """Polls the job without rerunning the whole page; one full rerun once it finishes."""
+    job = jobs.get_job(job_id)
+    if job is None:
+        return
+    if job.active:
+        st.progress(job.fraction, text=f"Job {job.id} ({job.label}): {job.message}")
+        if st.button("✖ Cancel cleaning", key=f"cancel_{job.id}"):
+            jobs.cancel(job.id)
+    else:
+        st.rerun()
+
+def download_file(label: str, path: str, file_name: str, mime: str):
+    """Download button for a file on disk.
+
+    With deferred downloads the file is read only when the button is clicked (Streamlit then
+    holds that one copy in memory to serve it); older Streamlit reads it on every rerun.
+    """
+    def read() -> bytes:
+        with open(path, "rb") as fh:
+            return fh.read()
+    if DEFERRED_DOWNLOADS:
+        st.download_button(label, read, file_name, mime)
+    else:
+        with open(path, "rb") as fh:
+            st.download_button(label, fh, file_name, mime)
+
+if job is not None and job.active:
+    job_progress(job.id)
+elif job is not None and job.status == "cancelled":
+    st.warning(f"Cleaning job {job.id} was cancelled.")
+elif job is not None and job.status == "failed":
+    st.error(f"Cleaning job {job.id} failed: {job.error}")
+elif job is not None and job.status == "done":
+    log = job.result["log"]
+    df_work = job.result["df_work"]
+    st.success(f"Cleaning completed ✅ (job {job.id}, {job.finished - job.created:.1f}s)")
 
     st.subheader("📝 Change Log (what was done)")
     if log:
@@ -356,6 +312,15 @@ if st.button("🚀 Run Cleaning (with overrides)"):
     st.subheader("Cleaned Data Preview (first 10 rows)")
     st.dataframe(df_work.head(10))
 
-    csv_bytes = df_work.to_csv(index=False).encode("utf-8")
-    st.download_button("📥 Download cleaned CSV", csv_bytes, "cleaned_dataset.csv", "text/csv")
-
+    if "out_path" in job.result:
+        out_path = job.result["out_path"]
+        suffix, mime = export_name(job.result["out_format"], job.result["compression"])
+        st.caption(f"Cleaned file written to: {out_path}")
+        download_file(f"📥 Download cleaned {job.result['out_format']}", out_path, f"cleaned_dataset{suffix}", mime)
+    else:
+        suffix, mime = export_name(out_format, compression)
+        downloads = job.result.setdefault("downloads", {})
+        if (out_format, compression) not in downloads:  # written once per choice, chunk by chunk, into the job's workdir
+            downloads[(out_format, compression)] = export_file(df_work, out_format, compression, dir=job.workdir)
+        download_file(f"📥 Download cleaned {out_format}", downloads[(out_format, compression)],
+                      f"cleaned_dataset{suffix}", mime)
@@ -1,5 +1,17 @@
 import streamlit as st
 import pandas as pd
+import os
+import tempfile
+
+from autoclean.stream import iter_chunks
+from loanscore import (ADVICE, DEFAULT_TENURE, MAX_TENURE, MIN_TENURE, advice_tier, emi, format_stats, interest_rate,
+                       is_eligible, loan_amount, savings_percent, score_file)
+
+try:  # Streamlit with deferred downloads: `data` may be a callable, run only when the button is clicked
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    DEFERRED_DOWNLOADS = hasattr(MediaFileManager, "add_deferred")
+except ImportError:
+    DEFERRED_DOWNLOADS = False
 
 st.set_page_config(page_title="Loan Eligibility App", page_icon="💰", layout="centered")
 
@@ -39,7 +51,7 @@ if st.session_state.expenses:
     st.write("✅ **Expenses Entered:**", st.session_state.expenses)
     Total_exp = sum(st.session_state.expenses)
     Savings = Income - Total_exp
-    remaining_percent = (Savings / Income) * 100 if Income > 0 else 0
+    remaining_percent = float(savings_percent(Income, Total_exp))
 
     st.subheader("📊 Financial Summary")
     col1, col2 = st.columns(2)
@@ -61,11 +73,12 @@ if st.session_state.expenses:
 
     # Motivational / Helpful Messages
     st.subheader("💡 Savings Advice")
-    if remaining_percent > 80:
+    advice = ADVICE[int(advice_tier(remaining_percent))]
+    if advice == "excellent":
         st.success("🔥 Amazing! You save over 80%. Excellent financial discipline!")
-    elif 60 <= remaining_percent <= 80:
+    elif advice == "very good":
         st.success("✅ Very good! You have strong savings habits.")
-    elif 40 <= remaining_percent < 60:
+    elif advice == "decent":
         st.warning("🙂 Decent savings. Try reducing small expenses to increase it.")
     else:
         st.error("⚠️ Savings are low.")
@@ -78,38 +91,62 @@ if st.session_state.expenses:
 
     # Loan eligibility
     st.subheader("📌 Loan Eligibility Status")
-    if remaining_percent <= 40:
+    if not is_eligible(remaining_percent):
         st.error("❌ Not Eligible for loan")
     else:
         st.success("✅ Eligible for Loan")
 
         # Loan amount based on savings %
-        if 40 < remaining_percent <= 60:
-            loan_amount = 40000
-        elif 60 < remaining_percent <= 80:
-            loan_amount = 80000
-        else:
-            loan_amount = 150000
+        approved = int(loan_amount(remaining_percent))
 
         # Tenure Slider
-        tenure = st.slider("⏳ Select Loan Tenure (Months)", 6, 36, 12)
+        tenure = st.slider("⏳ Select Loan Tenure (Months)", MIN_TENURE, MAX_TENURE, DEFAULT_TENURE)
 
         # Interest rate adjustment based on tenure
-        if tenure <= 12:
-            interest = 10
-        elif 12 < tenure <= 24:
-            interest = 11
-        else:
-            interest = 12
-
-        monthly_int_rate = interest / 100 / 12
-        Emi = loan_amount * monthly_int_rate * ((1 + monthly_int_rate)**tenure) / ((1 + monthly_int_rate)**tenure - 1)
+        interest = int(interest_rate(tenure))
+        Emi = float(emi(approved, interest, tenure))
 
         st.subheader("✅ Loan Details")
-        st.write(f"💵 **Approved Loan Amount:** ₹{loan_amount}")
+        st.write(f"💵 **Approved Loan Amount:** ₹{approved}")
         st.write(f"📈 **Interest Rate:** {interest}%")
         st.write(f"⏳ **Tenure:** {tenure} Months")
         st.write(f"🧾 **Estimated EMI:** ₹{round(Emi)} per month")
 
 else:
     st.info("Enter your monthly expenses above to begin.")
+
+# Bulk scoring: same rules over a file of applicants
+st.markdown("---")
+with st.expander("📂 Score an applicants file"):
+    st.write("Columns: `income`, `expenses` (or several `expense_*` columns) and optionally `tenure` in months.")
+    upload = st.file_uploader("Applicants (CSV, Excel or Parquet)", type=["csv", "xlsx", "parquet"])
+    bulk_tenure = st.slider("Tenure for rows without one (Months)", MIN_TENURE, MAX_TENURE, DEFAULT_TENURE)
+    if upload is not None:
+        # scored chunk by chunk into a per-session temp dir, once per upload and tenure (not on every rerun)
+        if "bulk_dir" not in st.session_state:
+            st.session_state.bulk_dir = tempfile.TemporaryDirectory(prefix="loanscore-")   # removed with the session
+        key = (upload.file_id, bulk_tenure)
+        bulk = st.session_state.get("bulk")
+        if bulk is None or bulk["key"] != key:
+            if bulk is not None and bulk["path"] and os.path.exists(bulk["path"]):
+                os.remove(bulk["path"])
+            path = os.path.join(st.session_state.bulk_dir.name, f"scored_{upload.file_id}_{bulk_tenure}.csv")
+            try:
+                with st.spinner("Scoring applicants..."):
+                    bulk = {"key": key, "path": path, "stats": score_file(upload, path, tenure=bulk_tenure), "error": None}
+            except ValueError as e:
+                if os.path.exists(path):
+                    os.remove(path)
+                bulk = {"key": key, "path": None, "stats": None, "error": str(e)}
+            st.session_state.bulk = bulk
+        if bulk["error"]:
+            st.error(bulk["error"])
+        else:
+            st.caption(format_stats(bulk["stats"]))
+            st.dataframe(next(iter_chunks(bulk["path"], 1000), pd.DataFrame()))
+
+            def read_scored(path=bulk["path"]) -> bytes:
+                with open(path, "rb") as fh:
+                    return fh.read()
+            st.download_button("⬇️ Download scored file", read_scored if DEFERRED_DOWNLOADS else read_scored(),
+                               "applicants_scored.csv", "text/csv")
@@ -0,0 +1,31 @@
+"""Safe Auto Data Cleaner: cleaning helpers usable without the Streamlit UI."""
+from .helpers import (
+    DETECT_SAMPLE_N,
+    clean_colnames,
+    strip_money_percent_and_units,
+    strip_money_percent_and_units_series,
+    looks_like_number_sample,
+    looks_like_date_sample,
+    detect_column_types,
+    auto_numeric,
+    safe_convert_numeric,
+    safe_convert_dates,
+    encode_categories,
+    fill_missing,
+    remove_duplicates,
+    flag_outliers,
+    standardize_text,
+)
+from .cache import CACHE, ResultCache, content_key, frame_key
+from .dates import infer_date_format, parse_date_column
+from .instrument import StepProfile
+from .dedupe import DEDUPE_MODES, NEAR_THRESHOLD, Deduplicator, FingerprintSet, MinHashIndex, row_fingerprints
+from .excel import PREVIEW_ROWS, iter_excel_chunks, read_excel, read_excel_head, sheet_names
+from .formats import (COMPRESSIONS, INPUT_EXTENSIONS, OUTPUT_FORMATS, ChunkWriter, export_file, export_name, read_table,
+                      to_bytes, write_table)
+from .stream import DEFAULT_CHUNKSIZE, iter_chunks, infer_schema, sample_rows, stream_clean
+from .plan import STEP_KEYS, build_plan, run_plan
+from . import jobs
+from .parallel import convert_columns
+from .sketches import (APPROX_MIN_ROWS, ColumnSketch, HeavyHitters, HyperLogLog, QuantileSketch, sample_nunique,
+                       sketch_series, stratified_sample)
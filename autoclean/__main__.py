@@ -0,0 +1,7 @@
+# autoclean/__main__.py
+"""`python -m autoclean SPEC.yaml INPUT ...`: see autoclean.cli."""
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,119 @@
+# autoclean/cache.py
+"""Content-keyed, size-bounded result cache shared by every session and job in the process.
+
+Keys are tuples that start with a content hash of the input (`content_key` for a file,
+`frame_key` for a DataFrame) followed by the parameters of the cached work, so a different
+file or different options is simply a different key. Least recently used entries are evicted
+once the cached values exceed MAX_BYTES. Cached values are shared: callers must not modify
+them in place.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# ---------- CONFIG ----------
+MAX_BYTES = int(float(os.environ.get("AUTOCLEAN_CACHE_MB", "512")) * 2**20)
+_HASH_BLOCK = 1 << 20
+
+# ---------- KEYS ----------
+def content_key(source) -> str:
+    """Hash of an upload's / file object's bytes; for a local path, of its name, size and mtime.
+
+    Local files are not re-read on every rerun (they can be far larger than memory); replacing
+    or editing one changes its size or mtime and therefore its key.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(source, str):
+        st = os.stat(source)
+        h.update(f"{os.path.abspath(source)}|{st.st_size}|{st.st_mtime_ns}".encode())
+    elif hasattr(source, "getbuffer"):   # BytesIO / Streamlit UploadedFile: no copy
+        h.update(source.getbuffer())
+    else:
+        source.seek(0)
+        for block in iter(lambda: source.read(_HASH_BLOCK), b""):
+            h.update(block if isinstance(block, bytes) else block.encode())
+        source.seek(0)
+    return h.hexdigest()
+
+def frame_key(df: pd.DataFrame) -> str:
+    """Hash of a DataFrame's values, index, column names and dtypes."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+def _nbytes(obj) -> int:
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(_nbytes(k) + _nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sum(_nbytes(v) for v in obj)
+    return 64 + (len(obj) if isinstance(obj, (str, bytes)) else 0)
+
+# ---------- CACHE ----------
+class ResultCache:
+    """Thread-safe LRU mapping bounded by the estimated memory of its values."""
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (value, size)
+        self._lock = threading.Lock()
+
+    def get(self, key, tally: dict = None):
+        """Cached value or None; counts a hit or miss here and in `tally` (per-run counts)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            outcome = "hits" if entry is not None else "misses"
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        if tally is not None:
+            tally[outcome] = tally.get(outcome, 0) + 1
+        return None if entry is None else entry[0]
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        if size > self.max_bytes:   # would evict everything else for one entry
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def get_or_compute(self, key, fn, tally: dict = None):
+        value = self.get(key, tally)
+        if value is None:
+            value = fn()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def summary(self, tally: dict = None) -> str:
+        """One change-log line: this run's hits/misses (if `tally`) and the cache totals."""
+        run = f"{tally.get('hits', 0)} hits, {tally.get('misses', 0)} misses this run; " if tally is not None else ""
+        return (f"Result cache: {run}{self.hits} hits, {self.misses} misses overall "
+                f"({len(self)} entries, {self.nbytes / 2**20:.1f} MB of {self.max_bytes / 2**20:.0f} MB)")
+
+CACHE = ResultCache()
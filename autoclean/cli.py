@@ -0,0 +1,218 @@
+# autoclean/cli.py
+"""Headless batch cleaning: a YAML spec applied to one file or a directory of files.
+
+    python -m autoclean SPEC.yaml INPUT [--out DIR] [--jobs N] [--pattern GLOB]
+
+INPUT is a file or a directory (every file matching --pattern, default: all CSV / Excel /
+Parquet / Arrow files). Files are cleaned in parallel worker processes, one file per task;
+each writes `<out>/<name><suffix>.<format>[.gz|.zst]` plus `<name><suffix>.log` (the change log), and a
+line with rows and throughput is printed per file. Example spec (every key is optional):
+
+    steps: [clean_names, convert_numeric, convert_dates, fill_missing, remove_dupes]
+    overrides:              # original column name -> auto | numeric | date | text
+      Speed (km/h): numeric
+      Notes: text
+    numeric_strategy: median   # median | mean | zero
+    dedupe_mode: exact         # exact | normalized | near (remove_dupes)
+    near_threshold: 0.9        # near mode: minimum MinHash similarity
+    category_ratio: 0.05       # encode_categories threshold
+    approx: null               # null: sketches only on large inputs; true / false to force
+    detect_sample: 1000        # values per column that type detection looks at, from the whole file
+    convert_workers: 1         # processes per file for column conversion
+    stream: false              # true: chunked streaming (bounded memory)
+    timings: true              # per-stage (per-pass when streaming) time and rows/s in the .log
+    trace_memory: false        # add peak memory to the timings (tracemalloc: slower)
+    chunksize: 100000
+    sheet: null                # Excel: worksheet name (null: the first sheet)
+    output:
+      format: parquet          # csv | parquet | arrow | xlsx
+      compression: null        # null | gzip | zstd (csv: .csv.gz / .csv.zst; parquet / arrow: inside the file)
+      suffix: _clean
+"""
+import argparse
+import fnmatch
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import yaml
+
+from .dedupe import DEDUPE_MODES, NEAR_THRESHOLD
+from .instrument import StepProfile
+from .formats import COMPRESSIONS, INPUT_EXTENSIONS, OUTPUT_FORMATS, export_name, read_table, write_table
+from .helpers import CATEGORY_MAX_RATIO, DETECT_SAMPLE_N, detect_column_types
+from .plan import STEP_KEYS, build_plan, run_plan
+from .stream import DEFAULT_CHUNKSIZE, sample_rows, stream_clean
+
+# ---------- SPEC ----------
+DEFAULT_SPEC = {
+    "steps": [],
+    "overrides": {},
+    "numeric_strategy": "median",
+    "category_ratio": CATEGORY_MAX_RATIO,
+    "dedupe_mode": "exact",
+    "near_threshold": NEAR_THRESHOLD,
+    "approx": None,
+    "detect_sample": DETECT_SAMPLE_N,
+    "convert_workers": 1,
+    "stream": False,
+    "timings": True,
+    "trace_memory": False,
+    "chunksize": DEFAULT_CHUNKSIZE,
+    "sheet": None,
+    "output": {"format": "csv", "compression": None, "suffix": "_clean"},
+}
+_CHOICES = {"numeric_strategy": ("median", "mean", "zero"), "dedupe_mode": tuple(DEDUPE_MODES)}
+_OVERRIDES = ("auto", "numeric", "date", "text")
+
+def load_spec(path: str) -> dict:
+    """Read and validate a YAML spec; missing keys take DEFAULT_SPEC values."""
+    with open(path, encoding="utf-8") as fh:
+        raw = yaml.safe_load(fh) or {}
+    return validate_spec(raw)
+
+def validate_spec(raw: dict) -> dict:
+    unknown = set(raw) - set(DEFAULT_SPEC)
+    if unknown:
+        raise ValueError(f"Unknown spec keys: {sorted(unknown)}; expected {sorted(DEFAULT_SPEC)}")
+    spec = {**DEFAULT_SPEC, **raw, "output": {**DEFAULT_SPEC["output"], **(raw.get("output") or {})}}
+    steps = spec["steps"]
+    if isinstance(steps, dict):   # {step: true/false} is accepted as well as a list
+        steps = [k for k, on in steps.items() if on]
+    bad = [s for s in steps if s not in STEP_KEYS]
+    if bad:
+        raise ValueError(f"Unknown steps {bad}; expected any of {STEP_KEYS}")
+    spec["steps"] = list(steps)
+    bad = {c: v for c, v in (spec["overrides"] or {}).items() if v not in _OVERRIDES}
+    if bad:
+        raise ValueError(f"Bad column overrides {bad}; expected one of {list(_OVERRIDES)}")
+    spec["overrides"] = dict(spec["overrides"] or {})
+    for key, choices in _CHOICES.items():
+        if spec[key] not in choices:
+            raise ValueError(f"{key} must be one of {list(choices)}, got {spec[key]!r}")
+    if not isinstance(spec["detect_sample"], int) or spec["detect_sample"] < 1:
+        raise ValueError(f"detect_sample must be a positive integer, got {spec['detect_sample']!r}")
+    if spec["output"]["format"] not in OUTPUT_FORMATS:
+        raise ValueError(f"output.format must be one of {list(OUTPUT_FORMATS)}")
+    compression = spec["output"]["compression"]
+    if compression is not None and spec["output"]["format"] not in COMPRESSIONS.get(compression, ()):
+        options = [c for c, fmts in COMPRESSIONS.items() if spec["output"]["format"] in fmts]
+        raise ValueError(f"output.compression for {spec['output']['format']} must be null"
+                         + (f" or one of {options}" if options else ""))
+    return spec
+
+# ---------- ONE FILE ----------
+def output_path(path: str, out_dir: str, spec: dict) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    suffix = export_name(spec["output"]["format"], spec["output"]["compression"])[0]
+    return os.path.join(out_dir, f"{stem}{spec['output']['suffix']}{suffix}")
+
+def clean_file(path: str, spec: dict, out_dir: str) -> dict:
+    """Clean one file per `spec` (from validate_spec) into `out_dir`; returns its summary.
+
+    Same pipeline as the app: detection on the data (when streaming, on a reservoir sample of
+    the whole file, one extra read), the spec's overrides on top, one plan, then run_plan or
+    stream_clean.
+    """
+    t0 = time.perf_counter()
+    steps = {k: k in spec["steps"] for k in STEP_KEYS}
+    out_path = output_path(path, out_dir, spec)
+    fmt, compression = spec["output"]["format"], spec["output"]["compression"]
+    log = []
+    profile = StepProfile(memory=bool(spec["trace_memory"])) if spec["timings"] else None
+    if spec["stream"]:
+        df = sample_rows(path, spec["detect_sample"], spec["chunksize"], sheet=spec["sheet"])
+    else:
+        df = read_table(path, sheet=spec["sheet"])
+    det_df = detect_column_types(df, sample_n=spec["detect_sample"])
+    overrides = {c: spec["overrides"].get(c, "auto") for c in df.columns}
+    plan = build_plan(df, steps, overrides, det_df, numeric_strategy=spec["numeric_strategy"],
+                      workers=spec["convert_workers"], approx=spec["approx"],
+                      category_ratio=spec["category_ratio"], dedupe_mode=spec["dedupe_mode"],
+                      near_threshold=spec["near_threshold"])
+    if spec["stream"]:
+        summary = stream_clean(path, out_path, steps, plan["numeric_cols"], plan["date_cols"], log,
+                               chunksize=spec["chunksize"], numeric_strategy=spec["numeric_strategy"],
+                               workers=spec["convert_workers"], approx=spec["approx"],
+                               category_ratio=spec["category_ratio"], out_format=fmt,
+                               dedupe_mode=spec["dedupe_mode"], near_threshold=spec["near_threshold"],
+                               profile=profile, sheet=spec["sheet"], compression=compression)
+        rows_in, rows_out = summary["rows_in"], summary["rows_out"]
+    else:
+        if steps["clean_names"]:
+            log.append(f"Cleaned column names: {df.columns.tolist()} -> {[plan['rename'][c] for c in df.columns]}")
+        out = run_plan(df, plan, log, profile=profile)   # no cache_key: each file is cleaned once
+        write_table(out, out_path, fmt, compression)
+        rows_in, rows_out = len(df), len(out)
+    log_path = out_path[:-len(export_name(fmt, compression)[0])] + ".log"   # name.csv.gz -> name.log
+    with open(log_path, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(log) + "\n")
+    seconds = time.perf_counter() - t0
+    size_mb = os.path.getsize(path) / 2**20
+    return {"file": path, "output": out_path, "rows_in": rows_in, "rows_out": rows_out,
+            "seconds": seconds, "rows_per_sec": rows_in / max(seconds, 1e-9),
+            "mb_per_sec": size_mb / max(seconds, 1e-9), "error": None}
+
+def _clean_file_safe(path: str, spec: dict, out_dir: str) -> dict:
+    """clean_file for pool workers: a bad file is reported, it does not stop the batch."""
+    try:
+        return clean_file(path, spec, out_dir)
+    except Exception as e:
+        return {"file": path, "output": None, "rows_in": 0, "rows_out": 0, "seconds": 0.0,
+                "rows_per_sec": 0.0, "mb_per_sec": 0.0, "error": f"{type(e).__name__}: {e}"}
+
+# ---------- MANY FILES ----------
+def find_inputs(path: str, pattern: str = None) -> list:
+    """`path` itself, or the matching files directly inside the directory `path` (sorted)."""
+    if os.path.isfile(path):
+        return [path]
+    patterns = [pattern] if pattern else [f"*.{ext}" for ext in INPUT_EXTENSIONS]
+    names = sorted(n for n in os.listdir(path)
+                   if os.path.isfile(os.path.join(path, n)) and any(fnmatch.fnmatch(n.lower(), p) for p in patterns))
+    return [os.path.join(path, n) for n in names]
+
+def clean_many(paths: list, spec: dict, out_dir: str, jobs: int = None):
+    """Yield each file's summary as it finishes; `jobs` > 1 cleans files in parallel processes."""
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield _clean_file_safe(path, spec, out_dir)
+        return
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        futures = [pool.submit(_clean_file_safe, path, spec, out_dir) for path in paths]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+def format_result(r: dict) -> str:
+    if r["error"]:
+        return f"FAILED {r['file']}: {r['error']}"
+    return (f"{r['file']} -> {r['output']}: {r['rows_in']} -> {r['rows_out']} rows in {r['seconds']:.2f}s "
+            f"({r['rows_per_sec']:,.0f} rows/s, {r['mb_per_sec']:.1f} MB/s)")
+
+# ---------- CLI ----------
+def main(argv: list = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m autoclean", description=__doc__.splitlines()[0])
+    ap.add_argument("spec", help="YAML cleaning spec")
+    ap.add_argument("input", help="file or directory to clean")
+    ap.add_argument("--out", default="cleaned", help="output directory (default: ./cleaned)")
+    ap.add_argument("--jobs", type=int, default=None, help="files cleaned in parallel (default: CPU count)")
+    ap.add_argument("--pattern", default=None, help="file glob inside a directory, e.g. '*.csv'")
+    args = ap.parse_args(argv)
+
+    spec = load_spec(args.spec)
+    paths = find_inputs(args.input, args.pattern)
+    if not paths:
+        print(f"No input files found in {args.input}", file=sys.stderr)
+        return 1
+    t0 = time.perf_counter()
+    rows = failed = 0
+    for r in clean_many(paths, spec, args.out, args.jobs):
+        print(format_result(r), flush=True)
+        rows += r["rows_in"]
+        failed += bool(r["error"])
+    seconds = time.perf_counter() - t0
+    print(f"Cleaned {len(paths) - failed}/{len(paths)} files, {rows} rows in {seconds:.2f}s "
+          f"({rows / max(seconds, 1e-9):,.0f} rows/s overall)")
+    return 1 if failed else 0
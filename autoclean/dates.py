@@ -0,0 +1,105 @@
+# autoclean/dates.py
+"""Per-column datetime format inference and a fast explicit-format parser.
+
+The four layouts looks_like_date_sample checks for are mapped to concrete strptime formats. A
+column's sample picks the format that parses the most values (cached by sample), the full
+column is parsed with that format in one vectorized call, and only the values it rejects go to
+pandas' slower element-wise parser. A column with no dominant layout is parsed element-wise.
+"""
+import re
+from functools import lru_cache
+from typing import Optional
+
+import pandas as pd
+
+# layout regex -> builder of candidate formats (sep is the separator seen in the value)
+DATE_LAYOUTS = [
+    (r"^\d{4}[-/]\d{1,2}[-/]\d{1,2}$",      # 2020-01-05 or 2020/01/05
+     lambda v, sep: [f"%Y{sep}%m{sep}%d"]),
+    (r"^\d{1,2}[-/]\d{1,2}[-/]\d{2,4}$",    # 05-01-2020 or 5/1/20 (month first, like pandas)
+     lambda v, sep: [f"%m{sep}%d{sep}{y}" for y in _year(v)] + [f"%d{sep}%m{sep}{y}" for y in _year(v)]),
+    (r"^[A-Za-z]{3,9}\s+\d{1,2},\s*\d{4}$",  # Jan 5, 2020
+     lambda v, sep: [f"%b %d,{sp}%Y" for sp in _comma_space(v)] + [f"%B %d,{sp}%Y" for sp in _comma_space(v)]),
+    (r"^\d{1,2}\s+[A-Za-z]{3,9}\s+\d{4}$",   # 5 Jan 2020
+     lambda v, sep: ["%d %b %Y", "%d %B %Y"]),
+]
+_LAYOUT_RES = [(re.compile(p), build) for p, build in DATE_LAYOUTS]
+# values the inferred format rejects that are still worth the slow parser: digit groups with a
+# date separator, a compact yyyymmdd, or a month word + day
+_DATEISH_RE = re.compile(r"\d{1,4}[-/.]\d{1,2}|^\d{8}\b|[A-Za-z]{3,9}\.?\s+\d{1,2}|\d{1,2}\s+[A-Za-z]{3,9}")
+FORMAT_SAMPLE_N = 200
+_PANDAS_2 = int(pd.__version__.split(".")[0]) >= 2
+
+def _year(v: str) -> list:
+    return ["%y"] if len(re.split(r"[-/]", v)[-1]) == 2 else ["%Y"]
+
+def _comma_space(v: str) -> list:
+    return [" "] if ", " in v else [""]
+
+def _candidates(values: tuple) -> list:
+    """Candidate formats for the values' most common layout, in preference order."""
+    best, best_hits = None, 0
+    for rx, build in _LAYOUT_RES:
+        hits = [v for v in values if rx.match(v)]
+        if len(hits) > best_hits:
+            best, best_hits = (build, hits), len(hits)
+    if best is None:
+        return []
+    build, hits = best
+    out = []
+    for v in hits[:20]:    # separators / year widths can vary; collect distinct candidates
+        sep = "/" if "/" in v else "-"
+        out.extend(f for f in build(v, sep) if f not in out)
+    return out
+
+@lru_cache(maxsize=512)
+def _infer_from_sample(values: tuple) -> Optional[str]:
+    cands = _candidates(values)
+    if not cands:
+        return None
+    sample = pd.Series(values, dtype=object)
+    scores = [(int(pd.to_datetime(sample, format=f, errors="coerce").notna().sum()), -i, f)
+              for i, f in enumerate(cands)]
+    hits, _, fmt = max(scores)
+    return fmt if hits * 2 >= len(values) else None
+
+def infer_date_format(series: pd.Series, sample_n: int = FORMAT_SAMPLE_N) -> Optional[str]:
+    """strptime format matching most of the column's first `sample_n` non-null values, or None."""
+    if not (series.dtype == object or pd.api.types.is_string_dtype(series)):
+        return None
+    sample = series.dropna().head(sample_n).astype(str).str.strip()
+    return _infer_from_sample(tuple(sample)) if len(sample) else None
+
+def _fallback(series: pd.Series) -> pd.Series:
+    """Element-wise parse (each value may have its own layout)."""
+    if _PANDAS_2:
+        return pd.to_datetime(series, errors="coerce", format="mixed")
+    return pd.to_datetime(series, errors="coerce")
+
+def parse_date_column(series: pd.Series, fmt: Optional[str] = None) -> pd.Series:
+    """Parse a column to datetime; unparseable values become NaT.
+
+    `fmt` defaults to infer_date_format(series). Each distinct value is parsed once and broadcast
+    back to the rows. With a format, that is one vectorized call, and only date-like values the
+    format rejects are re-parsed element-wise; without one (no layout covers most of the sample,
+    e.g. a mixed-format column), every distinct value goes to the element-wise parser.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.copy()
+    if not (series.dtype == object or pd.api.types.is_string_dtype(series)):
+        return pd.to_datetime(series, errors="coerce")   # numbers: pandas' epoch handling
+    fmt = fmt or infer_date_format(series)
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    if fmt is None:
+        parsed = _fallback(uniques)
+    else:
+        parsed = pd.to_datetime(uniques, format=fmt, errors="coerce")
+        rest = uniques[parsed.isna()]
+        rest = rest[rest.str.contains(_DATEISH_RE)]
+        if len(rest):
+            extra = _fallback(rest)
+            if extra.dtype == parsed.dtype:   # skip tz-aware stragglers rather than go object
+                parsed[extra.index] = extra
+    values = parsed.array.take(codes, allow_fill=True)   # code -1 (missing) -> NaT
+    return pd.Series(values, index=series.index, name=series.name)
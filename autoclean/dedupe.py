@@ -0,0 +1,218 @@
+# autoclean/dedupe.py
+"""Duplicate-row detection in bounded memory, across chunks and files.
+
+Rows are reduced to 64-bit fingerprints (pandas' row hash) and only the fingerprints of rows
+already kept are remembered, in sorted numpy runs: about 8 bytes per unique row, whatever the
+width of the rows or the size of the input. Three modes:
+
+  exact       rows equal value for value (NaNs equal), as DataFrame.drop_duplicates
+  normalized  text compared trimmed, with inner whitespace collapsed and case-folded
+  near        rows whose character 3-grams have an estimated Jaccard similarity of at least
+              `threshold` (MinHash signatures, candidates found by LSH banding); each kept row
+              also stores its signature (MINHASH_PERMS * 4 bytes)
+
+The first row of every group is kept, with its original values.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# ---------- CONFIG ----------
+DEDUPE_MODES = ["exact", "normalized", "near"]
+NEAR_THRESHOLD = 0.9
+MINHASH_PERMS = 64
+SHINGLE_SIZE = 3
+_SPACE_RE = re.compile(r"\s+")
+_FIELD_SEP = "\x1f"
+
+# ---------- NORMALIZING ----------
+def _is_text(s: pd.Series) -> bool:
+    return (s.dtype == object or isinstance(s.dtype, pd.CategoricalDtype)
+            or pd.api.types.is_string_dtype(s.dtype))
+
+def normalize_text(s: pd.Series) -> pd.Series:
+    """Trimmed, whitespace-collapsed, case-folded text (object dtype); missing stays missing.
+
+    Categoricals are normalized once per category.
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        cats = normalize_text(pd.Series(s.cat.categories, dtype=object)).to_numpy()
+        codes = s.cat.codes.to_numpy()
+        values = np.append(cats, np.nan)[np.where(codes < 0, len(cats), codes)]
+        return pd.Series(values, index=s.index, name=s.name, dtype=object)
+    out = s.astype(object)
+    mask = out.notna()
+    out[mask] = out[mask].astype(str).str.strip().str.replace(_SPACE_RE, " ", regex=True).str.casefold()
+    return out
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """`df` with every text column passed through normalize_text (other columns shared, not copied)."""
+    return pd.DataFrame({c: normalize_text(s) if _is_text(s) else s for c, s in df.items()}, index=df.index)
+
+def row_fingerprints(df: pd.DataFrame, normalize: bool = False) -> np.ndarray:
+    """One uint64 per row from its values (not its index); normalize=True hashes normalize_frame(df)."""
+    if normalize:
+        df = normalize_frame(df)
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+# ---------- FINGERPRINT SET ----------
+class FingerprintSet:
+    """Set of uint64 fingerprints held in sorted numpy runs: 8 bytes per member.
+
+    New members arrive as a sorted run; runs are merged while the newest is at least half the
+    size of the one before, so there are O(log n) of them and each lookup is a binary search
+    per run.
+    """
+    def __init__(self):
+        self._runs = []
+        self.n = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(r.nbytes for r in self._runs)
+
+    def contains(self, fps: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(fps), dtype=bool)
+        for run in self._runs:
+            idx = np.minimum(np.searchsorted(run, fps), len(run) - 1)
+            found |= run[idx] == fps
+        return found
+
+    def add_new(self, fps: np.ndarray) -> np.ndarray:
+        """Mask of the fingerprints not seen before (first occurrence only); those are added."""
+        fps = np.asarray(fps, dtype="uint64")
+        new = ~pd.Series(fps).duplicated().to_numpy()
+        new &= ~self.contains(fps)
+        if new.any():
+            self._runs.append(np.sort(fps[new]))
+            self.n += int(new.sum())
+            while len(self._runs) > 1 and 2 * len(self._runs[-1]) >= len(self._runs[-2]):
+                last = self._runs.pop()
+                self._runs[-1] = np.sort(np.concatenate([self._runs[-1], last]), kind="mergesort")
+        return new
+
+# ---------- NEAR DUPLICATES ----------
+def _lsh_shape(threshold: float, num_perm: int) -> tuple:
+    """(bands, rows per band) whose LSH threshold (1/b)**(1/r) is closest to `threshold` from below."""
+    shapes = [(num_perm // r, r) for r in range(1, num_perm + 1) if num_perm % r == 0]
+    below = [s for s in shapes if (1 / s[0]) ** (1 / s[1]) <= threshold] or shapes
+    return min(below, key=lambda s: threshold - (1 / s[0]) ** (1 / s[1]))
+
+def _row_text(df: pd.DataFrame) -> list:
+    """Each row as one normalized string (fields joined by a unit separator)."""
+    norm = normalize_frame(df)
+    text = None
+    for _, s in norm.items():
+        s = s.astype(str)
+        text = s if text is None else text + _FIELD_SEP + s
+    return [] if text is None else text.tolist()
+
+class MinHashIndex:
+    """Kept rows' MinHash signatures plus LSH band buckets, for near-duplicate lookups."""
+    def __init__(self, threshold: float = NEAR_THRESHOLD, num_perm: int = MINHASH_PERMS, seed: int = 0):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.band_rows = _lsh_shape(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype="uint64") | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype="uint64")
+        self._buckets = [{} for _ in range(self.bands)]
+        self._sigs = np.empty((0, num_perm), dtype="uint32")
+        self.n = 0
+
+    @property
+    def nbytes(self) -> int:
+        entries = sum(len(b) for b in self._buckets)
+        return self.n * self.num_perm * 4 + entries * 16
+
+    def signatures(self, texts: list) -> np.ndarray:
+        """(rows, num_perm) uint32 MinHash signatures of the texts' character shingles."""
+        k = SHINGLE_SIZE
+        shingles = [[t[i:i + k] for i in range(max(1, len(t) - k + 1))] for t in texts]
+        counts = np.fromiter((len(s) for s in shingles), dtype="int64", count=len(shingles))
+        sigs = np.empty((len(texts), self.num_perm), dtype="uint32")
+        if not len(texts):
+            return sigs
+        flat = pd.util.hash_array(np.array([g for s in shingles for g in s], dtype=object))
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        with np.errstate(over="ignore"):   # universal hashing mod 2**64
+            for p in range(self.num_perm):
+                h = (flat * self._a[p] + self._b[p]) >> np.uint64(32)
+                sigs[:, p] = np.minimum.reduceat(h, starts)
+        return sigs
+
+    def _band_keys(self, sigs: np.ndarray) -> np.ndarray:
+        """(rows, bands) uint64 key of each band of each signature (collisions are verified)."""
+        r = self.band_rows
+        keys = np.empty((len(sigs), self.bands), dtype="uint64")
+        with np.errstate(over="ignore"):
+            for j in range(self.bands):
+                key = np.full(len(sigs), j + 1, dtype="uint64")
+                for col in range(j * r, (j + 1) * r):
+                    key = key * np.uint64(0x100000001B3) + sigs[:, col]
+                keys[:, j] = key
+        return keys
+
+    def add_new(self, texts: list) -> np.ndarray:
+        """Mask of the rows that are not near-duplicates of a kept row; those are kept."""
+        sigs = self.signatures(texts)
+        keys = self._band_keys(sigs).tolist()
+        new = np.zeros(len(texts), dtype=bool)
+        kept = []   # chunk rows kept so far; kept row k has id self.n + k
+
+        def stored(idx: int) -> np.ndarray:
+            return self._sigs[idx] if idx < self.n else sigs[kept[idx - self.n]]
+
+        for i, row_keys in enumerate(keys):
+            cands = {b[key] for b, key in zip(self._buckets, row_keys) if key in b}
+            if any((stored(c) == sigs[i]).mean() >= self.threshold for c in cands):
+                continue
+            new[i] = True
+            idx = self.n + len(kept)
+            kept.append(i)
+            for b, key in zip(self._buckets, row_keys):
+                b.setdefault(key, idx)
+        if kept:
+            self._sigs = np.vstack([self._sigs, sigs[kept]])
+            self.n += len(kept)
+        return new
+
+# ---------- DEDUPLICATOR ----------
+class Deduplicator:
+    """Remembers the rows it has kept and flags later duplicates: one chunk (or file) at a time.
+
+    Call `duplicated(chunk)` on each chunk in order; the counts cover everything seen so far.
+    Near mode drops exact (normalized) repeats by fingerprint first and only builds signatures
+    for the remaining rows.
+    """
+    def __init__(self, mode: str = "exact", threshold: float = NEAR_THRESHOLD, num_perm: int = MINHASH_PERMS):
+        if mode not in DEDUPE_MODES:
+            raise ValueError(f"Unknown dedupe mode {mode!r}; expected one of {DEDUPE_MODES}")
+        self.mode = mode
+        self.fingerprints = FingerprintSet()
+        self.minhash = MinHashIndex(threshold, num_perm) if mode == "near" else None
+        self.rows = 0
+        self.removed = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.fingerprints.nbytes + (self.minhash.nbytes if self.minhash is not None else 0)
+
+    def duplicated(self, df: pd.DataFrame) -> np.ndarray:
+        """Boolean mask of `df`'s rows that repeat a row of this or an earlier chunk."""
+        keep = self.fingerprints.add_new(row_fingerprints(df, normalize=self.mode != "exact"))
+        if self.minhash is not None and keep.any():
+            rest = np.flatnonzero(keep)
+            keep[rest[~self.minhash.add_new(_row_text(df.iloc[rest]))]] = False
+        self.rows += len(df)
+        self.removed += int((~keep).sum())
+        return ~keep
+
+    def describe(self) -> str:
+        """Change-log wording for this mode: 'N <describe()>'."""
+        if self.mode == "exact":
+            return "exact duplicate rows"
+        if self.mode == "normalized":
+            return "duplicate rows (text compared trimmed and case-insensitive)"
+        return f"near-duplicate rows (MinHash similarity >= {self.minhash.threshold:g})"
@@ -0,0 +1,144 @@
+# autoclean/excel.py
+"""Excel input: sheet names, rows streamed from openpyxl's read-only mode, and a fast full load.
+
+pd.read_excel parses the whole sheet into cell objects before returning anything. Here rows come
+from openpyxl as plain values, one at a time, so the first rows of a sheet (preview, type
+detection, the preview) are ready without reading the rest and a chunked read holds one chunk
+in memory.
+Values go through the TextParser pd.read_excel itself uses, so dtypes, header names
+("Unnamed: 2", "id.1") and missing values match pd.read_excel. The full load uses the calamine
+engine when python-calamine is installed (several times faster than openpyxl, but it parses the
+whole sheet whatever nrows asks for), otherwise the streamed rows. Legacy .xls workbooks are read with pd.read_excel.
+"""
+import os
+from typing import Iterator
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+try:  # optional: read-only streaming
+    import openpyxl
+    from openpyxl.cell.cell import ERROR_CODES
+except ImportError:
+    openpyxl = None
+    ERROR_CODES = ()
+
+try:  # optional: Rust-based full-sheet reader (pandas 2.2+ engine="calamine")
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+# ---------- CONFIG ----------
+PREVIEW_ROWS = int(os.environ.get("AUTOCLEAN_PREVIEW_ROWS", "2000"))
+_PANDAS_VERSION = tuple(int(p) for p in pd.__version__.split(".")[:2])
+CALAMINE = python_calamine is not None and _PANDAS_VERSION >= (2, 2)
+_ERRORS = list(ERROR_CODES)   # "#DIV/0!" etc.: missing, like read_excel's error cells
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+def _is_xls(source) -> bool:
+    name = str(source if isinstance(source, str) else getattr(source, "name", "")).lower()
+    return name.endswith(".xls")
+
+def _open(source):
+    if openpyxl is None:
+        raise ImportError("Excel input needs openpyxl (pip install openpyxl)")
+    _rewind(source)
+    return openpyxl.load_workbook(source, read_only=True, data_only=True, keep_links=False)
+
+# ---------- SHEETS ----------
+def sheet_names(source) -> list:
+    """Worksheet names in workbook order (read from the workbook index, not the sheets)."""
+    if _is_xls(source):
+        _rewind(source)
+        return pd.ExcelFile(source).sheet_names
+    wb = _open(source)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+# ---------- ROWS ----------
+def iter_rows(source, sheet=None) -> Iterator[list]:
+    """Rows of `sheet` (name; default the first sheet) as lists, without trailing empty cells.
+
+    Empty rows at the end of the sheet are dropped; empty rows between data rows are kept.
+    """
+    wb = _open(source)
+    try:
+        ws = wb[sheet] if sheet is not None else wb.worksheets[0]
+        ws.reset_dimensions()   # the stored dimension tag can be stale; read what is there
+        blank = []
+        for row in ws.iter_rows(values_only=True):
+            # cell values as read_excel's openpyxl reader passes them on (inline: runs per cell)
+            vals = ["" if v is None else int(v) if v.__class__ is float and v.is_integer() else v for v in row]
+            while vals and vals[-1] == "":
+                vals.pop()
+            if not vals:
+                blank.append(vals)
+                continue
+            if blank:
+                yield from blank
+                blank = []
+            yield vals
+    finally:
+        wb.close()
+
+def _frame(rows: list, names: list = None, dtype: dict = None) -> pd.DataFrame:
+    """Parse rows like pd.read_excel: the first row is the header unless `names` is given."""
+    width = len(names) if names is not None else max(map(len, rows), default=0)
+    rows = [r + [""] * (width - len(r)) if len(r) < width else r[:width] for r in rows]
+    parser = TextParser(rows, header=None if names is not None else 0, names=names, dtype=dtype,
+                        na_values=_ERRORS, skip_blank_lines=False)   # read_excel keeps empty rows too
+    with parser:
+        return parser.read()
+
+# ---------- FRAMES ----------
+def iter_excel_chunks(source, chunksize: int, sheet=None, dtype: dict = None) -> Iterator[pd.DataFrame]:
+    """DataFrames of at most `chunksize` rows, read lazily; rows wider than the header are cut."""
+    if _is_xls(source):
+        df = read_excel(source, sheet, dtype)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize].reset_index(drop=True)
+        return
+    rows = iter_rows(source, sheet)
+    try:
+        batch = []
+        names = None
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunksize + (names is None):   # the first batch also holds the header
+                chunk = _frame(batch, names, dtype)
+                names = chunk.columns.tolist()
+                batch = []
+                yield chunk
+        if batch:   # the rest, or a header-only sheet (an empty frame with its columns)
+            yield _frame(batch, names, dtype)
+    finally:
+        rows.close()
+
+def read_excel_head(source, n: int = PREVIEW_ROWS, sheet=None) -> pd.DataFrame:
+    """The first `n` data rows of a sheet, without reading the rest of it.
+
+    Always streamed from openpyxl (calamine parses the whole sheet even with nrows); only .xls
+    goes through pd.read_excel.
+    """
+    if _is_xls(source):
+        _rewind(source)
+        return pd.read_excel(source, sheet_name=0 if sheet is None else sheet, nrows=n)
+    chunks = iter_excel_chunks(source, n, sheet)
+    try:
+        return next(chunks, pd.DataFrame())
+    finally:
+        chunks.close()
+
+def read_excel(source, sheet=None, dtype: dict = None) -> pd.DataFrame:
+    """The whole sheet (default: the first), as pd.read_excel would return it."""
+    if CALAMINE or _is_xls(source):
+        _rewind(source)
+        kwargs = {"engine": "calamine"} if CALAMINE else {}
+        return pd.read_excel(source, sheet_name=0 if sheet is None else sheet, dtype=dtype, **kwargs)
+    rows = list(iter_rows(source, sheet))
+    return _frame(rows, dtype=dtype) if rows else pd.DataFrame()
@@ -0,0 +1,334 @@
+# autoclean/formats.py
+"""File formats: CSV, Excel, Parquet and Arrow IPC (Feather v2) input and output.
+
+Parquet and Arrow files carry their column types, so cleaned numeric, datetime and category
+columns survive a save/load round trip (CSV re-infers everything). Local Parquet/Arrow paths
+are memory-mapped; `arrow_dtypes=True` keeps columns Arrow-backed (pd.ArrowDtype) in pandas.
+
+Output is always written a chunk at a time (ChunkWriter), so exporting a large frame never
+builds the whole file as one string. `compression` ("gzip" or "zstd") wraps CSV output in a
+.gz / .zst stream and selects the column codec inside Parquet (gzip, zstd) and Arrow (zstd)
+files; XLSX files are zip archives already. XLSX is written with xlsxwriter when installed
+(about 3x faster), otherwise openpyxl's write-only mode.
+"""
+import gzip
+import io
+import os
+import re
+import tempfile
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from .excel import read_excel
+
+try:  # optional: XLSX output
+    import openpyxl
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+except ImportError:
+    openpyxl = None
+    ILLEGAL_CHARACTERS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")   # control characters XLSX rejects
+
+try:  # optional: faster streaming XLSX writer (row by row, constant memory)
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:  # optional: Parquet / Arrow support
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# ---------- CONFIG ----------
+INPUT_EXTENSIONS = ["csv", "xlsx", "parquet", "arrow", "feather"]
+OUTPUT_FORMATS = {  # name -> (file suffix, MIME type)
+    "csv": (".csv", "text/csv"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file"),
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+COMPRESSIONS = {  # name -> formats it applies to; None (the default) keeps each format's own
+    "gzip": ("csv", "parquet"),
+    "zstd": ("csv", "parquet", "arrow"),
+}
+_CSV_COMPRESSED = {"gzip": (".gz", "application/gzip"), "zstd": (".zst", "application/zstd")}
+EXPORT_CHUNK_ROWS = int(os.environ.get("AUTOCLEAN_EXPORT_CHUNK_ROWS", "100000"))
+XLSX_MAX_ROWS = 1_048_576   # per worksheet, header included
+_PANDAS_2 = int(pd.__version__.split(".")[0]) >= 2
+_SUFFIXES = {".xlsx": "excel", ".xls": "excel", ".parquet": "parquet", ".pq": "parquet",
+             ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow", ".arrows": "arrow"}
+
+def file_format(source) -> str:
+    """"csv", "excel", "parquet" or "arrow", from the path / upload name (default csv)."""
+    name = str(source if isinstance(source, str) else getattr(source, "name", "")).lower()
+    for suffix, fmt in _SUFFIXES.items():
+        if name.endswith(suffix):
+            return fmt
+    return "csv"
+
+def _require_pyarrow(what: str):
+    if pa is None:
+        raise ImportError(f"{what} needs pyarrow (pip install pyarrow)")
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+# ---------- READING ----------
+def read_arrow_table(source) -> "pa.Table":
+    """Whole Parquet / Arrow IPC file as a pyarrow Table; local paths are memory-mapped."""
+    _require_pyarrow("Parquet/Arrow input")
+    _rewind(source)
+    if file_format(source) == "parquet":
+        return pq.read_table(source, memory_map=isinstance(source, str))
+    src = pa.memory_map(source, "r") if isinstance(source, str) else source
+    try:
+        return pa.ipc.open_file(src).read_all()
+    except pa.ArrowInvalid:   # IPC stream format (.arrows) rather than the random-access file format
+        if hasattr(src, "seek"):
+            src.seek(0)
+        return pa.ipc.open_stream(src).read_all()
+
+def arrow_to_pandas(table: "pa.Table", arrow_dtypes: bool = False) -> pd.DataFrame:
+    if arrow_dtypes:
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    df = table.to_pandas()
+    for col in df.select_dtypes(include="object").columns:
+        if df[col].isna().any():   # Arrow gives None for missing strings; read_csv gives NaN
+            df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+def read_table(source, arrow_dtypes: bool = False, sheet=None) -> pd.DataFrame:
+    """Load a CSV / Excel / Parquet / Arrow path or upload into one DataFrame.
+
+    `sheet` picks the worksheet of an Excel workbook (default: the first).
+    """
+    fmt = file_format(source)
+    if fmt in ("parquet", "arrow"):
+        return arrow_to_pandas(read_arrow_table(source), arrow_dtypes)
+    native = arrow_dtypes and _PANDAS_2 and fmt == "csv"   # dtype_backend= is pandas 2+
+    if fmt == "excel":
+        df = read_excel(source, sheet)
+    else:
+        _rewind(source)
+        df = pd.read_csv(source, **({"dtype_backend": "pyarrow"} if native else {}))
+    if arrow_dtypes and not native:
+        _require_pyarrow("Arrow-backed dtypes")
+        df = arrow_to_pandas(_to_arrow(df), True)   # Excel object columns can mix types
+    return df
+
+def iter_arrow_chunks(source, chunksize: int, arrow_dtypes: bool = False) -> Iterator[pd.DataFrame]:
+    """Chunks of a Parquet file (row batches, read lazily) or an Arrow file (zero-copy slices)."""
+    _require_pyarrow("Parquet/Arrow input")
+    _rewind(source)
+    if file_format(source) == "parquet":
+        pf = pq.ParquetFile(source, memory_map=isinstance(source, str))
+        for batch in pf.iter_batches(batch_size=chunksize):
+            yield arrow_to_pandas(pa.Table.from_batches([batch]), arrow_dtypes)
+        return
+    table = read_arrow_table(source)
+    for start in range(0, table.num_rows, chunksize):
+        yield arrow_to_pandas(table.slice(start, chunksize), arrow_dtypes)
+
+# ---------- WRITING ----------
+def _file_schema(schema: "pa.Schema") -> "pa.Schema":
+    """The first chunk's schema, widened for later chunks: all-null columns become strings and
+    categories use int32 codes."""
+    fields = []
+    for field in schema:
+        if pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        elif pa.types.is_dictionary(field.type):
+            field = field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+def _to_arrow(df: pd.DataFrame, schema=None) -> "pa.Table":
+    try:
+        return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # object columns mixing strings and numbers (e.g. from Excel): store them as text
+        df = df.copy()
+        for col in df.select_dtypes(include="object").columns:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+class ChunkWriter:
+    """Append DataFrame chunks to one CSV, Parquet, Arrow IPC or XLSX file (path or binary file object).
+
+    The first chunk fixes the Parquet/Arrow schema; later chunks are cast to it. Category columns
+    share one growing category list, so each Arrow dictionary extends the previous one (IPC files
+    allow dictionary deltas but not replacements). Uncompressed CSV also accepts a text file
+    object; compressed CSV (see COMPRESSIONS) needs a path or binary file object. zstd CSV is
+    written as one zstd frame per chunk, which zstd tools and readers decode as one stream.
+    XLSX rows are streamed to one worksheet (at most XLSX_MAX_ROWS rows).
+    """
+    def __init__(self, dest, fmt: str = "csv", compression: str = None):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {fmt!r}; expected one of {list(OUTPUT_FORMATS)}")
+        if compression is not None and fmt not in COMPRESSIONS.get(compression, ()):
+            raise ValueError(f"{compression!r} compression is not available for {fmt} output; "
+                             f"options: {[c for c, fmts in COMPRESSIONS.items() if fmt in fmts]}")
+        if fmt in ("parquet", "arrow") or compression == "zstd":
+            _require_pyarrow(f"{fmt} output" if compression is None else f"{compression} compression")
+        if fmt == "xlsx" and openpyxl is None and xlsxwriter is None:
+            raise ImportError("xlsx output needs xlsxwriter or openpyxl (pip install xlsxwriter)")
+        self.fmt = fmt
+        self.compression = compression
+        self._close = isinstance(dest, str)
+        if fmt == "csv" and compression is None and self._close:
+            self.out = open(dest, "w", newline="", encoding="utf-8")
+        elif self._close:
+            self.out = open(dest, "wb")
+        else:
+            self.out = dest
+        self._gzip = gzip.GzipFile(fileobj=self.out, mode="wb", mtime=0) if fmt == "csv" and compression == "gzip" else None
+        self._writer = None
+        self._schema = None
+        self._categories = {}
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame):
+        if self.fmt == "csv":
+            self._write_csv(df)
+        elif self.fmt == "xlsx":
+            self._write_xlsx(df)
+        else:
+            table = _to_arrow(self._shared_categories(df), self._schema)
+            if self._schema is None:
+                self._schema = _file_schema(table.schema)
+                table = table.cast(self._schema)
+                if self.fmt == "parquet":
+                    self._writer = pq.ParquetWriter(self.out, self._schema, compression=self.compression or "snappy")
+                else:
+                    codec = self.compression or ("lz4" if pa.Codec.is_available("lz4") else None)   # Feather v2 default
+                    options = pa.ipc.IpcWriteOptions(compression=codec, emit_dictionary_deltas=True)
+                    self._writer = pa.ipc.new_file(self.out, self._schema, options=options)
+            self._writer.write_table(table)
+        self.rows += len(df)
+
+    def _write_csv(self, df: pd.DataFrame):
+        if self.compression is None:
+            df.to_csv(self.out, index=False, header=(self.rows == 0))
+            return
+        data = df.to_csv(index=False, header=(self.rows == 0)).encode("utf-8")   # one chunk at a time
+        if self._gzip is not None:
+            self._gzip.write(data)
+        else:
+            self.out.write(pa.compress(data, codec="zstd", asbytes=True))
+
+    def _write_xlsx(self, df: pd.DataFrame):
+        if self._writer is None:
+            self._writer = _XlsxSheet(self.out)
+            self._writer.append([str(c) for c in df.columns])
+        if self.rows + len(df) + 1 > XLSX_MAX_ROWS:
+            raise ValueError(f"xlsx output holds at most {XLSX_MAX_ROWS - 1:,} rows; use csv, parquet or arrow")
+        for row in _excel_values(df):
+            self._writer.append(row)
+
+    def _shared_categories(self, df: pd.DataFrame) -> pd.DataFrame:
+        cat_cols = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+        if not cat_cols:
+            return df
+        df = df.copy(deep=False)
+        for col in cat_cols:
+            known = self._categories.get(col)
+            cats = df[col].cat.categories
+            if known is None:
+                known = cats
+            elif not cats.isin(known).all():
+                known = known.append(cats[~cats.isin(known)])
+            self._categories[col] = known
+            if not cats.equals(known):
+                df[col] = df[col].cat.set_categories(known)
+        return df
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._gzip is not None:
+            self._gzip.close()   # ends the gzip stream; a caller's file object stays open
+        if self._close:
+            self.out.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class _XlsxSheet:
+    """One streamed worksheet: append(row) then close(). Text is written as text (no formulas or links)."""
+    def __init__(self, out):
+        self.row = 0
+        self._out = out
+        if xlsxwriter is not None:
+            self._wb = xlsxwriter.Workbook(out, {
+                "constant_memory": True, "strings_to_formulas": False, "strings_to_urls": False,
+                "nan_inf_to_errors": True, "default_date_format": "yyyy-mm-dd hh:mm:ss"})
+            self._ws = self._wb.add_worksheet("cleaned")
+        else:
+            self._wb = openpyxl.Workbook(write_only=True)
+            self._ws = self._wb.create_sheet("cleaned")
+
+    def append(self, values: list):
+        if xlsxwriter is not None:
+            self._ws.write_row(self.row, 0, values)
+        else:
+            self._ws.append(values)
+        self.row += 1
+
+    def close(self):
+        if xlsxwriter is not None:
+            self._wb.close()
+        else:
+            self._wb.save(self._out)
+
+def _excel_values(df: pd.DataFrame) -> list:
+    """Rows of plain Python values openpyxl accepts: missing -> None, no time zones, no control characters."""
+    cols = {}
+    for col, s in df.items():
+        if isinstance(s.dtype, pd.DatetimeTZDtype):
+            s = s.dt.tz_localize(None)
+        text = s.dtype == object
+        s = s.astype(object)
+        if text:
+            s = s.map(lambda v: ILLEGAL_CHARACTERS_RE.sub("", v) if isinstance(v, str) else v)
+        cols[col] = s.where(s.notna(), None)
+    return pd.DataFrame(cols).to_numpy().tolist() if cols else [[] for _ in range(len(df))]
+
+def export_name(fmt: str, compression: str = None) -> tuple:
+    """(file suffix, MIME type) of an export; compressed CSV becomes .csv.gz / .csv.zst."""
+    suffix, mime = OUTPUT_FORMATS[fmt]
+    if fmt == "csv" and compression is not None:
+        ext, mime = _CSV_COMPRESSED[compression]
+        suffix += ext
+    return suffix, mime
+
+def write_table(df: pd.DataFrame, dest, fmt: str = "csv", compression: str = None,
+                chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Write `df` to `dest` (path or file object) in slices of `chunk_rows` rows."""
+    with ChunkWriter(dest, fmt, compression) as writer:
+        for start in range(0, max(len(df), 1), chunk_rows):
+            writer.write(df.iloc[start:start + chunk_rows])
+
+def export_file(df: pd.DataFrame, fmt: str = "csv", compression: str = None, dir: str = None) -> str:
+    """Write the cleaned frame to a new temporary file (named per export_name) and return its path.
+
+    Only one chunk is encoded in memory at a time. The file is created in `dir` (default: the
+    system temp directory) and the caller owns it: the app passes its job's workdir, which is
+    deleted with the job (see autoclean.jobs).
+    """
+    with tempfile.NamedTemporaryFile(suffix=export_name(fmt, compression)[0], dir=dir, delete=False) as fh:
+        path = fh.name
+    write_table(df, path, fmt, compression)
+    return path
+
+def to_bytes(df: pd.DataFrame, fmt: str = "csv", compression: str = None) -> bytes:
+    """The cleaned frame as a downloadable file in `fmt` (see OUTPUT_FORMATS)."""
+    buf = io.BytesIO()
+    write_table(df, buf, fmt, compression)
+    return buf.getvalue()
@@ -0,0 +1,377 @@
+# autoclean/helpers.py
+"""Column-level cleaning helpers shared by the Streamlit app and the streaming pipeline."""
+import os
+import pandas as pd
+import numpy as np
+import re
+from typing import Optional, Tuple
+
+from .dates import DATE_LAYOUTS
+from .dedupe import NEAR_THRESHOLD, Deduplicator
+from .sketches import HyperLogLog, sketch_series, stratified_positions, stratified_sample, use_sketches
+
+try:  # optional: Arrow string kernels for the column-at-a-time helpers
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+# ---------- CONFIG ----------
+CATEGORY_MAX_RATIO = 0.05     # encode_categories: at most this many distinct values per row
+TEXT_DTYPES = ["object", "category", "string"]   # select_dtypes names; "string" covers Arrow strings
+DETECT_SAMPLE_N = int(os.environ.get("AUTOCLEAN_DETECT_SAMPLE", "1000"))   # values per column for type detection
+CARDINALITY_SAMPLE_N = 100_000   # detect_column_types: exact distinct counts up to this many rows
+CARDINALITY_SKETCH_N = 1_000_000  # ... and above that, rows fed to the HyperLogLog sketch
+
+# ---------- HELPERS ----------
+def clean_colnames(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df.columns = (
+        df.columns.str.strip()
+                  .str.lower()
+                  .str.replace(r"[^\w\s]", "", regex=True)
+                  .str.replace(r"\s+", "_", regex=True)
+    )
+    return df
+
+def is_numeric(s) -> bool:
+    """What select_dtypes(include=np.number) picks: numeric but not bool (numpy or Arrow-backed)."""
+    return pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+
+def is_categorical(s: pd.Series) -> bool:
+    return isinstance(s.dtype, pd.CategoricalDtype)
+
+def is_text(s: pd.Series) -> bool:
+    """Python-object, categorical or string (incl. Arrow string) column."""
+    return s.dtype == object or is_categorical(s) or isinstance(s.dtype, pd.StringDtype) or \
+        (isinstance(s.dtype, pd.ArrowDtype) and pd.api.types.is_string_dtype(s.dtype))
+
+# precompiled once; shared by the scalar helper and the column-at-a-time versions
+_MONEY_RE = re.compile(r"[₹$,]")
+_UNITS_PATTERN = r"\b(km/h|kmh|mph|km|m|kwh|kw|rpm|hrs|hr|s|sec|min)\b"
+_UNITS_RE = re.compile(_UNITS_PATTERN, flags=re.I)
+_DASHES = str.maketrans({"—": None, "–": None, "−": "-"})
+_NUMBER_RE = re.compile(r"-?\d+(\.\d+)?%?")
+_DATE_RE = re.compile("|".join(p for p, _ in DATE_LAYOUTS))
+_MONTH_RE = re.compile("jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec")
+
+def strip_money_percent_and_units(x: str) -> str:
+    """Remove currency, commas, percent, and simple units like km/h, mph, km, m, hrs, s."""
+    if pd.isna(x):
+        return x
+    s = str(x).strip()
+    # remove currency and commas
+    s = _MONEY_RE.sub("", s)
+    # common units (space or appended) -> remove but keep numeric sign and decimals
+    s = _UNITS_RE.sub("", s)
+    s = s.translate(_DASHES)
+    return s.strip()
+
+def _strip_python(s: pd.Series) -> pd.Series:
+    s = s.str.strip().str.replace(_MONEY_RE, "", regex=True)
+    return s.str.replace(_UNITS_RE, "", regex=True).str.translate(_DASHES).str.strip()
+
+def _strip_arrow(values: np.ndarray) -> np.ndarray:
+    """Arrow (RE2) kernels for rows that are plain ASCII once currency symbols are gone.
+
+    RE2's \\b and case folding only agree with Python's `re` on ASCII, and Arrow trims a slightly
+    different whitespace set (no \\x1c-\\x1f), so every other row is left as None for the caller.
+    """
+    arr = pa.array(values, type=pa.string())
+    out = pc.replace_substring_regex(pc.utf8_trim_whitespace(arr), pattern="[₹$,]", replacement="")
+    safe = pc.and_(pc.string_is_ascii(out),
+                   pc.invert(pc.match_substring_regex(arr, pattern="[\x1c-\x1f]")))
+    out = pc.replace_substring_regex(out, pattern="(?i)" + _UNITS_PATTERN, replacement="")
+    out = pc.utf8_trim_whitespace(out)
+    return pc.if_else(safe, out, pa.scalar(None, pa.string())).to_numpy(zero_copy_only=False)
+
+def strip_money_percent_and_units_series(series: pd.Series) -> pd.Series:
+    """Column-at-a-time strip_money_percent_and_units: same result for every value, NaN stays NaN."""
+    mask = series.notna().to_numpy()
+    values = series[mask].astype(str).to_numpy(dtype=object)
+    if pa is not None and len(values):
+        out = _strip_arrow(values)
+        rest = pd.isna(out)
+        if rest.any():
+            out[rest] = _strip_python(pd.Series(values[rest], dtype=object)).to_numpy()
+    else:
+        out = _strip_python(pd.Series(values, dtype=object)).to_numpy()
+    result = series.astype(object).copy()
+    result[mask] = out
+    return result
+
+def _as_str_series(sample_vals) -> pd.Series:
+    return pd.Series(list(sample_vals), dtype=object)
+
+def _number_mask(sample_vals) -> pd.Series:
+    s = _as_str_series(sample_vals)
+    s = s.where(s.notna() & s.astype(bool), "")  # `v or ""`
+    s = strip_money_percent_and_units_series(s)
+    return s.str.fullmatch(_NUMBER_RE).fillna(False).astype(bool)
+
+def _date_masks(sample_vals) -> Tuple[pd.Series, pd.Series]:
+    """(matches a known date layout, contains a month name such as "Jan" or "January")."""
+    s = _as_str_series(sample_vals).astype(str).str.strip()
+    return s.str.match(_DATE_RE).astype(bool), s.str.lower().str.contains(_MONTH_RE).astype(bool)
+
+def looks_like_number_sample(sample_vals: list) -> int:
+    return int(_number_mask(sample_vals).sum())
+
+def looks_like_date_sample(sample_vals: list) -> int:
+    """Simple regex-based date detection (common formats)"""
+    # one point for a known date layout, one more for a month name inside the value ("Jan", "January")
+    layout, month = _date_masks(sample_vals)
+    return int(layout.sum() + month.sum())
+
+def _wilson_lower(hits: int, n: int, z: float = 1.96) -> float:
+    """Lower end of the 95% Wilson interval for a share seen `hits` times in `n` draws."""
+    if n == 0:
+        return 0.0
+    p = hits / n
+    centre = p + z * z / (2 * n)
+    margin = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+    return float((centre - margin) / (1 + z * z / n))
+
+def detect_column_types(df: pd.DataFrame, sample_n: int = DETECT_SAMPLE_N, approx: bool = None,
+                        seed: int = 0) -> pd.DataFrame:
+    """Return a dataframe with detected types: 'numeric','date','text' with confidence metrics.
+
+    Each column is judged on `sample_n` non-null values drawn from every part of it (stratified,
+    see sketches.stratified_sample), so sorted or appended files are classified on all their
+    rows and the cost does not grow with the frame. `confidence` is the lower 95% bound on the
+    share of the column's values that fit the detected type (text: fit neither numbers nor
+    dates). unique_ratio is exact up to CARDINALITY_SAMPLE_N rows. Above that it is the distinct
+    share of a stratified sample of CARDINALITY_SKETCH_N rows, counted with HyperLogLog (about
+    1% error), so its cost is capped too. That share matches the column's for ids and for
+    columns whose values all recur within the sample; otherwise it overstates it (a rare value is
+    less likely to repeat in the sample), never understates it in expectation. approx=True/False
+    forces either.
+    """
+    rows = []
+    n_rows = len(df)
+    for col in df.columns:
+        s = df[col]
+        sample = stratified_sample(s, sample_n, seed).astype(str).tolist()
+        numbers = _number_mask(sample)
+        layout, month = _date_masks(sample)
+        numeric_like = int(numbers.sum())
+        date_like = int(layout.sum() + month.sum())
+        if approx is False or (approx is None and n_rows <= CARDINALITY_SAMPLE_N):
+            unique_ratio = s.nunique(dropna=True) / max(1, n_rows)
+        else:
+            drawn = s.iloc[stratified_positions(n_rows, CARDINALITY_SKETCH_N, seed)]
+            unique_ratio = min(HyperLogLog().update(drawn).estimate(), drawn.count()) / max(1, len(drawn))
+        dtype = str(s.dtype)
+        # Heuristics:
+        # - If dtype is numeric -> numeric
+        # - If many numeric_like and low date_like -> numeric
+        # - If many date_like and numeric_like is low -> date
+        # - Else text
+        if is_numeric(s):
+            detected = "numeric"
+        elif date_like >= max(3, len(sample)//10) and date_like > numeric_like:
+            detected = "date"
+        elif numeric_like >= max(3, len(sample)//2) and numeric_like > date_like:
+            detected = "numeric"
+        else:
+            detected = "text"
+        if is_numeric(s):
+            confidence = 1.0
+        else:
+            fits = {"numeric": numbers, "date": layout | month, "text": ~(numbers | layout | month)}[detected]
+            confidence = _wilson_lower(int(fits.sum()), len(sample))
+        rows.append({
+            "column": col,
+            "dtype_before": dtype,
+            "detected": detected,
+            "confidence": round(confidence, 3),
+            "sample_size": len(sample),
+            "numeric_like": numeric_like,
+            "date_like": date_like,
+            "unique_ratio": round(unique_ratio, 3)
+        })
+    return pd.DataFrame(rows)
+
+def auto_numeric(series: pd.Series) -> pd.Series:
+    if series.dtype in (np.int64, np.float64) or (isinstance(series.dtype, pd.ArrowDtype) and is_numeric(series)):
+        # already numeric (str() of int64/float64 round-trips exactly, so the text path would
+        # return the same values); Arrow-backed numbers keep their dtype
+        return series.copy()
+    # clean each distinct string once, then broadcast back to the rows
+    codes, uniques = pd.factorize(series.astype(str))
+    cleaned = strip_money_percent_and_units_series(pd.Series(uniques, dtype=object))
+    cleaned = cleaned.replace({"nan": None, "None": None, "": None})
+    # remove ending '%' if present
+    cleaned = cleaned.str.replace("%", "", regex=False)
+    numeric = pd.to_numeric(cleaned, errors="coerce").to_numpy()
+    return pd.Series(numeric[codes], index=series.index, name=series.name)
+
+def safe_convert_numeric(df: pd.DataFrame, cols: list, log: list, workers: int = 1) -> Tuple[pd.DataFrame, list]:
+    from .parallel import convert_columns  # parallel imports this module
+    df = df.copy()
+    converted = []
+    for col, new in convert_columns("numeric", [(c, df[c]) for c in cols], workers):
+        before_nonnull = int(df[col].notna().sum())
+        df[col] = new
+        after_nonnull = int(df[col].notna().sum())
+        converted.append((col, before_nonnull, after_nonnull))
+        log.append(f"Converted '{col}' -> numeric (non-null: {before_nonnull} -> {after_nonnull})")
+    return df, converted
+
+def safe_convert_dates(df: pd.DataFrame, cols: list, log: list, workers: int = 1) -> Tuple[pd.DataFrame, list]:
+    from .parallel import convert_columns
+    df = df.copy()
+    converted = []
+    for col, parsed in convert_columns("date", [(c, df[c]) for c in cols], workers):
+        non_null = int(parsed.notna().sum())
+        # only keep parsed column if a meaningful number parsed
+        if non_null >= max(3, int(len(df) * 0.05)):  # >=3 or >=5% of rows
+            df[col] = parsed
+            converted.append((col, non_null))
+            log.append(f"Converted '{col}' -> datetime (parsed {non_null} values)")
+        else:
+            log.append(f"Skipped converting '{col}' to datetime (parsed {non_null} out of {len(df)})")
+    return df, converted
+
+def to_category(series: pd.Series, max_ratio: float = CATEGORY_MAX_RATIO) -> Optional[pd.Series]:
+    """`series` as a Categorical (sorted categories), or None if it has too many distinct values."""
+    try:
+        codes, uniques = pd.factorize(series, sort=True)
+    except TypeError:   # mixed, unorderable values
+        codes, uniques = pd.factorize(series)
+    if len(uniques) > max_ratio * max(1, len(series)):
+        return None
+    return pd.Series(pd.Categorical.from_codes(codes, uniques), index=series.index, name=series.name)
+
+def encode_categories(df: pd.DataFrame, max_ratio: float = CATEGORY_MAX_RATIO, log: list = None,
+                      cols: list = None) -> Tuple[pd.DataFrame, list]:
+    """Store low-cardinality text columns as pandas Categoricals (codes + one copy of each value)."""
+    df = df.copy()
+    encoded = []
+    cols = df.select_dtypes(include=["object", "string"]).columns if cols is None else cols
+    for col in cols:
+        if not is_text(df[col]) or is_categorical(df[col]):
+            continue
+        cat = to_category(df[col], max_ratio)
+        if cat is None:
+            continue
+        mb_before = df[col].memory_usage(deep=True, index=False) / 2**20
+        df[col] = cat
+        encoded.append(col)
+        if log is not None:
+            log.append(f"Encoded text '{col}' as category ({len(cat.cat.categories)} values, "
+                       f"{mb_before:.1f} -> {cat.memory_usage(deep=True, index=False) / 2**20:.1f} MB)")
+    return df, encoded
+
+def category_mode(s: pd.Series, default=""):
+    """Series.mode().iloc[0] of a Categorical from its code counts (O(rows) ints, no hashing)."""
+    codes = s.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(s.cat.categories))
+    if not counts.any():
+        return default
+    return s.cat.categories[int(np.argmax(counts))]   # first max: smallest of sorted categories
+
+def safe_fillna(s: pd.Series, val) -> pd.Series:
+    """fillna that first adds `val` to a Categorical's categories when it is new."""
+    if is_categorical(s) and val not in s.cat.categories:
+        s = s.cat.add_categories([val])
+    return s.fillna(val)
+
+def standardize_series(s: pd.Series) -> pd.Series:
+    """Strip + title-case; a Categorical is standardized per category and stays categorical."""
+    if s.dtype == object:
+        return s.astype(str).str.strip().str.title()
+    if not is_categorical(s):   # pandas / Arrow string dtype: missing values stay missing
+        return s.str.strip().str.title()
+    cats, codes = s.cat.categories, s.cat.codes.to_numpy()
+    if (codes < 0).any():   # astype(str) turns missing values into "nan"
+        cats = cats.append(pd.Index(["nan"], dtype=object))
+        codes = np.where(codes < 0, len(cats) - 1, codes)
+    new = pd.Series(cats.astype(str), dtype=object).str.strip().str.title()
+    new_codes, new_cats = pd.factorize(new, sort=True)   # merges categories that now coincide
+    return pd.Series(pd.Categorical.from_codes(new_codes[codes], new_cats), index=s.index, name=s.name)
+
+def fill_missing(df: pd.DataFrame, numeric_strategy="median", cat_strategy="mode", log: list = None,
+                 approx: bool = None) -> pd.DataFrame:
+    """Median/mean/zero for numeric columns, mode for text; sketch estimates on large frames."""
+    df = df.copy()
+    approx = use_sketches(len(df), approx)
+    note = " (approx.)" if approx else ""
+    num_cols = df.select_dtypes(include=np.number).columns
+    cat_cols = df.select_dtypes(include=TEXT_DTYPES).columns
+    for col in num_cols:
+        n_missing = int(df[col].isna().sum())
+        if n_missing:
+            if numeric_strategy == "median":
+                val = sketch_series(df[col], "numeric").median() if approx else df[col].median()
+            elif numeric_strategy == "mean":
+                val = df[col].mean()
+            else:
+                val = 0
+            df[col] = df[col].fillna(val)   # chained inplace fillna is a no-op under copy-on-write
+            if log is not None:
+                log.append(f"Filled {n_missing} missing values in numeric '{col}' with {numeric_strategy}={val}{note}")
+    for col in cat_cols:
+        n_missing = int(df[col].isna().sum())
+        if n_missing:
+            if is_categorical(df[col]):   # exact and cheap from the codes
+                val, col_note = category_mode(df[col]), ""
+            else:
+                try:
+                    val = sketch_series(df[col], "text").mode() if approx else df[col].mode().iloc[0]
+                except:
+                    val = ""
+                col_note = note
+            df[col] = safe_fillna(df[col], val)
+            if log is not None:
+                log.append(f"Filled {n_missing} missing values in text '{col}' with mode='{val}'{col_note}")
+    return df
+
+def remove_duplicates(df: pd.DataFrame, log: list = None, mode: str = "exact",
+                      threshold: float = NEAR_THRESHOLD) -> Tuple[pd.DataFrame,int]:
+    """Keep the first of each group of duplicate rows; `mode` is exact, normalized or near (see dedupe)."""
+    before = len(df)
+    if mode == "exact":
+        df = df.drop_duplicates().reset_index(drop=True)
+        what = "exact duplicate rows"
+    else:
+        dedupe = Deduplicator(mode, threshold)
+        df = df[~dedupe.duplicated(df)].reset_index(drop=True)
+        what = dedupe.describe()
+    removed = before - len(df)
+    if log is not None:
+        log.append(f"Removed {removed} {what}")
+    return df, removed
+
+def flag_outliers(df: pd.DataFrame, log: list = None, approx: bool = None) -> Tuple[pd.DataFrame,list]:
+    df = df.copy()
+    added = []
+    approx = use_sketches(len(df), approx)
+    note = " (approx.)" if approx else ""
+    num_cols = df.select_dtypes(include=np.number).columns
+    for col in num_cols:
+        if approx:
+            q1, q3 = sketch_series(df[col], "numeric").quantiles([0.25, 0.75])
+        else:
+            q1 = df[col].quantile(0.25)
+            q3 = df[col].quantile(0.75)
+        iqr = q3 - q1
+        low = q1 - 1.5 * iqr
+        high = q3 + 1.5 * iqr
+        out_col = f"{col}_is_outlier"
+        df[out_col] = ((df[col] < low) | (df[col] > high)).fillna(False).astype(int)   # Arrow: NA, not False
+        added.append(out_col)
+        if log is not None:
+            log.append(f"Flagged outliers in '{col}' -> new column '{out_col}'{note}")
+    return df, added
+
+def standardize_text(df: pd.DataFrame, log: list = None) -> pd.DataFrame:
+    df = df.copy()
+    text_cols = df.select_dtypes(include=TEXT_DTYPES).columns
+    for col in text_cols:
+        before = df[col].dropna().astype(str).head(3).tolist()
+        df[col] = standardize_series(df[col])
+        after = df[col].dropna().astype(str).head(3).tolist()
+        if log is not None:
+            log.append(f"Standardized text in '{col}' (sample: {before} -> {after})")
+    return df
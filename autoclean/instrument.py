@@ -0,0 +1,99 @@
+# autoclean/instrument.py
+"""Per-step wall time, throughput and peak memory for cleaning runs.
+
+    profile = StepProfile(memory=True)
+    with profile.step("fill_missing", rows=len(df)):
+        df = fill_missing(df)
+    log.extend(profile.lines())
+
+Wall time and rows/s cost next to nothing. Peak memory comes from tracemalloc (which sees numpy
+and pandas buffers as well as Python objects); it slows allocation-heavy steps, so it is opt-in.
+tracemalloc is process-wide: steps running at the same time in other threads (other jobs) count
+towards each other's peak.
+"""
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+# ---------- CONFIG ----------
+TRACE_MEMORY = os.environ.get("AUTOCLEAN_TRACE_MEMORY", "0") == "1"
+_trace_lock = threading.Lock()
+_tracers = 0   # steps currently tracing; tracemalloc stops when the last one ends (unless started elsewhere)
+_we_started = False
+
+def _start_trace():
+    global _tracers, _we_started
+    with _trace_lock:
+        if _tracers == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _we_started = True
+        _tracers += 1
+
+def _stop_trace():
+    global _tracers, _we_started
+    with _trace_lock:
+        _tracers -= 1
+        if _tracers == 0 and _we_started:
+            tracemalloc.stop()
+            _we_started = False
+
+# ---------- PROFILE ----------
+class StepProfile:
+    """Records one dict per step: step, rows, seconds, peak_mb (None without memory)."""
+    def __init__(self, memory: bool = TRACE_MEMORY):
+        self.memory = memory
+        self.records = []
+        self._open = []   # enclosing steps, so a nested step's peak also counts for them
+
+    @contextmanager
+    def step(self, name: str, rows: int = 0):
+        """Time the block; `rows` can be set on the yielded record later, once it is known."""
+        rec = {"step": name, "rows": rows, "seconds": 0.0, "peak_mb": None}
+        if self.memory:
+            _start_trace()
+            current, peak = tracemalloc.get_traced_memory()
+            for outer in self._open:   # reset_peak below would lose the enclosing steps' peak so far
+                outer["_peak"] = max(outer["_peak"], peak - outer["_base"])
+            tracemalloc.reset_peak()
+            rec["_base"], rec["_peak"] = current, 0
+        self._open.append(rec)
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec["seconds"] = time.perf_counter() - t0
+            self._open.pop()
+            if self.memory:
+                base = rec.pop("_base")
+                peak = max(rec.pop("_peak"), tracemalloc.get_traced_memory()[1] - base)
+                rec["peak_mb"] = peak / 2**20
+                for outer in self._open:   # peaks are relative to each step's own starting point
+                    outer["_peak"] = max(outer["_peak"], base + peak - outer["_base"])
+                _stop_trace()
+        self.records.append(rec)
+
+    def skip(self, name: str, reason: str):
+        """A step that did no work (e.g. served from the cache)."""
+        self.records.append({"step": name, "rows": 0, "seconds": 0.0, "peak_mb": None, "skipped": reason})
+
+    def lines(self) -> list:
+        """One change-log line per recorded step."""
+        out = []
+        for r in self.records:
+            if r.get("skipped"):
+                out.append(f"Step timing: {r['step']} skipped ({r['skipped']})")
+                continue
+            mem = f", peak +{r['peak_mb']:.1f} MB" if r["peak_mb"] is not None else ""
+            rate = r["rows"] / max(r["seconds"], 1e-9)
+            out.append(f"Step timing: {r['step']} {r['seconds']:.2f}s ({rate:,.0f} rows/s{mem})")
+        return out
+
+    def frame(self) -> pd.DataFrame:
+        """The records as a table, with rows_per_sec."""
+        df = pd.DataFrame(self.records, columns=["step", "rows", "seconds", "peak_mb"])
+        df.insert(3, "rows_per_sec", df["rows"] / df["seconds"].clip(lower=1e-9))
+        return df
@@ -0,0 +1,149 @@
+# autoclean/jobs.py
+"""Background cleaning jobs: a process-wide worker pool, job IDs, progress and cancellation.
+
+Jobs live in this module (not in a Streamlit session), so every session shares one pool and a
+result outlives page reruns: the app only keeps the job ID. Work functions receive a
+`progress(fraction, message)` callback; once a job is cancelled that callback raises
+`JobCancelled`, which stops the work at its next progress report.
+
+Files a job writes (streamed output, exports) go in its `workdir`, a temporary directory removed
+when the job is evicted or discarded, and at interpreter exit.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------- CONFIG ----------
+MAX_WORKERS = int(os.environ.get("AUTOCLEAN_JOB_WORKERS", "2"))
+MAX_FINISHED_JOBS = int(os.environ.get("AUTOCLEAN_MAX_FINISHED_JOBS", "20"))  # results kept for reruns
+
+class JobCancelled(Exception):
+    """Raised inside a job's progress callback after the job was cancelled."""
+
+class Job:
+    def __init__(self, label: str = ""):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.status = "queued"      # queued -> running -> done | failed | cancelled
+        self.fraction = 0.0
+        self.message = "Waiting for a worker..."
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._cancel = threading.Event()
+        self._workdir = None
+        self._cleaned = False
+
+    @property
+    def workdir(self) -> str:
+        """Temporary directory for this job's files, created on first use."""
+        with _lock:
+            if self._cleaned:
+                raise RuntimeError(f"Job {self.id} was dropped; its files are gone")
+            if self._workdir is None:
+                self._workdir = tempfile.mkdtemp(prefix=f"autoclean-{self.id}-")
+            return self._workdir
+
+    def cleanup(self):
+        """Delete the job's workdir and everything in it."""
+        with _lock:
+            path, self._workdir, self._cleaned = self._workdir, None, True
+        if path is not None:
+            shutil.rmtree(path, ignore_errors=True)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def report(self, fraction: float, message: str = ""):
+        """Progress callback handed to the work function."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.fraction = min(max(float(fraction), 0.0), 1.0)
+        if message:
+            self.message = message
+
+    def cancel(self):
+        self._cancel.set()
+        if self.status == "queued":
+            self.message = "Cancelling..."
+
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="autoclean-job")
+_jobs = OrderedDict()
+_lock = threading.RLock()
+
+def _run(job: Job, fn, args, kwargs):
+    if job._cancel.is_set():
+        job.status, job.message = "cancelled", "Cancelled before start"
+    else:
+        job.status = "running"
+        try:
+            job.result = fn(*args, progress=job.report, **kwargs)
+            job.status, job.fraction, job.message = "done", 1.0, "Finished"
+        except JobCancelled:
+            job.status, job.message = "cancelled", "Cancelled"
+        except Exception as e:  # surfaced to the UI instead of killing the worker
+            job.status, job.error, job.message = "failed", e, f"Failed: {e}"
+    job.finished = time.time()
+    with _lock:
+        dropped = job.id not in _jobs   # discarded while running
+    if dropped:
+        job.cleanup()
+    _evict()
+
+def _evict():
+    with _lock:
+        finished = [jid for jid, j in _jobs.items() if not j.active]
+        evicted = [_jobs.pop(jid) for jid in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]]
+    for job in evicted:
+        job.cleanup()
+
+def submit(fn, *args, label: str = "", scratch: bool = False, **kwargs) -> str:
+    """Queue `fn(*args, progress=..., **kwargs)` on the worker pool and return its job ID.
+
+    With `scratch`, `fn` also gets `workdir=`, the job's temporary directory.
+    """
+    job = Job(label)
+    if scratch:
+        kwargs["workdir"] = job.workdir
+    with _lock:
+        _jobs[job.id] = job
+    _pool.submit(_run, job, fn, args, kwargs)
+    return job.id
+
+def discard(job_id: str):
+    """Forget a job (e.g. replaced by a newer run): cancel it if active, delete its files."""
+    with _lock:
+        job = _jobs.pop(job_id, None)
+    if job is None:
+        return
+    if job.active:
+        job.cancel()   # _run deletes the files once the work stops
+    else:
+        job.cleanup()
+
+@atexit.register
+def _cleanup_all():
+    with _lock:
+        remaining = list(_jobs.values())
+    for job in remaining:
+        job.cleanup()
+
+def get_job(job_id: str):
+    """The Job for `job_id`, or None if unknown or already evicted."""
+    with _lock:
+        return _jobs.get(job_id)
+
+def cancel(job_id: str) -> bool:
+    job = get_job(job_id)
+    if job is None or not job.active:
+        return False
+    job.cancel()
+    return True
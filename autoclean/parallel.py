@@ -0,0 +1,81 @@
+# autoclean/parallel.py
+"""Column-parallel numeric/date conversion over a process pool.
+
+Each task receives one column (a pickled Series), never the whole frame, and returns the
+converted column. Callers keep their own loop for logging and decisions, so results and log
+lines are identical to the serial path.
+
+All jobs share one fixed-size pool that is never shut down while the process runs; a job's
+`workers` caps how many of its columns are in flight at once, not the pool size.
+"""
+import multiprocessing
+import os
+import threading
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .dates import parse_date_column
+from .helpers import auto_numeric
+
+# ---------- CONFIG ----------
+DEFAULT_WORKERS = int(os.environ.get("AUTOCLEAN_CONVERT_WORKERS", "1"))
+POOL_WORKERS = os.cpu_count() or 4   # shared pool size; processes are spawned as work arrives
+PARALLEL_MIN_ROWS = 50_000  # below this, pickling a column costs more than converting it
+
+_CONVERTERS = {"numeric": auto_numeric, "date": parse_date_column}
+_pool = None
+_pool_lock = threading.Lock()
+
+def _convert(kind: str, series: pd.Series, fmt: str = None) -> pd.Series:
+    if fmt is not None:
+        return _CONVERTERS[kind](series, fmt)
+    return _CONVERTERS[kind](series)
+
+def _get_pool() -> ProcessPoolExecutor:
+    """The shared long-lived pool, created on first use.
+
+    "spawn" rather than fork: the Streamlit server is multi-threaded, and forking it is unsafe.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _results(pool: ProcessPoolExecutor, kind: str, columns: list, workers: int, formats: dict):
+    """Keep up to `workers` columns submitted; yield results in column order as the oldest completes."""
+    pending = iter(columns)
+    futures = deque()
+
+    def submit(n: int):
+        for name, series in islice(pending, n):
+            futures.append((name, pool.submit(_convert, kind, series, formats.get(name))))
+
+    try:
+        submit(workers)
+        while futures:
+            name, fut = futures.popleft()
+            result = fut.result()
+            submit(1)
+            yield name, result
+    finally:
+        for _, fut in futures:  # e.g. the job was cancelled mid-way
+            fut.cancel()
+
+def convert_columns(kind: str, columns: list, workers: int = None, formats: dict = None):
+    """Iterator of `(name, converted)` for each `(name, series)`, in order; `kind` is "numeric" or "date".
+
+    `formats` optionally pins a date column's strptime format by name (see dates.infer_date_format).
+    With `workers` > 1 and enough rows, up to `workers` columns at a time run on the shared
+    process pool and results are collected in order; otherwise columns are converted lazily,
+    one after another.
+    """
+    workers = DEFAULT_WORKERS if workers is None else workers
+    formats = formats or {}
+    rows = max((len(s) for _, s in columns), default=0)
+    if workers <= 1 or len(columns) < 2 or rows < PARALLEL_MIN_ROWS:
+        return ((name, _convert(kind, series, formats.get(name))) for name, series in columns)
+    return _results(_get_pool(), kind, list(columns), workers, formats)
@@ -0,0 +1,311 @@
+# autoclean/plan.py
+"""Fused cleaning plan: every selected step applied column by column in a single pass.
+
+The step-by-step helpers each copy the whole frame; `run_plan` instead carries one Series per
+column through conversion, categorical encoding and filling, removes duplicate rows once, then
+flags outliers and standardizes text, and builds the output frame at the end. Log lines and
+results match running the helpers in the app's order:
+numeric -> dates -> categories -> fill -> dedupe -> outliers -> text.
+"""
+import pandas as pd
+import numpy as np
+from contextlib import nullcontext
+
+from .helpers import (
+    CATEGORY_MAX_RATIO, category_mode, clean_colnames, is_categorical, is_numeric, is_text, safe_fillna,
+    standardize_series, to_category,
+)
+from .cache import CACHE, ResultCache
+from .dedupe import NEAR_THRESHOLD, Deduplicator
+from .instrument import StepProfile
+from .parallel import convert_columns
+from .sketches import sketch_series, use_sketches
+
+STEP_KEYS = ["clean_names", "convert_numeric", "convert_dates", "encode_categories", "fill_missing",
+             "remove_dupes", "flag_outliers", "standardize_text"]
+
+def build_plan(df: pd.DataFrame, steps: dict, override_cols: dict, det_df: pd.DataFrame,
+               numeric_strategy: str = "median", workers: int = 1, approx: bool = None,
+               category_ratio: float = CATEGORY_MAX_RATIO, dedupe_mode: str = "exact",
+               near_threshold: float = NEAR_THRESHOLD) -> dict:
+    """Resolve checkbox selections and per-column overrides into an execution plan.
+
+    `override_cols` maps original column names to "auto"/"numeric"/"date"/"text"; "auto" uses
+    `det_df` (output of detect_column_types) and falls back to the column dtype.
+    Only column names and dtypes of `df` are read. `workers` > 1 converts numeric and date
+    columns in parallel worker processes. `approx` uses sketches for medians, modes and IQR
+    bounds (None: only on frames of sketches.APPROX_MIN_ROWS rows or more). With the
+    encode_categories step, text columns with at most `category_ratio` distinct values per row
+    become Categoricals, so filling and standardizing work on the categories. `dedupe_mode`
+    (exact, normalized or near, see dedupe.DEDUPE_MODES) and `near_threshold` pick what
+    remove_dupes treats as a duplicate row.
+    """
+    before_cols = df.columns.tolist()
+    rename = {}
+    if steps.get("clean_names"):
+        after_cols = clean_colnames(df.head(0)).columns.tolist()
+        rename = dict(zip(before_cols, after_cols))
+    dtypes = {rename.get(c, c): df[c].dtype for c in before_cols}
+
+    numeric_cols, date_cols, text_cols = [], [], []
+    for old_col, choice in override_cols.items():
+        col = rename.get(old_col, old_col)
+        if choice == "auto":
+            det_row = det_df[det_df['column'] == col]
+            if not det_row.empty:
+                choice = det_row.iloc[0]['detected']
+            else:
+                choice = "numeric" if is_numeric(dtypes[col]) else "text"
+        if choice == "numeric":
+            numeric_cols.append(col)
+        elif choice == "date":
+            date_cols.append(col)
+        else:
+            text_cols.append(col)
+
+    return {
+        "steps": {k: bool(steps.get(k)) for k in STEP_KEYS},
+        "rename": rename,
+        "numeric_cols": numeric_cols if steps.get("convert_numeric") else [],
+        "date_cols": date_cols if steps.get("convert_dates") else [],
+        "text_cols": text_cols,
+        "numeric_strategy": numeric_strategy,
+        "workers": workers,
+        "approx": approx,
+        "category_ratio": category_ratio,
+        "dedupe_mode": dedupe_mode,
+        "near_threshold": near_threshold,
+    }
+
+def _fill_value(s: pd.Series, kind: str, strategy: str, approx: bool):
+    if kind == "numeric":
+        if strategy == "median":
+            return sketch_series(s, "numeric").median() if approx else s.median()
+        if strategy == "mean":
+            return s.mean()
+        return 0
+    if is_categorical(s):
+        return category_mode(s)
+    try:
+        return sketch_series(s, "text").mode() if approx else s.mode().iloc[0]
+    except Exception:
+        return ""
+
+def _duplicated(columns: list) -> np.ndarray:
+    """Row-duplicate mask over a list of Series (keep first), NaNs equal: DataFrame.duplicated()."""
+    n = len(columns[0]) if columns else 0
+    ids = np.zeros(n, dtype="int64")
+    card = 1
+    for s in columns:
+        codes, uniques = pd.factorize(s)
+        k = len(uniques) + 1            # code 0 is reserved for NaN
+        if card * k >= 2 ** 62:         # keep the combined key in int64: re-number what we have
+            ids, seen = pd.factorize(ids)
+            card = len(seen)
+        ids = ids * k + (codes + 1)
+        card *= k
+    return pd.Series(ids).duplicated().to_numpy()
+
+def _no_progress(fraction: float, message: str = ""):
+    pass
+
+def _conversions(kind: str, items: list, workers: int, cache, tally: dict):
+    """Iterator of `(name, converted)` for `items` = [(cache key, name, series)], in order.
+
+    Cached columns come from `cache`; the rest are submitted right away (in parallel when
+    `workers` > 1) and stored once converted.
+    """
+    cached = {name: cache.get(key, tally) for key, name, _ in items} if cache is not None else {}
+    computed = convert_columns(kind, [(name, s) for _, name, s in items if cached.get(name) is None], workers)
+
+    def results():
+        for key, name, _ in items:
+            out = cached.get(name)
+            if out is None:
+                out = next(computed)[1]
+                if cache is not None:
+                    cache.put(key, out)
+            yield name, out
+    return results()
+
+def _pass1(df: pd.DataFrame, plan: dict, approx: bool, logs: dict, progress, n_units: int,
+           cache, cache_key, tally: dict) -> dict:
+    """Conversion, categorical encoding and filling, one column at a time: {name: Series}."""
+    steps = plan["steps"]
+    numeric_cols = set(plan["numeric_cols"])
+    date_cols = set(plan["date_cols"])
+    n_rows = len(df)
+    note = " (approx.)" if approx else ""
+    # conversions are submitted up front (in parallel when plan["workers"] > 1), consumed in column order
+    renamed = [(plan["rename"].get(c, c), c) for c in df.columns]
+    workers = plan.get("workers", 1)
+    numeric_iter = _conversions("numeric", [((cache_key, "numeric", old), new, df[old])
+                                            for new, old in renamed if new in numeric_cols], workers, cache, tally)
+    date_iter = _conversions("date", [((cache_key, "date", old), new, df[old])
+                                      for new, old in renamed if new in date_cols], workers, cache, tally)
+    cols = {}
+    for i, old_col in enumerate(df.columns):
+        col = plan["rename"].get(old_col, old_col)
+        progress(i / n_units, f"Converting / filling '{col}' ({i + 1}/{len(df.columns)})")
+        s = df[old_col]
+        if col in numeric_cols:
+            before_nonnull = int(s.notna().sum())
+            s = next(numeric_iter)[1]
+            logs["numeric"].append(f"Converted '{col}' -> numeric (non-null: {before_nonnull} -> {int(s.notna().sum())})")
+        if col in date_cols:
+            parsed = next(date_iter)[1]
+            non_null = int(parsed.notna().sum())
+            if non_null >= max(3, int(n_rows * 0.05)):  # >=3 or >=5% of rows
+                s = parsed
+                logs["date"].append(f"Converted '{col}' -> datetime (parsed {non_null} values)")
+            else:
+                logs["date"].append(f"Skipped converting '{col}' to datetime (parsed {non_null} out of {n_rows})")
+        if steps["encode_categories"] and is_text(s) and not is_categorical(s):
+            cat = to_category(s, plan.get("category_ratio", CATEGORY_MAX_RATIO))
+            if cat is not None:
+                mb_before = s.memory_usage(deep=True, index=False) / 2**20
+                s = cat
+                logs["category"].append(f"Encoded text '{col}' as category ({len(s.cat.categories)} values, "
+                                        f"{mb_before:.1f} -> {s.memory_usage(deep=True, index=False) / 2**20:.1f} MB)")
+        if steps["fill_missing"]:
+            kind = "numeric" if is_numeric(s) else ("text" if is_text(s) else None)
+            n_missing = int(s.isna().sum()) if kind else 0
+            if n_missing:
+                val = _fill_value(s, kind, plan["numeric_strategy"], approx)
+                if kind == "numeric":
+                    s = s.fillna(val)
+                    logs["fill_num"].append(f"Filled {n_missing} missing values in numeric '{col}' with {plan['numeric_strategy']}={val}{note}")
+                else:
+                    col_note = "" if is_categorical(s) else note   # category modes are exact
+                    s = safe_fillna(s, val)
+                    logs["fill_text"].append(f"Filled {n_missing} missing values in text '{col}' with mode='{val}'{col_note}")
+        cols[col] = s
+    return cols
+
+def _dedupe(cols: dict, index: pd.Index, logs: dict, mode: str = "exact",
+            threshold: float = NEAR_THRESHOLD) -> tuple:
+    """Drop duplicate rows (the only step that needs whole rows): (cols, new index)."""
+    if mode == "exact":
+        dup = _duplicated(list(cols.values()))
+        what = "exact duplicate rows"
+    else:
+        dedupe = Deduplicator(mode, threshold)
+        dup = dedupe.duplicated(pd.DataFrame(cols, index=index))
+        what = dedupe.describe()
+    removed = int(dup.sum())
+    if removed:
+        keep = ~dup
+        cols = {c: s[keep] for c, s in cols.items()}
+    index = pd.RangeIndex(len(index) - removed)
+    cols = {c: s.set_axis(index) for c, s in cols.items()}
+    logs["dedupe"].append(f"Removed {removed} {what}")
+    return cols, index
+
+def _pass2(cols: dict, steps: dict, approx: bool, logs: dict, progress, n_units: int) -> dict:
+    """Outlier flags and text standardization, one column at a time: {name: Series} incl. flags."""
+    note = " (approx.)" if approx else ""
+    cols = dict(cols)
+    flags = {}
+    for i, (col, s) in enumerate(list(cols.items())):
+        progress((len(cols) + 1 + i) / n_units, f"Outliers / text in '{col}' ({i + 1}/{len(cols)})")
+        if steps["flag_outliers"] and is_numeric(s):
+            if approx:
+                q1, q3 = sketch_series(s, "numeric").quantiles([0.25, 0.75])
+            else:
+                q1 = s.quantile(0.25)
+                q3 = s.quantile(0.75)
+            iqr = q3 - q1
+            low = q1 - 1.5 * iqr
+            high = q3 + 1.5 * iqr
+            out_col = f"{col}_is_outlier"
+            flags[out_col] = ((s < low) | (s > high)).fillna(False).astype(int)
+            logs["outliers"].append(f"Flagged outliers in '{col}' -> new column '{out_col}'{note}")
+        if steps["standardize_text"] and is_text(s):
+            before = s.dropna().astype(str).head(3).tolist()
+            s = standardize_series(s)
+            cols[col] = s
+            logs["text"].append(f"Standardized text in '{col}' (sample: {before} -> {s.head(3).tolist()})")
+    cols.update(flags)
+    return cols
+
+_STAGE_NAMES = {"pass1": "convert / encode / fill", "dedupe": "remove duplicates",
+                "pass2": "outliers / standardize text"}
+_STAGE_LOGS = {"pass1": ["numeric", "date", "category", "fill_num", "fill_text"], "dedupe": ["dedupe"],
+               "pass2": ["outliers", "text"]}
+
+def run_plan(df: pd.DataFrame, plan: dict, log: list, progress=None, cache_key: str = None,
+             cache: ResultCache = None, profile: StepProfile = None) -> pd.DataFrame:
+    """Apply a plan from `build_plan` to `df` and return the cleaned frame. `df` is not modified.
+
+    `progress(fraction, message)` is called before each column of each pass. `cache_key`, a
+    content hash of `df` (cache.content_key of its file, or cache.frame_key), turns on the
+    result cache (`cache`, default the shared cache.CACHE): converted columns and the output of
+    pass 1, dedupe and pass 2 are stored under their step parameters, so a rerun where only a
+    later step changed starts from the cached earlier stages. Hit/miss counts go to `log`.
+    `profile` (instrument.StepProfile) times each stage that runs; its lines are added to `log`.
+    """
+    progress = progress or _no_progress
+    steps = plan["steps"]
+    approx = use_sketches(len(df), plan.get("approx"))
+    logs = {k: [] for bucket in _STAGE_LOGS.values() for k in bucket}
+    n_units = 2 * len(df.columns) + 1
+    cache = (CACHE if cache is None else cache) if cache_key else None
+    tally = {"hits": 0, "misses": 0}
+
+    def timed(name: str, rows: int):
+        return profile.step(_STAGE_NAMES[name], rows) if profile is not None else nullcontext()
+
+    # each stage's key extends the previous one with the parameters that stage reads
+    keys = {"pass1": (cache_key, "pass1", tuple(df.columns), tuple(plan["rename"].items()),
+                      tuple(plan["numeric_cols"]), tuple(plan["date_cols"]), steps["encode_categories"],
+                      plan.get("category_ratio", CATEGORY_MAX_RATIO), steps["fill_missing"],
+                      plan["numeric_strategy"], approx)}
+    keys["dedupe"] = keys["pass1"] + ("dedupe", steps["remove_dupes"], plan.get("dedupe_mode", "exact"),
+                                      plan.get("near_threshold", NEAR_THRESHOLD))
+    keys["pass2"] = keys["dedupe"] + ("pass2", steps["flag_outliers"], steps["standardize_text"])
+
+    def stage(name: str, compute):
+        """Cached (result, stage log lines) for `name`; runs `compute()` on a miss."""
+        hit = cache.get(keys[name], tally) if cache is not None else None
+        if hit is not None:
+            if profile is not None:
+                profile.skip(_STAGE_NAMES[name], "cached")
+            result, lines = hit
+            for k, v in lines.items():
+                logs[k].extend(v)
+            return result
+        result = compute()
+        if cache is not None:   # a hit skips the earlier stages too, so keep their lines as well
+            upto = list(_STAGE_LOGS)[:list(_STAGE_LOGS).index(name) + 1]
+            cache.put(keys[name], (result, {k: list(logs[k]) for st_ in upto for k in _STAGE_LOGS[st_]}))
+        return result
+
+    # the latest cached stage is enough: earlier stages are only computed when it misses
+    def run_pass1():
+        def compute():
+            with timed("pass1", len(df)):
+                return _pass1(df, plan, approx, logs, progress, n_units, cache, cache_key, tally)
+        return stage("pass1", compute)
+
+    def run_dedupe():
+        cols = run_pass1()
+        if not steps["remove_dupes"]:
+            return cols, df.index
+        progress(len(cols) / n_units, "Removing duplicate rows")
+        with timed("dedupe", len(df)):
+            return _dedupe(cols, df.index, logs, plan.get("dedupe_mode", "exact"),
+                           plan.get("near_threshold", NEAR_THRESHOLD))
+
+    def run_pass2():
+        cols, index = stage("dedupe", run_dedupe)
+        with timed("pass2", len(index)):
+            return _pass2(cols, steps, approx, logs, progress, n_units), index
+
+    cols, index = stage("pass2", run_pass2)
+    for key in logs:
+        log.extend(logs[key])
+    if profile is not None:
+        log.extend(profile.lines())
+    if cache is not None:
+        log.append(cache.summary(tally))
+    return pd.DataFrame(cols, index=index)
@@ -0,0 +1,310 @@
+# autoclean/sketches.py
+"""Mergeable column-statistics sketches: quantiles, heavy hitters (mode) and cardinality.
+
+Every sketch is updated a chunk at a time with `update(...)`, combined across chunks or worker
+processes with `merge(other)`, and uses memory set by its error bound rather than the data size:
+
+  QuantileSketch(eps)   rank error about eps * n for any quantile (median, IQR bounds)
+  HeavyHitters(eps)     counts under-estimated by at most eps * n; exact while uniques <= 1/eps
+  HyperLogLog(rel_err)  distinct count within about rel_err (one standard error)
+
+The cleaning helpers switch to these instead of exact full-column passes once a column has
+APPROX_MIN_ROWS rows (or when asked with approx=True). Type detection reads a fixed-size
+stratified sample for its type votes (stratified_sample), and counts distinct values with a
+HyperLogLog over the whole column: a sample estimator (sample_nunique) can be off by a large
+factor on skewed columns.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+# ---------- CONFIG ----------
+APPROX_MIN_ROWS = int(os.environ.get("AUTOCLEAN_APPROX_MIN_ROWS", "2000000"))
+DEFAULT_QUANTILE_EPS = 0.005
+DEFAULT_HEAVY_HITTER_EPS = 0.0005
+DEFAULT_CARDINALITY_ERROR = 0.01
+
+def use_sketches(n_rows: int, approx=None) -> bool:
+    """approx=None decides by size; True/False forces sketches on/off."""
+    return n_rows >= APPROX_MIN_ROWS if approx is None else bool(approx)
+
+# ---------- QUANTILES ----------
+class QuantileSketch:
+    """Randomized compactor sketch (KLL/MRL family) over float values.
+
+    Level h holds items of weight 2**h. A level that outgrows `k` items is sorted and every
+    other item (random offset) moves up a level, which keeps the total weight exact and adds
+    at most one item-weight of rank error per compaction.
+    """
+    def __init__(self, eps: float = DEFAULT_QUANTILE_EPS, seed: int = 0):
+        self.eps = eps
+        self.k = max(16, int(math.ceil(2.0 / eps)))
+        self.levels = [np.empty(0, dtype="float64")]
+        self.n = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values) -> "QuantileSketch":
+        vals = np.asarray(values, dtype="float64")
+        vals = vals[~np.isnan(vals)]
+        if len(vals):
+            self.n += len(vals)
+            self.levels[0] = np.concatenate([self.levels[0], vals])
+            self._compact()
+        return self
+
+    def update_repeated(self, value: float, count: int) -> "QuantileSketch":
+        """Add `value` `count` times without materializing the repeats (binary weights)."""
+        if count <= 0 or np.isnan(value):
+            return self
+        self.n += count
+        h = 0
+        while count:
+            if count & 1:
+                self._level(h)
+                self.levels[h] = np.append(self.levels[h], value)
+            count >>= 1
+            h += 1
+        self._compact()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        for h, items in enumerate(other.levels):
+            self._level(h)
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compact()
+        return self
+
+    def _level(self, h: int):
+        while len(self.levels) <= h:
+            self.levels.append(np.empty(0, dtype="float64"))
+
+    def _compact(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                keep_one = len(items) % 2          # odd item stays at this level
+                rest = items[keep_one:]
+                promoted = rest[self._rng.integers(2)::2]
+                self.levels[h] = items[:keep_one]
+                self._level(h + 1)
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantiles(self, qs) -> np.ndarray:
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lv), 2 ** h, dtype="float64") for h, lv in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, np.asarray(qs, dtype="float64") * cum[-1], side="left")
+        return items[np.minimum(idx, len(items) - 1)]
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+# ---------- HEAVY HITTERS ----------
+class HeavyHitters:
+    """Misra-Gries summary with batched updates: keeps at most ceil(1/eps) counters."""
+    def __init__(self, eps: float = DEFAULT_HEAVY_HITTER_EPS):
+        self.eps = eps
+        self.k = int(math.ceil(1.0 / eps))
+        self.counts = pd.Series(dtype="int64")
+        self.n = 0
+        self.error = 0   # every count is within [true - error, true]
+
+    def update(self, series: pd.Series) -> "HeavyHitters":
+        counts = series.value_counts(dropna=True)
+        return self._add(counts[counts > 0], int(series.notna().sum()))   # Categoricals list unseen categories
+
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        self.error += other.error
+        return self._add(other.counts, other.n)
+
+    def _add(self, counts: pd.Series, n: int) -> "HeavyHitters":
+        self.n += n
+        if len(counts):
+            self.counts = counts.astype("int64") if self.counts.empty else \
+                self.counts.add(counts, fill_value=0).astype("int64")
+        if len(self.counts) > self.k:
+            cut = int(np.partition(self.counts.to_numpy(), -(self.k + 1))[-(self.k + 1)])
+            self.counts = self.counts[self.counts > cut] - cut
+            self.error += cut
+        return self
+
+    def top(self, n: int = 10) -> pd.Series:
+        return self.counts.sort_values(ascending=False).head(n)
+
+    def mode(self, default=""):
+        """Most frequent value; ties go to the smallest value, like Series.mode().iloc[0]."""
+        if self.counts.empty:
+            return default
+        best = self.counts[self.counts == self.counts.max()]
+        try:
+            return sorted(best.index)[0]
+        except TypeError:   # mixed, unorderable values
+            return best.index[0]
+
+# ---------- CARDINALITY ----------
+def _hash_values(values) -> np.ndarray:
+    s = pd.Series(values)
+    s = s[s.notna()]
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        s = s.astype("float64")      # 1 and 1.0 are the same value for nunique
+    # categorize=False: same hashes, but no factorize pass (slow on high-cardinality object columns)
+    return pd.util.hash_array(s.to_numpy(), categorize=False)
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Bit length of each uint64, via the float exponent (exact: values are cut below 2**53 first)."""
+    hi = x >> np.uint64(11)
+    big = hi > 0
+    n = np.frexp(np.where(big, hi, x).astype("float64"))[1].astype("int64")
+    return np.where(big, n + 11, n)
+
+class HyperLogLog:
+    """HyperLogLog distinct counter over 64-bit value hashes."""
+    def __init__(self, rel_error: float = DEFAULT_CARDINALITY_ERROR):
+        self.p = min(18, max(4, int(math.ceil(math.log2((1.04 / rel_error) ** 2)))))
+        self.m = 1 << self.p
+        self.registers = np.zeros(self.m, dtype="uint8")
+
+    def update(self, values) -> "HyperLogLog":
+        h = _hash_values(values)
+        if len(h):
+            idx = (h >> np.uint64(64 - self.p)).astype("int64")
+            rest = h & np.uint64((1 << (64 - self.p)) - 1)
+            rho = ((64 - self.p) - _bit_length(rest) + 1).astype("uint8")
+            np.maximum.at(self.registers, idx, rho)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype("int64"))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)   # linear counting for small cardinalities
+        return raw
+
+# ---------- PER-COLUMN BUNDLE ----------
+class ColumnSketch:
+    """Everything the cleaning steps need about one column, in bounded memory.
+
+    Numeric columns get quantiles/mean; text columns get heavy hitters (mode); both get a
+    distinct-count estimate and missing/non-null counts.
+    """
+    def __init__(self, kind: str, quantile_eps: float = DEFAULT_QUANTILE_EPS,
+                 heavy_hitter_eps: float = DEFAULT_HEAVY_HITTER_EPS,
+                 cardinality_error: float = DEFAULT_CARDINALITY_ERROR):
+        self.kind = kind          # "numeric" or "text"
+        self.missing = 0
+        self.count = 0
+        self.total = 0.0
+        self.quantile_sketch = QuantileSketch(quantile_eps) if kind == "numeric" else None
+        self.heavy_hitters = HeavyHitters(heavy_hitter_eps) if kind == "text" else None
+        self.distinct = HyperLogLog(cardinality_error)
+
+    def update(self, s: pd.Series) -> "ColumnSketch":
+        self.missing += int(s.isna().sum())
+        if self.kind == "numeric":
+            vals = s.dropna().to_numpy(dtype="float64")
+            self.count += len(vals)
+            self.total += float(vals.sum())
+            self.quantile_sketch.update(vals)
+        else:
+            self.count += int(s.notna().sum())
+            self.heavy_hitters.update(s)
+        self.distinct.update(s)
+        return self
+
+    def merge(self, other: "ColumnSketch") -> "ColumnSketch":
+        self.missing += other.missing
+        self.count += other.count
+        self.total += other.total
+        if self.quantile_sketch is not None:
+            self.quantile_sketch.merge(other.quantile_sketch)
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.merge(other.heavy_hitters)
+        self.distinct.merge(other.distinct)
+        return self
+
+    def add_repeated(self, value: float, count: int):
+        """Account for `count` filled-in copies of `value` (numeric columns)."""
+        self.quantile_sketch.update_repeated(value, count)
+
+    def median(self) -> float:
+        return self.quantile_sketch.quantile(0.5)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else np.nan
+
+    def quantiles(self, qs) -> np.ndarray:
+        return self.quantile_sketch.quantiles(qs)
+
+    def mode(self, default=""):
+        return self.heavy_hitters.mode(default)
+
+    def nunique(self) -> int:
+        return int(round(self.distinct.estimate()))
+
+def sketch_series(s: pd.Series, kind: str = None, chunk_rows: int = 1_000_000) -> ColumnSketch:
+    """ColumnSketch of an in-memory column, fed in slices so no full sorted copy is made."""
+    if kind is None:
+        numeric = pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+        kind = "numeric" if numeric else "text"
+    sk = ColumnSketch(kind)
+    for start in range(0, len(s), chunk_rows):
+        sk.update(s.iloc[start:start + chunk_rows])
+    return sk
+
+# ---------- SAMPLES ----------
+def stratified_positions(n: int, k: int, seed: int = 0) -> np.ndarray:
+    """Sorted row positions, one drawn at random from each of `k` equal slices of range(n).
+
+    Every part of the input is represented however it is ordered (sorted, appended files);
+    all of range(n) when k >= n. Seeded, so the same input gives the same sample.
+    """
+    if k >= n:
+        return np.arange(n)
+    edges = np.linspace(0, n, k + 1)
+    rng = np.random.default_rng(seed)
+    pos = (edges[:-1] + rng.random(k) * np.diff(edges)).astype("int64")
+    return np.unique(np.minimum(pos, n - 1))
+
+def stratified_sample(s: pd.Series, k: int, seed: int = 0) -> pd.Series:
+    """About `k` non-null values of `s` spread over the whole column (see stratified_positions).
+
+    Mostly-empty columns are sampled among their non-null rows, so the sample does not shrink
+    to the few values that happen to fall on the drawn positions.
+    """
+    sample = s.iloc[stratified_positions(len(s), k, seed)].dropna()
+    if len(sample) < k // 2 and len(s) > k:
+        present = np.flatnonzero(s.notna().to_numpy())
+        sample = s.iloc[present[stratified_positions(len(present), k, seed)]]
+    return sample
+
+def sample_nunique(sample: pd.Series, n_rows: int) -> float:
+    """Distinct values in a column of `n_rows` non-null rows, estimated from a uniform `sample`.
+
+    Haas et al.'s Duj1 estimator, d / (1 - (1 - q) * f1 / n) with q the sampled fraction, d the
+    sample's distinct values and f1 those seen once: all-repeated samples give d, all-singleton
+    samples scale up to n_rows (id columns). Cost depends on the sample size only.
+    """
+    n = len(sample)
+    if n == 0:
+        return 0.0
+    counts = sample.value_counts(dropna=True)
+    d, f1 = len(counts), int((counts == 1).sum())
+    q = min(1.0, n / max(n_rows, 1))
+    denom = 1 - (1 - q) * f1 / n
+    est = d / denom if denom > 0 else float(n_rows)
+    return float(min(max(est, d), max(n_rows, d)))
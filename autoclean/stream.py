@@ -0,0 +1,416 @@
+# autoclean/stream.py
+"""Chunked streaming pipeline: clean CSVs larger than memory, one chunk at a time.
+
+The source is read in several passes:
+  1. schema pass  - settle one dtype per column across all chunks (what a full read would infer)
+  2. stats pass   - whole-file counts and statistics: date parse counts, fill values, IQR bounds
+  3. bounds pass  - only with both dedupe and outliers selected: IQR bounds over deduplicated rows
+  4. write pass   - apply every step to each chunk and append it to the output
+Peak memory is bounded by the chunk size plus the per-column statistics (non-null values of
+numeric columns when a median or quantiles are needed, value counts for text columns).
+"""
+import pandas as pd
+import numpy as np
+from collections import Counter
+from typing import Iterator
+
+from .dates import infer_date_format
+from .dedupe import NEAR_THRESHOLD, Deduplicator
+from .instrument import StepProfile
+from .excel import iter_excel_chunks
+from .formats import ChunkWriter, file_format, iter_arrow_chunks
+from .helpers import CATEGORY_MAX_RATIO, TEXT_DTYPES, clean_colnames, safe_fillna, standardize_text, to_category
+from .parallel import convert_columns
+from .sketches import ColumnSketch, use_sketches
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# ---------- READING ----------
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+def iter_chunks(source, chunksize: int = DEFAULT_CHUNKSIZE, dtype: dict = None, sheet=None) -> Iterator[pd.DataFrame]:
+    """Yield DataFrames of at most `chunksize` rows from a CSV/XLSX/Parquet/Arrow path or file-like object.
+
+    Excel rows are streamed from `sheet` (default: the first sheet) in openpyxl's read-only mode.
+    Parquet and Arrow files keep their own column types; `dtype` only widens integer columns
+    that have nulls in some chunks to float64, as a full read would.
+    """
+    _rewind(source)
+    fmt = file_format(source)
+    if fmt in ("parquet", "arrow"):
+        for chunk in iter_arrow_chunks(source, chunksize):
+            widen = {c: t for c, t in (dtype or {}).items() if t == "float64" and chunk[c].dtype == "int64"}
+            yield chunk.astype(widen) if widen else chunk
+        return
+    if fmt == "excel":
+        yield from iter_excel_chunks(source, chunksize, sheet, dtype)
+        return
+    with pd.read_csv(source, chunksize=chunksize, dtype=dtype) as reader:
+        for chunk in reader:
+            yield chunk
+
+def sample_rows(source, n: int, chunksize: int = DEFAULT_CHUNKSIZE, sheet=None, seed: int = 0) -> pd.DataFrame:
+    """A uniform random sample of `n` rows from the whole source, in file order (one pass).
+
+    Reservoir sampling by random keys: every row draws a key and the `n` smallest keys seen so
+    far are kept, so memory stays at `n` rows plus one chunk whatever the file size.
+    """
+    rng = np.random.default_rng(seed)
+    sample, keys, rows = None, np.empty(0), 0
+    for chunk in iter_chunks(source, chunksize, sheet=sheet):
+        chunk_keys = rng.random(len(chunk))
+        take = chunk_keys < (keys.max() if len(keys) >= n else 1.0)
+        part = chunk[take].set_axis(np.flatnonzero(take) + rows)   # index: row number in the file
+        if sample is None:
+            sample = part
+        elif len(part):
+            sample = pd.concat([sample, part])
+        keys = np.concatenate([keys, chunk_keys[take]])
+        if len(keys) > n:
+            best = np.argpartition(keys, n - 1)[:n]
+            sample, keys = sample.iloc[best], keys[best]
+        rows += len(chunk)
+    if sample is None:
+        return pd.DataFrame()
+    return sample.sort_index().reset_index(drop=True)
+
+def _merge_dtype(a: str, b: str) -> str:
+    if a is None or a == b:
+        return b
+    if "object" in (a, b):
+        return "object"
+    if {a, b} <= {"int64", "float64"}:
+        return "float64"
+    return "object"
+
+def infer_schema(source, chunksize: int = DEFAULT_CHUNKSIZE, sheet=None) -> dict:
+    """Dtype per column that a single full read would have produced, as a `dtype=` mapping.
+
+    Text columns map to `str` so a column that looks numeric in one chunk but not in another
+    keeps its original strings (e.g. "1.50" stays "1.50").
+    """
+    return _scan_schema(source, chunksize, _no_progress, sheet)[0]
+
+def _no_progress(fraction: float, message: str = ""):
+    pass
+
+def _scan_schema(source, chunksize: int, progress, sheet=None) -> tuple:
+    """(schema, number of chunks)."""
+    kinds = {}
+    n_chunks = 0
+    for chunk in iter_chunks(source, chunksize, sheet=sheet):
+        n_chunks += 1
+        progress(0.0, f"Schema pass: chunk {n_chunks}")
+        for col in chunk.columns:
+            dt = str(chunk[col].dtype)
+            if dt not in ("int64", "float64", "bool") and not dt.startswith("datetime64"):
+                dt = "object"
+            kinds[col] = _merge_dtype(kinds.get(col), dt)
+    # Excel / Parquet datetime columns are left to the reader when every chunk agrees
+    schema = {col: (str if kind == "object" else kind) for col, kind in kinds.items()
+              if not kind.startswith("datetime64")}
+    return schema, n_chunks
+
+# ---------- STATISTICS ----------
+def _mode(counts: Counter):
+    """Most frequent value; ties resolved like `Series.mode().iloc[0]` (smallest value)."""
+    if not counts:
+        return ""
+    top = max(counts.values())
+    return min(v for v, c in counts.items() if c == top)
+
+class _ColumnStats:
+    """Exact whole-file statistics for one column, accumulated chunk by chunk.
+
+    Same interface as sketches.ColumnSketch, which replaces it when sketches are on.
+    """
+    def __init__(self, kind: str, keep_values: bool = False):
+        self.kind = kind          # "numeric" or "text"
+        self.keep_values = keep_values
+        self.values = []          # non-null numeric values, only when median/quantiles are needed
+        self.total = 0.0
+        self.count = 0
+        self.missing = 0
+        self.counts = Counter()   # value counts for text columns (mode)
+
+    def update(self, s: pd.Series):
+        self.missing += int(s.isna().sum())
+        if self.kind == "text":
+            vc = s.value_counts()
+            self.counts.update(vc[vc > 0].to_dict())   # Categoricals list unseen categories too
+            return
+        vals = s.dropna().to_numpy(dtype="float64")
+        self.count += len(vals)
+        self.total += float(vals.sum())
+        if self.keep_values:
+            self.values.append(vals)
+
+    def add_repeated(self, value: float, count: int):
+        self.values.append(np.full(count, value, dtype="float64"))
+
+    def _all_values(self) -> np.ndarray:
+        return np.concatenate(self.values) if self.values else np.array([], dtype="float64")
+
+    def median(self) -> float:
+        vals = self._all_values()
+        return float(np.median(vals)) if len(vals) else np.nan
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else np.nan
+
+    def quantiles(self, qs) -> np.ndarray:
+        vals = self._all_values()
+        return np.quantile(vals, qs) if len(vals) else np.full(len(qs), np.nan)
+
+    def mode(self, default=""):
+        return _mode(self.counts) if self.counts else default
+
+# ---------- PIPELINE ----------
+def _convert_chunk(chunk: pd.DataFrame, steps: dict, numeric_cols: list, date_cols: list,
+                   accepted_dates: set = None, counts: dict = None, workers: int = 1,
+                   date_formats: dict = None, categories: dict = None) -> pd.DataFrame:
+    """Column names, numeric/date conversion and categorical encoding for one chunk (no copies).
+
+    `date_formats` pins each date column's format: columns missing from it are inferred from
+    this chunk and added, so later chunks and passes parse with the same format. Likewise
+    `categories` ({"ratio": ..., "cols": None}) picks the columns to encode from the first chunk.
+    """
+    if steps.get("clean_names"):
+        chunk = clean_colnames(chunk)
+    if steps.get("convert_numeric"):
+        for col, new in convert_columns("numeric", [(c, chunk[c]) for c in numeric_cols], workers):
+            if counts is not None:
+                before = int(chunk[col].notna().sum())
+            chunk[col] = new
+            if counts is not None:
+                b, a = counts.setdefault(("numeric", col), [0, 0])
+                counts[("numeric", col)] = [b + before, a + int(chunk[col].notna().sum())]
+    if steps.get("convert_dates"):
+        cols = [c for c in date_cols if accepted_dates is None or c in accepted_dates]
+        if date_formats is not None:
+            for c in cols:
+                if c not in date_formats:
+                    date_formats[c] = infer_date_format(chunk[c])
+        for col, parsed in convert_columns("date", [(c, chunk[c]) for c in cols], workers, date_formats):
+            if counts is not None:
+                counts[("date", col)] = counts.get(("date", col), 0) + int(parsed.notna().sum())
+            if accepted_dates is not None:
+                chunk[col] = parsed
+    if categories is not None:
+        if categories["cols"] is None:
+            categories["cols"] = [c for c in chunk.select_dtypes(include="object").columns
+                                  if to_category(chunk[c], categories["ratio"]) is not None]
+        for col in categories["cols"]:
+            if chunk[col].dtype != object:
+                continue
+            cat = to_category(chunk[col], max_ratio=1.0)   # chunk categories can differ; values can't
+            if counts is not None:
+                seen, b, a = counts.setdefault(("category", col), [set(), 0, 0])
+                seen.update(cat.cat.categories)
+                counts[("category", col)] = [seen, b + chunk[col].memory_usage(deep=True, index=False),
+                                             a + cat.memory_usage(deep=True, index=False)]
+            chunk[col] = cat
+    return chunk
+
+def _prepared_chunks(source, schema: dict, chunksize: int, steps: dict, numeric_cols: list, date_cols: list,
+                     accepted_dates: set, fill_values: dict, dedupe: dict, workers: int = 1,
+                     date_formats: dict = None, categories: dict = None, sheet=None) -> Iterator[pd.DataFrame]:
+    """Chunks after conversion, filling and (whole-file) duplicate removal.
+
+    Duplicates are tracked as 64-bit row fingerprints (dedupe.Deduplicator, mode and threshold
+    from `dedupe`); `dedupe["removed"]` counts dropped rows and `dedupe["index"]` is the tracker.
+    """
+    seen = Deduplicator(dedupe.get("mode", "exact"), dedupe.get("threshold", NEAR_THRESHOLD))
+    dedupe["removed"] = 0
+    dedupe["index"] = seen
+    for chunk in iter_chunks(source, chunksize, dtype=schema, sheet=sheet):
+        chunk = _convert_chunk(chunk, steps, numeric_cols, date_cols, accepted_dates=accepted_dates,
+                               workers=workers, date_formats=date_formats, categories=categories)
+        for col, val in fill_values.items():
+            chunk[col] = safe_fillna(chunk[col], val)
+        if steps.get("remove_dupes"):
+            dup = seen.duplicated(chunk)
+            dedupe["removed"] = seen.removed
+            chunk = chunk[~dup].reset_index(drop=True)
+        yield chunk
+
+def stream_clean(source, dest, steps: dict, numeric_cols: list, date_cols: list, log: list,
+                 chunksize: int = DEFAULT_CHUNKSIZE, numeric_strategy: str = "median", progress=None,
+                 workers: int = 1, approx: bool = None, category_ratio: float = CATEGORY_MAX_RATIO,
+                 out_format: str = "csv", dedupe_mode: str = "exact",
+                 near_threshold: float = NEAR_THRESHOLD, profile: StepProfile = None, sheet=None,
+                 compression: str = None) -> dict:
+    """Run the selected cleaning steps over `source` chunk by chunk and write them to `dest`.
+
+    `steps` uses the app's checkbox keys (clean_names, convert_numeric, ...). Column lists refer
+    to cleaned names when clean_names is on. Log lines mirror the in-memory pipeline.
+    Returns a summary dict with row and chunk counts and `head`, the first rows written.
+    `progress(fraction, message)` is called
+    once per chunk of every pass. `workers` > 1 converts each chunk's columns in parallel processes.
+    `approx` (default: by estimated size, see sketches.APPROX_MIN_ROWS) computes fill values and
+    IQR bounds from mergeable sketches in bounded memory instead of exact per-value statistics.
+    With encode_categories, text columns under `category_ratio` in the first chunk are stored as
+    Categoricals chunk by chunk (the CSV output is unchanged; filling and standardizing get cheaper).
+    `out_format` is "csv", "parquet", "arrow" or "xlsx" (see formats.OUTPUT_FORMATS) and
+    `compression` None, "gzip" or "zstd" (formats.COMPRESSIONS); `dest` is a path or a file
+    object (text for uncompressed CSV, binary otherwise). `dedupe_mode` / `near_threshold` are as in
+    plan.build_plan; duplicates are found across the whole file with about 8 bytes per unique row.
+    `profile` (instrument.StepProfile) times each pass; its lines go to `log` after the summary.
+    `sheet` picks the worksheet of an Excel source (default: the first).
+    """
+    progress = progress or _no_progress
+    timings = profile is not None
+    profile = profile or StepProfile(memory=False)   # nothing is reported without one
+    with profile.step("schema pass") as schema_rec:
+        schema, total_chunks = _scan_schema(source, chunksize, progress, sheet)
+    need_fill = steps.get("fill_missing")
+    need_outliers = steps.get("flag_outliers")
+    passes = ["stats"] + (["bounds"] if need_outliers and steps.get("remove_dupes") else []) + ["write"]
+
+    def report(pass_name: str, i: int):
+        done = passes.index(pass_name) * total_chunks + i
+        progress(done / max(1, len(passes) * total_chunks),
+                 f"{pass_name.title()} pass: chunk {i + 1}/{total_chunks}")
+    keep_values = need_outliers or (need_fill and numeric_strategy == "median")
+    # exact statistics keep numeric values in memory; past APPROX_MIN_ROWS use bounded sketches
+    approx = use_sketches(total_chunks * chunksize, approx)
+    note = " (approx.)" if approx else ""
+
+    def new_stats(kind: str):
+        return ColumnSketch(kind) if approx else _ColumnStats(kind, keep_values)
+
+    # --- stats pass: conversion counts, fill values, outlier bounds ---
+    counts = {}
+    stats = {}
+    date_formats = {}   # filled from the first chunk, then used by every pass
+    categories = {"ratio": category_ratio, "cols": None} if steps.get("encode_categories") else None
+    rows_in = 0
+    header = None
+    with profile.step("stats pass") as rec:
+        for i, chunk in enumerate(iter_chunks(source, chunksize, dtype=schema, sheet=sheet)):
+            report("stats", i)
+            if header is None:
+                header = chunk.columns.tolist()
+            rows_in += len(chunk)
+            chunk = _convert_chunk(chunk, steps, numeric_cols, date_cols, counts=counts, workers=workers,
+                                   date_formats=date_formats, categories=categories)
+            if not (need_fill or need_outliers):
+                continue
+            for col in chunk.select_dtypes(include=np.number).columns:
+                stats.setdefault(col, new_stats("numeric")).update(chunk[col])
+            if need_fill:
+                for col in chunk.select_dtypes(include=TEXT_DTYPES).columns:
+                    stats.setdefault(col, new_stats("text")).update(chunk[col])
+        rec["rows"] = schema_rec["rows"] = rows_in
+    if header is None:
+        log.append("Streaming: source is empty, nothing written")
+        return {"rows_in": 0, "rows_out": 0, "chunks": 0, "head": pd.DataFrame()}
+
+    if steps.get("clean_names"):
+        after_cols = clean_colnames(pd.DataFrame(columns=header)).columns.tolist()
+        log.append(f"Cleaned column names: {header} -> {after_cols}")
+    if steps.get("convert_numeric"):
+        for col in numeric_cols:
+            before, after = counts.get(("numeric", col), [0, 0])
+            log.append(f"Converted '{col}' -> numeric (non-null: {before} -> {after})")
+    accepted_dates = set()
+    if steps.get("convert_dates"):
+        for col in date_cols:
+            non_null = counts.get(("date", col), 0)
+            if non_null >= max(3, int(rows_in * 0.05)):  # same rule as safe_convert_dates
+                accepted_dates.add(col)
+                log.append(f"Converted '{col}' -> datetime (parsed {non_null} values)")
+            else:
+                log.append(f"Skipped converting '{col}' to datetime (parsed {non_null} out of {rows_in})")
+    if categories is not None:
+        for col in categories["cols"]:
+            seen, b, a = counts.get(("category", col), [set(), 0, 0])
+            log.append(f"Encoded text '{col}' as category ({len(seen)} values, "
+                       f"{b / 2**20:.1f} -> {a / 2**20:.1f} MB summed over chunks)")
+
+    fill_values = {}
+    if need_fill:
+        # numeric columns first, then text, as fill_missing does
+        for col, st_ in sorted(stats.items(), key=lambda kv: kv[1].kind != "numeric"):
+            if col in accepted_dates or not st_.missing:
+                continue
+            if st_.kind == "text":
+                val = st_.mode()
+                log.append(f"Filled {st_.missing} missing values in text '{col}' with mode='{val}'{note}")
+            else:
+                if numeric_strategy == "median":
+                    val = st_.median()
+                elif numeric_strategy == "mean":
+                    val = st_.mean()
+                else:
+                    val = 0
+                log.append(f"Filled {st_.missing} missing values in numeric '{col}' with {numeric_strategy}={val}{note}")
+            fill_values[col] = val
+
+    # rows reach flag_outliers after fill and dedupe, so bounds come from those rows; with
+    # dedupe on that takes one more pass, otherwise the stats pass already has the values
+    dedupe = {"mode": dedupe_mode, "threshold": near_threshold}
+    bounds = {}
+    if need_outliers:
+        if steps.get("remove_dupes"):
+            keep_values = True
+            stats = {}
+            with profile.step("bounds pass", rows_in):
+                for i, chunk in enumerate(_prepared_chunks(source, schema, chunksize, steps, numeric_cols,
+                                                           date_cols, accepted_dates, fill_values, dict(dedupe), workers,
+                                                           date_formats, categories, sheet)):
+                    report("bounds", i)
+                    for col in chunk.select_dtypes(include=np.number).columns:
+                        stats.setdefault(col, new_stats("numeric")).update(chunk[col])
+        for col, st_ in stats.items():
+            if st_.kind != "numeric":
+                continue
+            if col in fill_values and st_.missing:
+                st_.add_repeated(fill_values[col], st_.missing)
+            q1, q3 = st_.quantiles([0.25, 0.75])
+            iqr = q3 - q1
+            bounds[col] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+    stats.clear()
+
+    # --- write pass ---
+    rows_out = 0
+    n_chunks = 0
+    text_samples = {}
+    head = None
+    with ChunkWriter(dest, out_format, compression) as writer, profile.step("write pass", rows_in):
+        for chunk in _prepared_chunks(source, schema, chunksize, steps, numeric_cols, date_cols,
+                                      accepted_dates, fill_values, dedupe, workers, date_formats,
+                                      categories, sheet):
+            report("write", n_chunks)
+            n_chunks += 1
+            if need_outliers:
+                for col, (low, high) in bounds.items():
+                    chunk[f"{col}_is_outlier"] = ((chunk[col] < low) | (chunk[col] > high)).fillna(False).astype(int)
+            if steps.get("standardize_text"):
+                before = {col: chunk[col].dropna().astype(str).head(3).tolist()
+                          for col in chunk.select_dtypes(include=TEXT_DTYPES).columns if col not in text_samples}
+                chunk = standardize_text(chunk)
+                for col, sample in before.items():
+                    text_samples[col] = (sample, chunk[col].dropna().astype(str).head(3).tolist())
+            writer.write(chunk)
+            rows_out += len(chunk)
+            if head is None:
+                head = chunk.head(10).reset_index(drop=True)
+
+    if steps.get("remove_dupes"):
+        seen = dedupe["index"]
+        log.append(f"Removed {dedupe['removed']} {seen.describe()}")
+    for col in bounds:
+        log.append(f"Flagged outliers in '{col}' -> new column '{col}_is_outlier'{note}")
+    for col, (before, after) in text_samples.items():
+        log.append(f"Standardized text in '{col}' (sample: {before} -> {after})")
+    tracking = (f"; duplicate tracking {seen.nbytes / 2**20:.1f} MB for {seen.fingerprints.n} unique rows"
+                if steps.get("remove_dupes") else "")
+    log.append(f"Streamed {rows_in} rows in {n_chunks} chunks of up to {chunksize} rows ({rows_out} rows written{tracking})")
+    if timings:
+        log.extend(profile.lines())
+    return {"rows_in": rows_in, "rows_out": rows_out, "chunks": n_chunks,
+            "dedupe_bytes": seen.nbytes if steps.get("remove_dupes") else 0,
+            "head": head if head is not None else pd.DataFrame()}
@@ -0,0 +1,124 @@
+# benchmarks/bench_pipeline.py
+"""Cleaning pipeline benchmark: each step's time, throughput and peak memory at several sizes.
+
+Run from the repo root:  python -m benchmarks.bench_pipeline [--sizes 10k,1m,10m] [--memory]
+                                                           [--out results.csv] [--baseline old.csv]
+Builds a synthetic dataset per size (money, percent, unit-suffixed, date, text and id columns,
+with blanks and repeated rows), runs the helpers in the app's order on it, then the fused plan
+(run_plan) with every step on, and prints seconds, rows/s and (with --memory) peak MB per step.
+--out saves the table; --baseline compares against a saved one and exits 1 when a step got
+slower by more than --tolerance.
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from autoclean.helpers import (
+    auto_numeric, detect_column_types, fill_missing, flag_outliers, remove_duplicates, safe_convert_dates,
+    standardize_text,
+)
+from autoclean.instrument import StepProfile
+from autoclean.plan import STEP_KEYS, build_plan, run_plan
+
+POOL_SIZE = 50_000          # distinct values per generated column
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# ---------- DATA ----------
+def _pool(rng, fmt, n: int = POOL_SIZE) -> np.ndarray:
+    """`n` formatted values to sample rows from: generation cost does not grow with row count."""
+    return np.array([fmt(rng) for _ in range(n)], dtype=object)
+
+def make_dataset(n: int, seed: int = 0) -> pd.DataFrame:
+    """`n` rows of raw strings like the app receives; about 2% blanks and 5% repeated rows."""
+    rng = np.random.default_rng(seed)
+    pools = {
+        "Price (₹)": _pool(rng, lambda r: f"₹{r.integers(100, 10_000_000):,}"),
+        "Discount %": _pool(rng, lambda r: f"{r.integers(0, 10_000) / 100:.2f}%"),
+        "Speed": _pool(rng, lambda r: f"{r.integers(0, 2_500) / 10:.1f} km/h"),
+        "Order Date": _pool(rng, lambda r: str((pd.Timestamp("2015-01-01")
+                                                 + pd.Timedelta(days=int(r.integers(0, 3_650)))).date())),
+        "City": _pool(rng, lambda r: r.choice(["  pune", "Mumbai ", "DELHI", "chennai", "Kolkata  "]), 200),
+        "Customer": _pool(rng, lambda r: f"customer {r.integers(0, 10**7)}"),
+    }
+    df = pd.DataFrame({col: pool[rng.integers(0, len(pool), n)] for col, pool in pools.items()})
+    df.insert(0, "Order ID", np.arange(n).astype(str))
+    for col in pools:
+        df.loc[rng.random(n) < 0.02, col] = None
+    repeats = rng.random(n) < 0.05   # copy earlier rows over these ones
+    df.loc[repeats] = df.iloc[rng.integers(0, n, int(repeats.sum()))].to_numpy()
+    return df
+
+# ---------- RUN ----------
+def bench_steps(df: pd.DataFrame, profile: StepProfile):
+    """The helpers one after another, as the step-by-step app path ran them."""
+    log = []
+    n = len(df)
+    with profile.step("detect_column_types", n):
+        det = detect_column_types(df)
+    numeric = det.loc[det["detected"] == "numeric", "column"].tolist()
+    dates = det.loc[det["detected"] == "date", "column"].tolist()
+    with profile.step("auto_numeric", n * len(numeric)):   # rows counted per column converted
+        df = df.assign(**{c: auto_numeric(df[c]) for c in numeric})
+    with profile.step("safe_convert_dates", n * len(dates)):
+        df, _ = safe_convert_dates(df, dates, log)
+    with profile.step("fill_missing", n):
+        df = fill_missing(df, log=log)
+    with profile.step("remove_duplicates", n):
+        df, _ = remove_duplicates(df, log)
+    with profile.step("flag_outliers", len(df)):
+        df, _ = flag_outliers(df, log)
+    with profile.step("standardize_text", len(df)):
+        standardize_text(df, log)
+    return det
+
+def bench_plan(df: pd.DataFrame, det: pd.DataFrame, profile: StepProfile):
+    steps = {k: True for k in STEP_KEYS}
+    plan = build_plan(df, steps, {c: "auto" for c in df.columns}, det)
+    with profile.step("run_plan (all steps)", len(df)):
+        run_plan(df, plan, [], profile=profile)
+
+def compare(results: pd.DataFrame, baseline_path: str, tolerance: float) -> list:
+    """Steps slower than the baseline by more than `tolerance` (a fraction)."""
+    base = pd.read_csv(baseline_path)
+    merged = results.merge(base, on=["size", "step"], suffixes=("", "_base"))
+    slow = merged[merged["seconds"] > merged["seconds_base"] * (1 + tolerance)]
+    return [f"{r.size} {r.step}: {r.seconds_base:.3f}s -> {r.seconds:.3f}s" for r in slow.itertuples()]
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="10k,1m", help=f"comma-separated, from {list(SIZES)}")
+    ap.add_argument("--memory", action="store_true", help="trace peak memory per step (slower)")
+    ap.add_argument("--out", help="save the results table as CSV")
+    ap.add_argument("--baseline", help="CSV from an earlier --out to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    args = ap.parse_args()
+
+    tables = []
+    for size in args.sizes.split(","):
+        n = SIZES[size.strip().lower()]
+        df = make_dataset(n)
+        profile = StepProfile(memory=args.memory)
+        det = bench_steps(df, profile)
+        bench_plan(df, det, profile)
+        table = profile.frame()
+        table.insert(0, "size", size)
+        tables.append(table)
+        print(f"-- {n:,} rows")
+        print(f"{'step':<32}{'seconds':>10}{'rows/s':>14}{'peak MB':>10}")
+        for r in table.itertuples():
+            peak = f"{r.peak_mb:>10.1f}" if pd.notna(r.peak_mb) else f"{'-':>10}"
+            print(f"{r.step:<32}{r.seconds:>10.3f}{r.rows_per_sec:>14,.0f}{peak}")
+    results = pd.concat(tables, ignore_index=True)
+    if args.out:
+        results.to_csv(args.out, index=False)
+    if args.baseline:
+        slow = compare(results, args.baseline, args.tolerance)
+        for line in slow:
+            print(f"SLOWER: {line}")
+        if slow:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/bench_vectorized_helpers.py
+"""Per-value vs column-at-a-time type detection, unit stripping and date parsing.
+
+Run from the repo root:  python -m benchmarks.bench_vectorized_helpers [--rows 1000000]
+Prints seconds per million rows for the old per-value helpers (kept below as the reference)
+and the vectorized ones in autoclean.helpers, and checks the results match value for value.
+"""
+import argparse
+import random
+import re
+import time
+
+import pandas as pd
+
+from autoclean.dates import parse_date_column
+from autoclean.helpers import (
+    auto_numeric, looks_like_date_sample, looks_like_number_sample, strip_money_percent_and_units_series,
+)
+
+# ---------- REFERENCE (per-value) ----------
+def ref_strip(x):
+    if pd.isna(x):
+        return x
+    s = str(x).strip()
+    s = re.sub(r"[₹$,]", "", s)
+    s = re.sub(r"\b(km/h|kmh|mph|km|m|kwh|kw|rpm|hrs|hr|s|sec|min)\b", "", s, flags=re.I)
+    s = s.replace("—", "").replace("–", "").replace("−", "-")
+    return s.strip()
+
+def ref_auto_numeric(series):
+    cleaned = series.astype(str).map(ref_strip)
+    cleaned = cleaned.replace({"nan": None, "None": None, "": None})
+    cleaned = cleaned.str.replace("%", "", regex=False)
+    return pd.to_numeric(cleaned, errors="coerce")
+
+def ref_number_sample(sample_vals):
+    return sum(1 for v in sample_vals if re.fullmatch(r"-?\d+(\.\d+)?%?", ref_strip(v or "")))
+
+def ref_date_sample(sample_vals):
+    pats = [r"^\d{4}[-/]\d{1,2}[-/]\d{1,2}$", r"^\d{1,2}[-/]\d{1,2}[-/]\d{2,4}$",
+            r"^[A-Za-z]{3,9}\s+\d{1,2},\s*\d{4}$", r"^\d{1,2}\s+[A-Za-z]{3,9}\s+\d{4}$"]
+    months = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+    count = 0
+    for v in sample_vals:
+        s = str(v).strip()
+        count += any(re.match(p, s) for p in pats)
+        count += any(m in s.lower() for m in months)
+    return count
+
+def ref_parse_dates(series):
+    return pd.to_datetime(series, errors="coerce")   # format guessed from the first value
+
+# ---------- DATA ----------
+def make_column(n: int, unique: bool, seed: int = 0) -> pd.Series:
+    """Money / percent / unit-suffixed / date strings; `unique` makes nearly every value distinct."""
+    rng = random.Random(seed)
+    hi = 10_000_000 if unique else 500
+    gens = [
+        lambda: f"₹{rng.randint(1, hi):,}",
+        lambda: f"{rng.randint(1, hi) / 100:.2f}%",
+        lambda: f"{rng.randint(1, hi) / 10:.1f} km/h",
+        lambda: f"${rng.randint(1, hi)}",
+        lambda: f"2021-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        lambda: f"{rng.randint(1, 28)} Jan {rng.randint(1990, 2030)}",
+        lambda: None,
+    ]
+    return pd.Series([rng.choice(gens)() for _ in range(n)], dtype=object)
+
+def make_date_column(n: int, unique: bool, seed: int = 0) -> pd.Series:
+    """"Jan 05, 2021"-style dates (no ISO fast path) with a few blanks and junk values."""
+    rng = random.Random(seed)
+    days = pd.date_range("1900-01-01", periods=40_000 if unique else 365).strftime("%b %d, %Y").tolist()
+    vals = [rng.choice(days) for _ in range(n)]
+    for i in range(0, n, 1000):
+        vals[i] = None if i % 2000 else "n/a"
+    return pd.Series(vals, dtype=object)
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+    per_m = 1_000_000 / args.rows
+
+    print(f"{'case':<32}{'per-value s/M':>15}{'vectorized s/M':>16}{'speedup':>9}")
+    for label, unique in [("repetitive values", False), ("mostly unique values", True)]:
+        col = make_column(args.rows, unique)
+        strs = col.dropna().astype(str).tolist()
+        dates = make_date_column(args.rows, unique)
+        cases = [
+            ("strip_money_percent_and_units", lambda: col.map(ref_strip),
+             lambda: strip_money_percent_and_units_series(col)),
+            ("auto_numeric", lambda: ref_auto_numeric(col), lambda: auto_numeric(col)),
+            ("looks_like_number_sample", lambda: ref_number_sample(strs), lambda: looks_like_number_sample(strs)),
+            ("looks_like_date_sample", lambda: ref_date_sample(strs), lambda: looks_like_date_sample(strs)),
+            ("parse_date_column", lambda: ref_parse_dates(dates), lambda: parse_date_column(dates)),
+        ]
+        print(f"-- {label} ({args.rows:,} rows)")
+        for name, ref, vec in cases:
+            expected, t_ref = timed(ref)
+            got, t_vec = timed(vec)
+            if isinstance(expected, pd.Series):
+                pd.testing.assert_series_equal(expected, got, check_dtype=False)
+            else:
+                assert expected == got, (name, expected, got)
+            print(f"{name:<32}{t_ref * per_m:>15.2f}{t_vec * per_m:>16.2f}{t_ref / t_vec:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
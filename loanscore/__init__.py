@@ -0,0 +1,4 @@
+"""Loan Eligibility rules as vectorized functions, shared by the Streamlit page and batch scoring."""
+from .rules import (ADVICE, DEFAULT_TENURE, MAX_TENURE, MIN_TENURE, SCORE_COLUMNS, advice_tier, emi, interest_rate,
+                    is_eligible, loan_amount, savings_percent, score, total_expenses)
+from .batch import DEFAULT_CHUNKSIZE, format_stats, new_stats, score_chunks, score_file
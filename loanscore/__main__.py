@@ -0,0 +1,7 @@
+# loanscore/__main__.py
+"""`python -m loanscore INPUT [--out FILE] [--chunksize N] [--tenure MONTHS]`: see loanscore.batch."""
+import sys
+
+from .batch import main
+
+sys.exit(main())
@@ -0,0 +1,83 @@
+# loanscore/batch.py
+"""Score an applicants file chunk by chunk: CSV / Excel / Parquet / Arrow in, same formats out.
+
+    python -m loanscore applicants.parquet [--out scored.parquet] [--chunksize 200000] [--tenure 12]
+
+Each output row is the input row followed by SCORE_COLUMNS (see loanscore.rules). Memory is
+bounded by the chunk size; reading and writing go through autoclean's chunk reader and writer.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from autoclean.formats import ChunkWriter
+from autoclean.stream import iter_chunks
+
+from .rules import DEFAULT_TENURE, SCORE_COLUMNS, score
+
+DEFAULT_CHUNKSIZE = 200_000
+
+# ---------- SCORING ----------
+def score_chunks(source, chunksize: int = DEFAULT_CHUNKSIZE, tenure: int = DEFAULT_TENURE, stats: dict = None):
+    """Yield each chunk of `source` with its scores appended; `stats` (if given) is filled as it goes."""
+    stats = new_stats() if stats is None else stats
+    for chunk in iter_chunks(source, chunksize):
+        t0 = time.perf_counter()
+        scored = score(chunk, tenure)
+        stats["seconds"] += time.perf_counter() - t0   # scoring only, not reading or writing
+        stats["rows"] += len(chunk)
+        stats["eligible"] += int(scored["eligible"].sum())
+        stats["amount"] += float(scored["loan_amount"].sum())
+        stats["chunks"] += 1
+        yield pd.concat([chunk.drop(columns=[c for c in SCORE_COLUMNS if c in chunk]), scored], axis=1)
+
+def new_stats() -> dict:
+    return {"rows": 0, "eligible": 0, "amount": 0.0, "chunks": 0, "seconds": 0.0}
+
+def score_file(source, dest, fmt: str = None, chunksize: int = DEFAULT_CHUNKSIZE,
+               tenure: int = DEFAULT_TENURE) -> dict:
+    """Score `source` into `dest` (format from its extension unless `fmt`); returns throughput stats."""
+    fmt = fmt or _format_of(dest)
+    stats = new_stats()
+    t0 = time.perf_counter()
+    with ChunkWriter(dest, fmt) as writer:
+        for scored in score_chunks(source, chunksize, tenure, stats):
+            writer.write(scored)
+    stats["total_seconds"] = time.perf_counter() - t0
+    stats["rows_per_sec"] = stats["rows"] / max(stats["total_seconds"], 1e-9)
+    return stats
+
+def _format_of(path: str) -> str:
+    ext = os.path.splitext(str(path))[1].lower().lstrip(".")
+    return {"pq": "parquet", "feather": "arrow", "xls": "xlsx"}.get(ext, ext or "csv")
+
+def format_stats(stats: dict) -> str:
+    rows = stats["rows"]
+    share = stats["eligible"] / rows * 100 if rows else 0.0
+    line = (f"{rows:,} applicants in {stats['chunks']} chunks, {stats['eligible']:,} eligible ({share:.1f}%), "
+            f"₹{stats['amount']:,.0f} approved; scoring {stats['seconds']:.2f}s "
+            f"({rows / max(stats['seconds'], 1e-9):,.0f} rows/s)")
+    if "total_seconds" in stats:   # score_file: reading and writing included
+        line += f", total {stats['total_seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/s)"
+    return line
+
+# ---------- CLI ----------
+def main(argv: list = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m loanscore", description=__doc__.splitlines()[0])
+    ap.add_argument("input", help="applicants file: income, expenses (or expense_* columns), optional tenure")
+    ap.add_argument("--out", default=None, help="output file (default: <input>_scored.<ext>)")
+    ap.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="rows scored at a time")
+    ap.add_argument("--tenure", type=int, default=DEFAULT_TENURE, help="months, for rows without a tenure")
+    args = ap.parse_args(argv)
+
+    if not os.path.isfile(args.input):
+        print(f"No such file: {args.input}", file=sys.stderr)
+        return 1
+    root, ext = os.path.splitext(args.input)
+    out = args.out or f"{root}_scored{ext if ext.lower() != '.xlsx' else '.csv'}"
+    stats = score_file(args.input, out, chunksize=args.chunksize, tenure=args.tenure)
+    print(f"{args.input} -> {out}: {format_stats(stats)}")
+    return 0
@@ -0,0 +1,97 @@
+# loanscore/rules.py
+"""Savings, loan eligibility and EMI rules, for one applicant or a whole column of them.
+
+    savings_percent(income, expenses)   # (income - expenses) / income * 100, 0 when income <= 0
+    loan_amount(pct)                    # 0 (not eligible) / 40k / 80k / 150k by savings tier
+    interest_rate(tenure)               # 10 / 11 / 12 % a year by tenure in months
+    emi(amount, rate, tenure)           # monthly instalment
+    score(frame)                        # all of the above for an applicants frame (SCORE_COLUMNS)
+
+Every rule takes scalars or arrays (NumPy broadcasting), so the Streamlit page and the batch
+scorer run the same code: the page on one applicant, `score` on a chunk of rows at a time.
+"""
+import numpy as np
+import pandas as pd
+
+# ---------- CONFIG ----------
+MIN_ELIGIBLE_PCT = 40        # savings % must be above this to get a loan
+LOAN_TIERS = ((60, 40_000), (80, 80_000))   # savings % up to (and including) -> amount
+TOP_LOAN = 150_000           # savings % above the last tier
+RATE_TIERS = ((12, 10), (24, 11))           # tenure months up to (and including) -> % a year
+TOP_RATE = 12
+MIN_TENURE, MAX_TENURE, DEFAULT_TENURE = 6, 36, 12
+ADVICE = ["low", "decent", "very good", "excellent"]   # advice tier names, lowest first
+
+INCOME_COLUMN, EXPENSES_COLUMN, TENURE_COLUMN = "income", "expenses", "tenure"
+EXPENSE_PREFIX = "expense_"  # without an `expenses` column, expense_* columns are summed
+SCORE_COLUMNS = ["total_expenses", "savings", "savings_pct", "advice", "eligible", "loan_amount",
+                 "tenure", "interest_rate", "emi"]
+
+# ---------- RULES ----------
+def savings_percent(income, expenses):
+    """Share of income left after expenses, in %; 0 when income is not positive (or missing)."""
+    income = np.asarray(income, dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = (income - np.asarray(expenses, dtype="float64")) / income * 100
+    return np.where(income > 0, pct, 0.0)
+
+def advice_tier(pct):
+    """Index into ADVICE: >80 excellent, 60-80 very good, 40-60 decent, else low."""
+    pct = np.asarray(pct, dtype="float64")
+    return np.select([pct > 80, pct >= 60, pct >= 40], [3, 2, 1], 0)
+
+def is_eligible(pct):
+    return np.asarray(pct, dtype="float64") > MIN_ELIGIBLE_PCT
+
+def loan_amount(pct):
+    """Approved amount by savings tier; 0 when not eligible."""
+    pct = np.asarray(pct, dtype="float64")
+    bounds = [pct <= upper for upper, _ in LOAN_TIERS]
+    amount = np.select(bounds, [amount for _, amount in LOAN_TIERS], TOP_LOAN)
+    return np.where(is_eligible(pct), amount, 0)
+
+def interest_rate(tenure):
+    """Annual rate in % by tenure (months); NaN outside MIN_TENURE..MAX_TENURE."""
+    tenure = np.asarray(tenure, dtype="float64")
+    rate = np.select([tenure <= upper for upper, _ in RATE_TIERS], [rate for _, rate in RATE_TIERS], TOP_RATE)
+    return np.where((tenure >= MIN_TENURE) & (tenure <= MAX_TENURE), rate, np.nan)
+
+def emi(amount, rate, tenure):
+    """Monthly instalment on `amount` at `rate` % a year over `tenure` months."""
+    r = np.asarray(rate, dtype="float64") / 100 / 12
+    growth = (1 + r) ** np.asarray(tenure, dtype="float64")
+    return np.asarray(amount, dtype="float64") * r * growth / (growth - 1)
+
+# ---------- FRAMES ----------
+def total_expenses(frame: pd.DataFrame) -> pd.Series:
+    """The `expenses` column, or the row sum of expense_* columns (missing counts as 0)."""
+    if EXPENSES_COLUMN in frame:
+        return pd.to_numeric(frame[EXPENSES_COLUMN], errors="coerce").fillna(0.0)
+    parts = [c for c in frame.columns if str(c).startswith(EXPENSE_PREFIX)]
+    if not parts:
+        raise ValueError(f"Applicants need an {EXPENSES_COLUMN!r} column or {EXPENSE_PREFIX}* columns")
+    return frame[parts].apply(pd.to_numeric, errors="coerce").sum(axis=1)
+
+def score(frame: pd.DataFrame, tenure: int = DEFAULT_TENURE) -> pd.DataFrame:
+    """SCORE_COLUMNS for each applicant row; `tenure` fills a missing tenure column or value.
+
+    Ineligible rows get amount 0 and no EMI; a tenure outside MIN_TENURE..MAX_TENURE gets no
+    rate or EMI.
+    """
+    if INCOME_COLUMN not in frame:
+        raise ValueError(f"Applicants need an {INCOME_COLUMN!r} column")
+    income = pd.to_numeric(frame[INCOME_COLUMN], errors="coerce").to_numpy(dtype="float64")
+    expenses = total_expenses(frame).to_numpy(dtype="float64")
+    months = (pd.to_numeric(frame[TENURE_COLUMN], errors="coerce").fillna(tenure).to_numpy(dtype="float64")
+              if TENURE_COLUMN in frame else np.full(len(frame), float(tenure)))
+    pct = savings_percent(income, expenses)
+    amount = loan_amount(pct)
+    rate = interest_rate(months)
+    eligible = amount > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(eligible, emi(amount, rate, months), np.nan)
+    return pd.DataFrame({
+        "total_expenses": expenses, "savings": income - expenses, "savings_pct": pct,
+        "advice": pd.Categorical.from_codes(advice_tier(pct), ADVICE), "eligible": eligible,
+        "loan_amount": amount, "tenure": months, "interest_rate": np.where(eligible, rate, np.nan),
+        "emi": payment}, index=frame.index)
@@ -0,0 +1,11 @@
+"""Indian Stock Insights: data and analytics behind the stock dashboard, usable without Streamlit."""
+from .backtest import Backtest, backtest, momentum, rebalance_rows, reversal, sweep
+from .correlation import CORR_WINDOW, CorrelationEngine, cluster_order
+from .indicators import INDICATORS, IndicatorEngine, compute, screen
+from .movers import MOVER_COLUMNS, rank_movers, window_change
+from .prices import (FixtureSource, PriceSource, PriceStore, RateLimiter, SyntheticSource, YahooSource,
+                     period_start, source_from_env)
+from .sentiment import (UNAVAILABLE, FixtureNewsSource, GoogleNewsSource, NewsSource, SentimentService,
+                        SyntheticNewsSource, news_source_from_env, sentiment_label)
+from .snapshots import Snapshot, SnapshotReader, SnapshotScheduler
+from .symbols import SERIES_PRIORITY, SymbolIndex, is_fund, load_symbols, normalize, universe
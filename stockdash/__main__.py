@@ -0,0 +1,7 @@
+# stockdash/__main__.py
+"""`python -m stockdash [--every SECONDS] [--dir DIR]`: snapshot sidecar, see stockdash.snapshots."""
+import sys
+
+from .snapshots import main
+
+sys.exit(main())
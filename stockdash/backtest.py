@@ -0,0 +1,178 @@
+# stockdash/backtest.py
+"""Long-only top-N backtests over a dates x tickers price matrix, and parameter sweeps.
+
+    closes = store.closes(tickers, period_start("10y"))
+    result = backtest(closes, momentum(20), top_n=10, rebalance="M")   # buy the 10 best 20-bar gainers monthly
+    result.returns, result.equity, result.drawdown, result.turnover, result.weights
+    result.stats()                       # total / annual return, volatility, Sharpe, max drawdown, turnover
+
+    sweep(closes, lookbacks=(5, 10, 20, 60), top_ns=(5, 10, 20), rebalance="W")   # one stats row per pair
+
+A signal maps the price frame to a same-shaped score frame (higher is better; NaN is never
+bought). On each rebalance date the portfolio is set, at that day's close, to equal weights in the
+top_n scores among tickers priced that day, and held (weights drift with prices) until the next
+one. `rebalance` is a bar count (every k bars) or a pandas period alias ("W", "M", "Q": last bar
+of each period). Turnover is the fraction of the portfolio traded on a rebalance (buys + sells,
+1.0 when first bought from cash); cost_bps is charged on it.
+
+Everything runs on NumPy arrays with no per-day loop: day t's return is the holdings set at the
+last rebalance before t, valued at t and t-1, gathered for all days at once. A sweep sorts each
+lookback's scores once and reads every top_n off the same ranking; lookbacks run on a thread pool
+(the array work releases the GIL).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .indicators import TRADING_DAYS
+
+# ---------- CONFIG ----------
+COST_BPS = 10.0             # transaction cost per unit of turnover, in basis points
+REBALANCE = "M"
+BACKTEST_WORKERS = int(os.environ.get("STOCKDASH_BACKTEST_WORKERS", str(os.cpu_count() or 4)))
+STAT_COLUMNS = ["total_return", "cagr", "volatility", "sharpe", "max_drawdown", "turnover", "rebalances"]
+
+# ---------- SIGNALS ----------
+def momentum(lookback: int):
+    """Signal: % change over the last `lookback` bars (the movers board, as of each day)."""
+    def signal(prices: pd.DataFrame) -> pd.DataFrame:
+        filled = prices.ffill()
+        return filled / filled.shift(lookback) - 1.0
+    signal.__name__ = f"momentum_{lookback}"
+    return signal
+
+def reversal(lookback: int):
+    """Signal: the biggest losers over `lookback` bars score highest."""
+    up = momentum(lookback)
+    def signal(prices: pd.DataFrame) -> pd.DataFrame:
+        return -up(prices)
+    signal.__name__ = f"reversal_{lookback}"
+    return signal
+
+# ---------- ENGINE ----------
+def rebalance_rows(index: pd.DatetimeIndex, rule=REBALANCE) -> np.ndarray:
+    """Row numbers of the rebalance dates: every `rule` bars, or the last bar of each `rule` period."""
+    if len(index) < 2:
+        return np.zeros(0, dtype=np.int64)
+    if isinstance(rule, (int, np.integer)):
+        if rule < 1:
+            raise ValueError("rebalance must be at least 1 bar")
+        return np.arange(0, len(index) - 1, rule)
+    periods = pd.DatetimeIndex(index).to_period(rule).asi8
+    return np.flatnonzero(periods[:-1] != periods[1:])   # the final bar has no next period to trade into
+
+def _prices(prices: pd.DataFrame) -> tuple:
+    """(filled prices with 0 before a ticker's first bar, tradeable mask: priced that day)."""
+    raw = prices.to_numpy(dtype="float64")
+    tradeable = np.isfinite(raw) & (raw > 0)
+    filled = prices.ffill().to_numpy(dtype="float64")
+    return np.nan_to_num(filled, nan=0.0), tradeable
+
+def _ranking(scores: pd.DataFrame, tradeable: np.ndarray, rows: np.ndarray) -> tuple:
+    """(columns by descending score, valid flags in that order) on the rebalance rows."""
+    s = scores.to_numpy(dtype="float64")[rows]
+    valid = np.isfinite(s) & tradeable[rows]
+    order = np.argsort(np.where(valid, -s, np.inf), axis=1, kind="stable")
+    return order, np.take_along_axis(valid, order, axis=1)
+
+def _targets(order: np.ndarray, valid: np.ndarray, top_n: int, width: int) -> np.ndarray:
+    """Equal weights over each rebalance's top_n valid columns (all zero: stay in cash)."""
+    picked, ok = order[:, :top_n], valid[:, :top_n]
+    count = ok.sum(axis=1, keepdims=True)
+    weights = np.zeros((len(order), width))
+    np.put_along_axis(weights, picked, np.where(ok, 1.0 / np.maximum(count, 1), 0.0), axis=1)
+    return weights
+
+def _run(p: np.ndarray, rows: np.ndarray, weights: np.ndarray, cost: float) -> tuple:
+    """(daily net returns, turnover per rebalance) for target `weights` set at `rows` of prices `p`."""
+    n_days = len(p)
+    returns = np.zeros(n_days)
+    if not len(rows) or n_days < 2:
+        return returns, np.zeros(len(rows))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.where(weights > 0, weights / p[rows], 0.0)   # per unit of portfolio value at the rebalance
+    held = np.searchsorted(rows, np.arange(n_days - 1), side="right") - 1   # rebalance in force over (t, t+1]
+    live = held >= 0
+    h = shares[held[live]]
+    days = np.flatnonzero(live) + 1
+    now = np.einsum("ij,ij->i", h, p[days])
+    before = np.einsum("ij,ij->i", h, p[days - 1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[days] = np.where(before > 0, now / before - 1.0, 0.0)
+    drifted = np.zeros_like(weights)
+    if len(rows) > 1:
+        value = shares[:-1] * p[rows[1:]]
+        total = value.sum(axis=1, keepdims=True)
+        drifted[1:] = np.divide(value, total, out=np.zeros_like(value), where=total > 0)
+    turnover = np.abs(weights - drifted).sum(axis=1)
+    returns[rows] = (1.0 + returns[rows]) * (1.0 - cost * turnover) - 1.0
+    return returns, turnover
+
+def _stats(returns: np.ndarray, turnover: np.ndarray) -> dict:
+    years = max(len(returns) - 1, 1) / TRADING_DAYS
+    equity = np.cumprod(1.0 + returns)
+    total = equity[-1] - 1.0 if len(equity) else 0.0
+    sd = returns.std(ddof=1) if len(returns) > 1 else np.nan
+    return {"total_return": total * 100,
+            "cagr": ((1.0 + total) ** (1.0 / years) - 1.0) * 100 if total > -1 else -100.0,
+            "volatility": sd * np.sqrt(TRADING_DAYS) * 100,
+            "sharpe": returns.mean() / sd * np.sqrt(TRADING_DAYS) if sd > 0 else np.nan,
+            "max_drawdown": (equity / np.maximum.accumulate(equity) - 1.0).min() * 100 if len(equity) else 0.0,
+            "turnover": turnover.sum() / years,
+            "rebalances": len(turnover)}
+
+class Backtest:
+    """One run's daily returns and rebalances; equity, drawdown and stats are derived."""
+    def __init__(self, returns: pd.Series, turnover: pd.Series, weights: pd.DataFrame):
+        self.returns = returns     # net daily return, after costs
+        self.turnover = turnover   # per rebalance date
+        self.weights = weights     # rebalance dates x tickers, target weights
+
+    @property
+    def equity(self) -> pd.Series:
+        return (1.0 + self.returns).cumprod()
+
+    @property
+    def drawdown(self) -> pd.Series:
+        equity = self.equity
+        return equity / equity.cummax() - 1.0
+
+    def stats(self) -> dict:
+        """STAT_COLUMNS: returns, volatility and drawdown in %, turnover per year, Sharpe at rf 0."""
+        return _stats(self.returns.to_numpy(), self.turnover.to_numpy())
+
+def backtest(prices: pd.DataFrame, signal, top_n: int = 10, rebalance=REBALANCE,
+             cost_bps: float = COST_BPS) -> Backtest:
+    """Hold the top_n tickers by `signal`, equal weighted, reset on every rebalance date."""
+    p, tradeable = _prices(prices)
+    rows = rebalance_rows(prices.index, rebalance)
+    order, valid = _ranking(signal(prices), tradeable, rows)
+    weights = _targets(order, valid, top_n, p.shape[1])
+    returns, turnover = _run(p, rows, weights, cost_bps / 1e4)
+    dates = prices.index[rows]
+    return Backtest(pd.Series(returns, index=prices.index, name="return"),
+                    pd.Series(turnover, index=dates, name="turnover"),
+                    pd.DataFrame(weights, index=dates, columns=prices.columns))
+
+# ---------- SWEEPS ----------
+def sweep(prices: pd.DataFrame, lookbacks=(5, 10, 20, 60), top_ns=(5, 10, 20), signal=momentum,
+          rebalance=REBALANCE, cost_bps: float = COST_BPS, workers: int = BACKTEST_WORKERS) -> pd.DataFrame:
+    """STAT_COLUMNS for every lookback x top_n (`signal` is a factory: lookback -> signal), best Sharpe first."""
+    p, tradeable = _prices(prices)
+    rows = rebalance_rows(prices.index, rebalance)
+
+    def one(lookback):
+        order, valid = _ranking(signal(lookback)(prices), tradeable, rows)
+        out = []
+        for n in top_ns:
+            returns, turnover = _run(p, rows, _targets(order, valid, n, p.shape[1]), cost_bps / 1e4)
+            out.append({"lookback": lookback, "top_n": n, **_stats(returns, turnover)})
+        return out
+
+    lookbacks = list(lookbacks)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(lookbacks) or 1))) as pool:
+        results = [row for batch in pool.map(one, lookbacks) for row in batch]
+    table = pd.DataFrame(results, columns=["lookback", "top_n"] + STAT_COLUMNS)
+    return table.sort_values("sharpe", ascending=False, na_position="last", kind="stable").reset_index(drop=True)
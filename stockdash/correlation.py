@@ -0,0 +1,190 @@
+# stockdash/correlation.py
+"""Rolling correlations of daily returns, updated per bar from running sums.
+
+    engine = CorrelationEngine(tickers, window=20)
+    engine.update(closes)          # dates x tickers closes; only dates after the last one are new
+    engine.corr()                  # pandas-style pairwise-complete Pearson over the last `window` returns
+    engine.clustered()             # same matrix in hierarchical-cluster order, for the heatmap
+
+Returns are kept in a float32 ring buffer of `window` rows. Next to it the engine keeps, for every
+pair (i, j) over the rows where both have a return: the count, sum(x_i), sum(x_i^2) and
+sum(x_i * x_j) (float64, so adding and removing rows does not drift). A new bar adds one row's
+outer products and removes the evicted row's: O(N^2) per bar instead of O(window * N^2).
+Large batches (the first fill, a long gap) rebuild the sums with matrix products instead.
+
+Missing bars follow the old per-ticker `pct_change` on dropna'd prices: a ticker's return is
+measured from its last known close, and a day it has no bar is missing for its pairs only.
+The cluster order (average linkage on 1 - correlation) is recomputed after each update, so
+rendering the heatmap is a lookup.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:  # optional: faster linkage for large universes
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+except ImportError:
+    linkage = None
+
+# ---------- CONFIG ----------
+CORR_WINDOW = int(os.environ.get("STOCKDASH_CORR_WINDOW", "20"))   # daily returns per correlation
+MIN_PERIODS = 5   # pairs with fewer common returns have no correlation (NaN)
+
+# ---------- ENGINE ----------
+class CorrelationEngine:
+    """Pairwise correlations of `tickers` over the last `window` daily returns.
+
+    Thread safe: Streamlit sessions can share one engine.
+    """
+    def __init__(self, tickers: list, window: int = CORR_WINDOW, min_periods: int = MIN_PERIODS):
+        self.tickers = list(tickers)
+        self.window = window
+        self.min_periods = min_periods
+        n = len(self.tickers)
+        self._returns = np.full((window, n), np.nan, dtype="float32")   # ring buffer
+        self._dates = [None] * window
+        self._pos = 0         # next slot to write
+        self._rows = 0        # filled slots
+        self._last_close = np.full(n, np.nan)
+        self._base_close = np.full(n, np.nan)   # closes the newest row's returns were measured from
+        self._count = np.zeros((n, n))
+        self._sum = np.zeros((n, n))       # [i, j]: sum of x_i over rows where j is present too
+        self._sum_sq = np.zeros((n, n))
+        self._cross = np.zeros((n, n))
+        self._order = np.arange(n)
+        self._lock = threading.Lock()
+
+    @property
+    def last_date(self):
+        return self._dates[(self._pos - 1) % self.window] if self._rows else None
+
+    # --- running sums ---
+    def _apply(self, x: np.ndarray, sign: float):
+        """Add (sign=1) or remove (sign=-1) one return row: O(N^2)."""
+        present = ~np.isnan(x)
+        m = present.astype("float64")
+        v = np.where(present, x, 0.0).astype("float64")
+        self._count += sign * np.outer(m, m)
+        self._sum += sign * np.outer(v, m)
+        self._sum_sq += sign * np.outer(v * v, m)
+        self._cross += sign * np.outer(v, v)
+
+    def _rebuild(self):
+        """All sums from the buffer at once (matrix products; used for large batches)."""
+        x = self._returns[:self._rows] if self._rows < self.window else self._returns
+        present = ~np.isnan(x)
+        m = present.astype("float64")
+        v = np.where(present, x, 0.0).astype("float64")
+        self._count, self._sum = m.T @ m, v.T @ m
+        self._sum_sq, self._cross = (v * v).T @ m, v.T @ v
+
+    def _push(self, day, x: np.ndarray, incremental: bool):
+        if incremental and self._rows == self.window:
+            self._apply(self._returns[self._pos].astype("float64"), -1.0)
+        self._returns[self._pos] = x
+        self._dates[self._pos] = day
+        if incremental:
+            self._apply(self._returns[self._pos].astype("float64"), 1.0)
+        self._pos = (self._pos + 1) % self.window
+        self._rows = min(self._rows + 1, self.window)
+
+    def _returns_from(self, base: np.ndarray, close: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return close / base - 1.0
+
+    # --- updates ---
+    def update(self, closes: pd.DataFrame) -> int:
+        """Take in the bars of `closes` (dates x tickers) newer than the last one seen; a changed
+        close on the last date (a partial bar re-fetched) revises that row. Returns rows added."""
+        frame = closes.reindex(columns=self.tickers).sort_index()
+        with self._lock:
+            last = self.last_date
+            if last is not None and last in frame.index:
+                self._revise(frame.loc[last].to_numpy(dtype="float64"))
+            new = frame[frame.index > last] if last is not None else frame
+            values = new.to_numpy(dtype="float64")
+            incremental = 2 * len(values) < self.window
+            for day, close in zip(new.index, values):
+                base = self._last_close
+                self._push(day, self._returns_from(base, close), incremental)
+                self._base_close = base
+                self._last_close = np.where(np.isnan(close), base, close)
+            if len(values) and not incremental:
+                self._rebuild()
+            if len(values):
+                self._order = cluster_order(self._corr())
+            return len(values)
+
+    def _revise(self, close: np.ndarray):
+        slot = (self._pos - 1) % self.window
+        new_close = np.where(np.isnan(close), self._base_close, close)
+        if np.array_equal(new_close, self._last_close, equal_nan=True):
+            return
+        self._apply(self._returns[slot].astype("float64"), -1.0)
+        self._returns[slot] = self._returns_from(self._base_close, close)
+        self._apply(self._returns[slot].astype("float64"), 1.0)
+        self._last_close = new_close
+        self._order = cluster_order(self._corr())
+
+    # --- results ---
+    def _corr(self) -> np.ndarray:
+        n = np.where(self._count > 0, self._count, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = self._cross - self._sum * self._sum.T / n
+            var_i = self._sum_sq - self._sum ** 2 / n
+            corr = cov / np.sqrt(var_i * var_i.T)
+        corr[(self._count < self.min_periods) | ~np.isfinite(corr)] = np.nan
+        np.clip(corr, -1.0, 1.0, out=corr)
+        return corr
+
+    def corr(self) -> pd.DataFrame:
+        """Correlation matrix labelled by ticker (NaN where a pair lacks min_periods returns)."""
+        with self._lock:
+            return pd.DataFrame(self._corr(), index=self.tickers, columns=self.tickers)
+
+    def order(self) -> list:
+        """Tickers in cluster order (correlated tickers next to each other)."""
+        with self._lock:
+            return [self.tickers[i] for i in self._order]
+
+    def clustered(self) -> pd.DataFrame:
+        """corr() with rows and columns in cluster order."""
+        with self._lock:
+            idx = self._order
+            labels = [self.tickers[i] for i in idx]
+            return pd.DataFrame(self._corr()[np.ix_(idx, idx)], index=labels, columns=labels)
+
+# ---------- ORDERING ----------
+def cluster_order(corr: np.ndarray) -> np.ndarray:
+    """Leaf order of an average-linkage clustering on 1 - correlation (unknown pairs: distance 1)."""
+    n = len(corr)
+    if n < 3:
+        return np.arange(n)
+    dist = 1.0 - np.nan_to_num(corr, nan=0.0)
+    np.fill_diagonal(dist, 0.0)
+    dist = np.clip((dist + dist.T) / 2, 0.0, 2.0)
+    if linkage is not None:
+        return leaves_list(linkage(squareform(dist, checks=False), method="average"))
+    return _average_linkage_order(dist)
+
+def _average_linkage_order(dist: np.ndarray) -> np.ndarray:
+    """Average linkage without scipy: N - 1 merges, each a vectorized argmin and row update."""
+    n = len(dist)
+    d = dist.astype("float64").copy()
+    np.fill_diagonal(d, np.inf)
+    sizes = np.ones(n)
+    members = [[i] for i in range(n)]
+    for _ in range(n - 1):
+        i, j = np.unravel_index(np.argmin(d), d.shape)
+        i, j = min(i, j), max(i, j)
+        merged = (d[i] * sizes[i] + d[j] * sizes[j]) / (sizes[i] + sizes[j])
+        d[i], d[:, i] = merged, merged
+        d[i, i] = np.inf
+        d[j], d[:, j] = np.inf, np.inf
+        sizes[i] += sizes[j]
+        members[i] += members[j]
+        members[j] = []
+    return np.array(max(members, key=len))
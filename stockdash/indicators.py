@@ -0,0 +1,283 @@
+# stockdash/indicators.py
+"""Technical indicators for many tickers at once, over dates x tickers matrices.
+
+    series = compute(store.panel(tickers, period_start("1y")))   # name -> dates x tickers frame (charts)
+    engine = IndicatorEngine(tickers)
+    engine.update(panel)                                        # only dates after the last one are new
+    engine.latest()                                             # one row per ticker (screener)
+
+Indicators (CONFIG sets the windows):
+  sma_20, sma_50      simple moving averages of the close
+  ema_20              exponential moving average (alpha = 2 / (span + 1))
+  rsi_14              Wilder RSI (gains and losses smoothed with alpha = 1 / n)
+  macd, macd_signal, macd_hist   EMA(12) - EMA(26), its EMA(9), and their difference
+  bb_upper, bb_lower, bb_pct_b   SMA(20) +/- 2 population standard deviations, and %B
+  atr_14              Wilder average true range (high / low / close)
+  volatility_20       annualized standard deviation of daily log returns, in %
+
+Close-based indicators use the adjusted close; ATR uses the unadjusted high, low and close. A
+ticker's change, true range and return are measured from its last known close. A window
+indicator is NaN until its window has no missing bar; a smoothed one until it has seen `n` values
+and skips missing bars, carrying its last value over them (pandas rolling(n) and
+ewm(adjust=False, ignore_na=True, min_periods=n) semantics).
+
+`compute` is the batch form: window indicators from cumulative sums, smoothed ones in one pass
+over the dates, each step vectorized across tickers. IndicatorEngine keeps the running state
+(window sums, smoother values, last close) so each new bar costs O(tickers), whatever the history
+length; a changed last bar (a partial bar re-fetched) is undone and re-applied.
+"""
+import numpy as np
+import pandas as pd
+
+# ---------- CONFIG ----------
+SMA_WINDOWS = (20, 50)
+EMA_SPAN = 20
+RSI_N = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BOLL_N, BOLL_K = 20, 2.0
+ATR_N = 14
+VOL_N = 20
+TRADING_DAYS = 252
+HISTORY = "1y"   # history fed to a new engine: enough for every window to warm up
+PANEL_FIELDS = ("adj_close", "high", "low", "close")
+INDICATORS = [f"sma_{n}" for n in SMA_WINDOWS] + [
+    f"ema_{EMA_SPAN}", f"rsi_{RSI_N}", "macd", "macd_signal", "macd_hist",
+    "bb_upper", "bb_lower", "bb_pct_b", f"atr_{ATR_N}", f"volatility_{VOL_N}"]
+
+# ---------- BATCH ----------
+def _prev_valid(x: np.ndarray) -> np.ndarray:
+    """Per column, the last non-NaN value strictly before each row (NaN if none)."""
+    valid = ~np.isnan(x)
+    idx = np.where(valid, np.arange(len(x))[:, None], -1)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    prev = np.full_like(x, np.nan)
+    if len(x) > 1:
+        last = idx[:-1]
+        prev[1:] = np.where(last >= 0, x[np.maximum(last, 0), np.arange(x.shape[1])], np.nan)
+    return prev
+
+def _rolling(x: np.ndarray, n: int) -> tuple:
+    """(sum, sum of squares) over each row's last n rows; NaN unless all n are present."""
+    valid = ~np.isnan(x)
+    v = np.where(valid, x, 0.0)
+    zero = np.zeros((1, x.shape[1]))
+    cs = np.concatenate([zero, np.cumsum(v, axis=0)])
+    cq = np.concatenate([zero, np.cumsum(v * v, axis=0)])
+    cc = np.concatenate([zero, np.cumsum(valid, axis=0)])
+    s = np.full_like(x, np.nan)
+    q = np.full_like(x, np.nan)
+    if len(x) >= n:
+        full = (cc[n:] - cc[:-n]) == n
+        s[n - 1:] = np.where(full, cs[n:] - cs[:-n], np.nan)
+        q[n - 1:] = np.where(full, cq[n:] - cq[:-n], np.nan)
+    return s, q
+
+def sma(x: np.ndarray, n: int) -> np.ndarray:
+    return _rolling(x, n)[0] / n
+
+def rolling_std(x: np.ndarray, n: int, ddof: int = 0) -> np.ndarray:
+    s, q = _rolling(x, n)
+    return np.sqrt(np.maximum(q - s * s / n, 0.0) / (n - ddof))
+
+def smooth(x: np.ndarray, alpha: float, min_periods: int = 1) -> np.ndarray:
+    """y_t = y_{t-1} + alpha * (x_t - y_{t-1}) seeded with the first value; NaN leaves y as is.
+
+    Column by column, the same as DataFrame.ewm(alpha=alpha, adjust=False, ignore_na=True,
+    min_periods=min_periods).mean(): a missing value neither moves y nor decays its weight.
+    """
+    s = _Smoother(x.shape[1], alpha, min_periods)
+    return np.array([s.push(row) for row in x]).reshape(x.shape)
+
+def compute(panel: dict) -> dict:
+    """Every indicator as a dates x tickers frame from a panel (field -> dates x tickers frame)."""
+    close_df = panel["adj_close"]
+    c = close_df.to_numpy(dtype="float64")
+    hi, lo, raw = (panel[f].reindex_like(close_df).to_numpy(dtype="float64") for f in ("high", "low", "close"))
+    out = {f"sma_{n}": sma(c, n) for n in SMA_WINDOWS}
+    out[f"ema_{EMA_SPAN}"] = smooth(c, 2 / (EMA_SPAN + 1), EMA_SPAN)
+    change = c - _prev_valid(c)
+    gain = smooth(np.where(np.isnan(change), np.nan, np.maximum(change, 0.0)), 1 / RSI_N, RSI_N)
+    loss = smooth(np.where(np.isnan(change), np.nan, np.maximum(-change, 0.0)), 1 / RSI_N, RSI_N)
+    out[f"rsi_{RSI_N}"] = _rsi(gain, loss)
+    fast = smooth(c, 2 / (MACD_FAST + 1), MACD_FAST)
+    slow = smooth(c, 2 / (MACD_SLOW + 1), MACD_SLOW)
+    macd = fast - slow
+    signal = smooth(np.where(np.isnan(c), np.nan, macd), 2 / (MACD_SIGNAL + 1), MACD_SIGNAL)   # no bar: no new value
+    out.update(macd=macd, macd_signal=signal, macd_hist=macd - signal)
+    mid, sd = sma(c, BOLL_N), rolling_std(c, BOLL_N)
+    out.update(_bollinger(c, mid, sd))
+    out[f"atr_{ATR_N}"] = smooth(_true_range(hi, lo, _prev_valid(raw)), 1 / ATR_N, ATR_N)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_ret = np.log(c / _prev_valid(c))
+    out[f"volatility_{VOL_N}"] = rolling_std(log_ret, VOL_N, ddof=1) * np.sqrt(TRADING_DAYS) * 100
+    return {name: pd.DataFrame(out[name], index=close_df.index, columns=close_df.columns) for name in INDICATORS}
+
+def _rsi(gain, loss):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+    return np.where((loss == 0) & (gain == 0), 50.0, np.where(loss == 0, 100.0, rsi))
+
+def _bollinger(c, mid, sd) -> dict:
+    upper, lower = mid + BOLL_K * sd, mid - BOLL_K * sd
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_b = (c - lower) / (upper - lower)
+    return {"bb_upper": upper, "bb_lower": lower, "bb_pct_b": pct_b}
+
+def _true_range(hi, lo, prev_close):
+    return np.fmax(hi - lo, np.fmax(np.abs(hi - prev_close), np.abs(lo - prev_close)))
+
+# ---------- STATE ----------
+class _Window:
+    """Running sum / sum of squares / count of the last n values per ticker; O(tickers) per push."""
+    def __init__(self, width: int, n: int):
+        self.n = n
+        self.buf = np.full((n, width), np.nan)
+        self.pos = 0
+        self.sum = np.zeros(width)
+        self.sq = np.zeros(width)
+        self.count = np.zeros(width)
+        self._undo = None
+
+    def push(self, x: np.ndarray):
+        old = self.buf[self.pos].copy()
+        self._undo = (self.pos, old, self.sum.copy(), self.sq.copy(), self.count.copy())
+        for values, sign in ((old, -1.0), (x, 1.0)):
+            valid = ~np.isnan(values)
+            v = np.where(valid, values, 0.0)
+            self.sum += sign * v
+            self.sq += sign * v * v
+            self.count += sign * valid
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.n
+
+    def undo(self):
+        self.pos, old, self.sum, self.sq, self.count = self._undo
+        self.buf[self.pos] = old
+
+    def mean(self) -> np.ndarray:
+        return np.where(self.count == self.n, self.sum / self.n, np.nan)
+
+    def std(self, ddof: int = 0) -> np.ndarray:
+        var = np.maximum(self.sq - self.sum * self.sum / self.n, 0.0) / (self.n - ddof)
+        return np.where(self.count == self.n, np.sqrt(var), np.nan)
+
+class _Smoother:
+    """Exponential smoothing per ticker (see `smooth`): pandas ewm with adjust=False and
+    ignore_na=True, so a NaN input is skipped rather than decaying the state; NaN until
+    min_periods non-NaN values were seen."""
+    def __init__(self, width: int, alpha: float, min_periods: int = 1):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.y = np.full(width, np.nan)
+        self.seen = np.zeros(width)
+        self._undo = None
+
+    def push(self, x: np.ndarray) -> np.ndarray:
+        self._undo = (self.y.copy(), self.seen.copy())
+        valid = ~np.isnan(x)
+        self.y = np.where(valid, np.where(np.isnan(self.y), x, self.y + self.alpha * (x - self.y)), self.y)
+        self.seen += valid
+        return self.value()
+
+    def undo(self):
+        self.y, self.seen = self._undo
+
+    def value(self) -> np.ndarray:
+        return np.where(self.seen >= self.min_periods, self.y, np.nan)
+
+# ---------- ENGINE ----------
+class IndicatorEngine:
+    """Latest indicator values for `tickers`, advanced one bar at a time in O(tickers)."""
+    def __init__(self, tickers: list):
+        self.tickers = list(tickers)
+        w = len(self.tickers)
+        self.last_date = None
+        self._windows = {n: _Window(w, n) for n in set(SMA_WINDOWS) | {BOLL_N}}
+        self._ret_window = _Window(w, VOL_N)
+        self._ema = _Smoother(w, 2 / (EMA_SPAN + 1), EMA_SPAN)
+        self._fast = _Smoother(w, 2 / (MACD_FAST + 1), MACD_FAST)
+        self._slow = _Smoother(w, 2 / (MACD_SLOW + 1), MACD_SLOW)
+        self._signal = _Smoother(w, 2 / (MACD_SIGNAL + 1), MACD_SIGNAL)
+        self._gain = _Smoother(w, 1 / RSI_N, RSI_N)
+        self._loss = _Smoother(w, 1 / RSI_N, RSI_N)
+        self._atr = _Smoother(w, 1 / ATR_N, ATR_N)
+        self._close = np.full(w, np.nan)      # last known adjusted close
+        self._raw = np.full(w, np.nan)        # last known unadjusted close (for the true range)
+        self._prev = None                     # (_close, _raw) before the newest bar, for revisions
+        self._row = (np.full(w, np.nan),) * len(PANEL_FIELDS)   # the newest bar, per PANEL_FIELDS
+        self._day_change = np.full(w, np.nan)
+
+    def _parts(self):
+        return [*self._windows.values(), self._ret_window, self._ema, self._fast, self._slow,
+                self._signal, self._gain, self._loss, self._atr]
+
+    def _push(self, c: np.ndarray, hi: np.ndarray, lo: np.ndarray, raw: np.ndarray):
+        self._prev = (self._close, self._raw)
+        change = c - self._close
+        for window in self._windows.values():
+            window.push(c)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._ret_window.push(np.log(c / self._close))
+            self._day_change = change / self._close * 100
+        self._ema.push(c)
+        macd = self._fast.push(c) - self._slow.push(c)
+        self._signal.push(np.where(np.isnan(c), np.nan, macd))
+        self._gain.push(np.where(np.isnan(change), np.nan, np.maximum(change, 0.0)))
+        self._loss.push(np.where(np.isnan(change), np.nan, np.maximum(-change, 0.0)))
+        self._atr.push(_true_range(hi, lo, self._raw))
+        self._close = np.where(np.isnan(c), self._close, c)
+        self._raw = np.where(np.isnan(raw), self._raw, raw)
+        self._row = (c, hi, lo, raw)
+
+    def _undo(self):
+        for part in self._parts():
+            part.undo()
+        self._close, self._raw = self._prev
+
+    def update(self, panel: dict) -> int:
+        """Feed the panel's bars (field -> dates x tickers frame, PANEL_FIELDS) newer than the last
+        one seen; a changed last bar is replaced. Returns the number of new bars."""
+        frames = {}
+        for f in PANEL_FIELDS:
+            frame = panel[f].sort_index()
+            if self.last_date is not None:   # only the last seen bar and newer ones matter
+                frame = frame[frame.index >= self.last_date]
+            frames[f] = frame.reindex(columns=self.tickers)
+        closes = frames["adj_close"]
+        rows = {f: frames[f].reindex(closes.index).to_numpy(dtype="float64") for f in PANEL_FIELDS}
+        if self.last_date is not None and self.last_date in closes.index:
+            i = closes.index.get_loc(self.last_date)
+            if not all(np.array_equal(rows[f][i], last, equal_nan=True) for f, last in zip(PANEL_FIELDS, self._row)):
+                self._undo()
+                self._push(*(rows[f][i] for f in PANEL_FIELDS))
+        new = np.flatnonzero(closes.index > self.last_date) if self.last_date is not None else np.arange(len(closes))
+        for i in new:
+            self._push(*(rows[f][i] for f in PANEL_FIELDS))
+        if len(new):
+            self.last_date = closes.index[new[-1]]
+        return len(new)
+
+    def latest(self) -> pd.DataFrame:
+        """One row per ticker: close, 1-day % change and every indicator at the last bar."""
+        c = self._close
+        mid, sd = self._windows[BOLL_N].mean(), self._windows[BOLL_N].std()
+        macd = self._fast.value() - self._slow.value()
+        signal = self._signal.value()
+        atr = self._atr.value()
+        values = {f"sma_{n}": self._windows[n].mean() for n in SMA_WINDOWS}
+        values[f"ema_{EMA_SPAN}"] = self._ema.value()
+        values[f"rsi_{RSI_N}"] = _rsi(self._gain.value(), self._loss.value())
+        values.update(macd=macd, macd_signal=signal, macd_hist=macd - signal)
+        values.update(_bollinger(c, mid, sd))
+        values[f"atr_{ATR_N}"] = atr
+        values[f"volatility_{VOL_N}"] = self._ret_window.std(ddof=1) * np.sqrt(TRADING_DAYS) * 100
+        with np.errstate(divide="ignore", invalid="ignore"):
+            atr_pct = atr / c * 100
+        return pd.DataFrame({"Ticker": self.tickers, "close": c, "change_1d": self._day_change,
+                             **{k: values[k] for k in INDICATORS}, "atr_pct": atr_pct})
+
+def screen(panel: dict) -> pd.DataFrame:
+    """IndicatorEngine.latest() for every ticker in a panel, from scratch."""
+    engine = IndicatorEngine(list(panel["adj_close"].columns))
+    engine.update(panel)
+    return engine.latest()
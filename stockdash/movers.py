@@ -0,0 +1,44 @@
+# stockdash/movers.py
+"""Gainers and losers over a window, for every ticker at once.
+
+    closes = store.closes(universe(symbols, series, kind), period_start("30d"))
+    board = rank_movers(closes, names)        # Ticker, Company, Last Price, % Change; best first
+
+The change is computed on the dates x tickers close matrix in one pass: each column's first and
+last non-missing price (a ticker listed or suspended mid-window is measured over the bars it
+has), no per-ticker loop.
+"""
+import numpy as np
+import pandas as pd
+
+MOVER_COLUMNS = ["Ticker", "Company", "Last Price", "% Change"]
+
+# ---------- RETURNS ----------
+def window_change(closes: pd.DataFrame) -> pd.DataFrame:
+    """Per ticker: first and last price in the window, and % change between them.
+
+    Tickers with fewer than two prices are dropped.
+    """
+    values = closes.to_numpy(dtype="float64")
+    present = ~np.isnan(values)
+    keep = present.sum(axis=0) >= 2
+    cols = np.flatnonzero(keep)
+    if len(cols):
+        first = values[present[:, cols].argmax(axis=0), cols]
+        last = values[len(values) - 1 - present[::-1, cols].argmax(axis=0), cols]
+    else:
+        first = last = np.zeros(0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (last / first - 1.0) * 100.0
+    return pd.DataFrame({"Ticker": closes.columns[keep], "First Price": first, "Last Price": last,
+                         "% Change": change}).replace([np.inf, -np.inf], np.nan).dropna(subset=["% Change"])
+
+# ---------- RANKING ----------
+def rank_movers(closes: pd.DataFrame, names: dict = None) -> pd.DataFrame:
+    """MOVER_COLUMNS for every ticker in `closes`, sorted by % change (gainers first)."""
+    moves = window_change(closes)
+    order = np.argsort(-moves["% Change"].to_numpy(), kind="stable")
+    board = moves.iloc[order].reset_index(drop=True)
+    board["Company"] = board["Ticker"].map(names or {}).fillna("")
+    board["% Change"] = board["% Change"].round(2)
+    return board[MOVER_COLUMNS]
@@ -0,0 +1,390 @@
+# stockdash/prices.py
+"""Daily OHLCV bars: pluggable data sources and an on-disk store that only fetches what it lacks.
+
+    store = PriceStore("prices.sqlite", YahooSource())
+    frames = store.frames(["TCS.NS", "INFY.NS"], period_start("1mo"))   # ticker -> OHLCV frame
+    closes = store.closes(tickers, start)                              # dates x tickers matrix
+
+The store is one SQLite file: a `bars` table keyed by (ticker, date) and a `coverage` table with
+the date range already fetched per ticker (holidays and missing days included, so they are not
+asked for again). A request fetches only the gaps before and after that range, plus the latest
+days again once they are REFRESH_SECONDS old (today's bar is partial until the close). Tickers
+with the same gap go to the source in batches of BATCH_SIZE, FETCH_WORKERS batches at a time;
+remote sources are started no faster than FETCH_RATE tickers per second. A failing batch is
+retried FETCH_RETRIES times with backoff, then logged and left uncovered (the next request tries
+it again). Every window (30 days, 7 days, ...) is a read of the same stored history.
+
+Sources implement `fetch(tickers, start, end)` and return long-format bars (BAR_COLUMNS):
+  YahooSource      yfinance download (needs network)
+  FixtureSource    bars from a local CSV / Parquet file or DataFrame, for tests and offline runs
+  SyntheticSource  deterministic random-walk bars for any ticker, for demos without data
+source_from_env() picks one from STOCKDASH_PRICE_SOURCE (yahoo | fixture | synthetic).
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+try:  # optional: live prices
+    import yfinance as yf
+except ImportError:
+    yf = None
+
+# ---------- CONFIG ----------
+STORE_PATH = os.environ.get("STOCKDASH_PRICE_STORE", "price_store.sqlite")
+PRICE_SOURCE = os.environ.get("STOCKDASH_PRICE_SOURCE", "yahoo")
+FIXTURE_PATH = os.environ.get("STOCKDASH_FIXTURE", "price_fixture.csv")
+REFRESH_SECONDS = int(os.environ.get("STOCKDASH_REFRESH_SECONDS", "600"))   # re-fetch recent bars after this
+RECENT_DAYS = 4           # calendar days re-fetched when stale (covers a weekend before today)
+BATCH_SIZE = int(os.environ.get("STOCKDASH_FETCH_BATCH", "25"))        # tickers per source call
+FETCH_WORKERS = int(os.environ.get("STOCKDASH_FETCH_WORKERS", "8"))     # source calls in flight
+FETCH_RATE = float(os.environ.get("STOCKDASH_FETCH_RATE", "50"))        # tickers per second (0: unlimited)
+FETCH_RETRIES = 2
+BAR_COLUMNS = ["ticker", "date", "open", "high", "low", "close", "adj_close", "volume"]
+FRAME_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close",   # yf.download names
+                 "adj_close": "Adj Close", "volume": "Volume"}
+_SQL_PARAMS = 500         # tickers per IN (...) clause
+
+# ---------- DATES ----------
+def period_start(period: str, end: date = None) -> date:
+    """First calendar day of a yfinance-style period ending `end` (default today): 7d, 2wk, 1mo, 1y."""
+    end = end or date.today()
+    period = period.strip().lower()
+    for unit, days in (("wk", 7), ("mo", None), ("y", None), ("d", 1)):
+        if period.endswith(unit):
+            n = int(period[:-len(unit)])
+            if unit == "mo":
+                return (pd.Timestamp(end) - pd.DateOffset(months=n)).date()
+            if unit == "y":
+                return (pd.Timestamp(end) - pd.DateOffset(years=n)).date()
+            return end - timedelta(days=n * days)
+    raise ValueError(f"Unknown period {period!r}; expected e.g. 7d, 2wk, 1mo, 1y")
+
+def _as_date(value) -> date:
+    return pd.Timestamp(value).date()
+
+def _empty_bars() -> pd.DataFrame:
+    return pd.DataFrame(columns=BAR_COLUMNS)
+
+# ---------- SOURCES ----------
+class PriceSource:
+    """Daily bars for many tickers; subclasses implement `fetch`."""
+    name = "base"
+    remote = False   # network sources are rate limited by the store
+
+    def fetch(self, tickers: list, start: date, end: date) -> pd.DataFrame:
+        """Long-format bars (BAR_COLUMNS, date as datetime64) for start..end inclusive."""
+        raise NotImplementedError
+
+class YahooSource(PriceSource):
+    """Yahoo Finance through yfinance: one download call per batch of tickers."""
+    name = "yahoo"
+    remote = True
+
+    def fetch(self, tickers: list, start: date, end: date) -> pd.DataFrame:
+        if yf is None:
+            raise ImportError("YahooSource needs yfinance (pip install yfinance)")
+        # threads=False: the store runs batches concurrently, so it alone bounds the requests in flight
+        data = yf.download(list(tickers), start=start, end=end + timedelta(days=1), interval="1d",
+                           group_by="ticker", auto_adjust=False, progress=False, threads=False)
+        return _from_download(data, list(tickers))
+
+def _stack(data: pd.DataFrame, level: int) -> pd.DataFrame:
+    """DataFrame.stack keeping all-NaN rows, on pandas before and after 2.1's new stack."""
+    try:
+        return data.stack(level=level, future_stack=True)
+    except TypeError:   # pandas < 2.1: no future_stack
+        return data.stack(level=level, dropna=False)
+
+def _from_download(data: pd.DataFrame, tickers: list) -> pd.DataFrame:
+    """yf.download's wide result (one column block per ticker) as long-format bars."""
+    if data is None or data.empty:
+        return _empty_bars()
+    if isinstance(data.columns, pd.MultiIndex):
+        level = 0 if set(tickers) & set(data.columns.get_level_values(0)) else 1
+        long = _stack(data, level).rename_axis(["date", "ticker"]).reset_index()
+    else:
+        long = data.rename_axis("date").reset_index().assign(ticker=tickers[0])
+    long = long.rename(columns={v: k for k, v in FRAME_COLUMNS.items()})
+    if "adj_close" not in long:
+        long["adj_close"] = long["close"]
+    long["date"] = pd.to_datetime(long["date"]).dt.tz_localize(None).dt.normalize()
+    return long.dropna(subset=["close"])[BAR_COLUMNS]
+
+class FixtureSource(PriceSource):
+    """Bars from a local long-format file (CSV or Parquet with BAR_COLUMNS) or DataFrame.
+
+    Stands in for Yahoo in tests and offline runs; tickers it does not have come back empty.
+    """
+    name = "fixture"
+
+    def __init__(self, bars=FIXTURE_PATH):
+        if isinstance(bars, str):
+            bars = pd.read_parquet(bars) if bars.endswith(".parquet") else pd.read_csv(bars)
+        bars = bars.copy()
+        bars["date"] = pd.to_datetime(bars["date"]).dt.normalize()
+        self.bars = bars[BAR_COLUMNS].sort_values(["ticker", "date"]).reset_index(drop=True)
+        self.calls = 0   # fetch calls served (tests check that cached ranges are not re-fetched)
+
+    def fetch(self, tickers: list, start: date, end: date) -> pd.DataFrame:
+        self.calls += 1
+        b = self.bars
+        mask = b["ticker"].isin(tickers) & b["date"].between(pd.Timestamp(start), pd.Timestamp(end))
+        return b[mask].reset_index(drop=True)
+
+class SyntheticSource(PriceSource):
+    """Deterministic random-walk bars on weekdays for any ticker (no network, no files).
+
+    Each ticker's path starts at EPOCH from a seed derived from its name, so overlapping
+    requests always agree on the bars they share.
+    """
+    name = "synthetic"
+    EPOCH = pd.Timestamp("2010-01-01")
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self.calls = 0
+
+    def fetch(self, tickers: list, start: date, end: date) -> pd.DataFrame:
+        self.calls += 1
+        days = pd.bdate_range(self.EPOCH, pd.Timestamp(end))
+        first = int(np.searchsorted(days, pd.Timestamp(start)))
+        n, cols = len(days), {c: [] for c in BAR_COLUMNS[2:]}
+        for t in tickers:
+            rng = np.random.default_rng([zlib.crc32(t.encode()), self.seed])
+            close = rng.uniform(20, 3000) * np.exp(np.cumsum(rng.normal(0.0003, 0.018, n)))
+            spread = np.abs(rng.normal(0, 0.01, (2, n)))
+            open_ = close * (1 + rng.normal(0, 0.005, n))
+            volume = rng.lognormal(12, 1, n).round()
+            cols["open"].append(open_[first:])
+            cols["high"].append((np.maximum(open_, close) * (1 + spread[0]))[first:])
+            cols["low"].append((np.minimum(open_, close) * (1 - spread[1]))[first:])
+            cols["close"].append(close[first:])
+            cols["adj_close"].append(close[first:])
+            cols["volume"].append(volume[first:])
+        if not tickers or first >= n:
+            return _empty_bars()
+        return pd.DataFrame({"ticker": np.repeat(tickers, n - first), "date": np.tile(days[first:], len(tickers)),
+                             **{c: np.concatenate(v) for c, v in cols.items()}})
+
+def source_from_env(kind: str = PRICE_SOURCE) -> PriceSource:
+    """The source named by STOCKDASH_PRICE_SOURCE (yahoo, fixture or synthetic)."""
+    if kind == "fixture":
+        return FixtureSource(FIXTURE_PATH)
+    if kind == "synthetic":
+        return SyntheticSource()
+    if kind == "yahoo":
+        return YahooSource()
+    raise ValueError(f"Unknown price source {kind!r}; expected yahoo, fixture or synthetic")
+
+# ---------- FETCHING ----------
+class RateLimiter:
+    """Spaces out work so that at most `rate` units start per second, across threads."""
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, units: int = 1):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + units / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+def _fetch_with_retry(source: PriceSource, limiter: RateLimiter, batch: list, start: date, end: date,
+                      retries: int = FETCH_RETRIES) -> pd.DataFrame:
+    for attempt in range(retries + 1):
+        limiter.acquire(len(batch))
+        try:
+            return source.fetch(batch, start, end)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(2 ** attempt)
+
+# ---------- STORE ----------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL, date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, adj_close REAL, volume REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT PRIMARY KEY, start TEXT NOT NULL, end TEXT NOT NULL, fetched_at REAL NOT NULL
+);
+"""
+
+class PriceStore:
+    """SQLite-backed daily bars that fetch from `source` only the dates not stored yet.
+
+    Safe to share between threads (sessions): one connection per thread, WAL mode (readers do
+    not wait for the writer), and fetches serialized so two sessions do not download the same gap.
+    """
+    def __init__(self, path: str = STORE_PATH, source: PriceSource = None, workers: int = FETCH_WORKERS,
+                 rate: float = None):
+        self.path = path
+        self.source = source or source_from_env()
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate if rate is not None else FETCH_RATE if self.source.remote else 0)
+        self._fetch_lock = threading.Lock()
+        self._local = threading.local()
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """This thread's connection, in a transaction committed (or rolled back) on exit.
+
+        Connections are kept per thread: closing the last one checkpoints the WAL, which would
+        otherwise happen after every read.
+        """
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = self._local.con = sqlite3.connect(self.path, timeout=30)
+            con.execute("PRAGMA synchronous=NORMAL")   # durable enough under WAL, far fewer fsyncs
+        with con:
+            yield con
+
+    # --- coverage ---
+    def _coverage(self, con, tickers: list) -> dict:
+        out = {}
+        for i in range(0, len(tickers), _SQL_PARAMS):
+            part = tickers[i:i + _SQL_PARAMS]
+            rows = con.execute(f"SELECT ticker, start, end, fetched_at FROM coverage WHERE ticker IN "
+                               f"({','.join('?' * len(part))})", part).fetchall()
+            out.update({t: (date.fromisoformat(s), date.fromisoformat(e), f) for t, s, e, f in rows})
+        return out
+
+    def missing(self, tickers: list, start: date, end: date) -> dict:
+        """(gap start, gap end) -> tickers still to fetch for start..end."""
+        today = date.today()
+        now = time.time()
+        with self._connect() as con:
+            cov = self._coverage(con, list(tickers))
+        gaps = {}
+        for t in tickers:
+            if t not in cov:
+                gaps.setdefault((start, end), []).append(t)
+                continue
+            c_start, c_end, fetched_at = cov[t]
+            if start < c_start:
+                gaps.setdefault((start, c_start - timedelta(days=1)), []).append(t)
+            if end > c_end:
+                gaps.setdefault((c_end + timedelta(days=1), end), []).append(t)
+            elif end >= today and now - fetched_at > REFRESH_SECONDS:
+                # the newest stored days may be partial (fetched before the close): fetch them again
+                gaps.setdefault((max(start, today - timedelta(days=RECENT_DAYS)), end), []).append(t)
+        return gaps
+
+    def update(self, tickers: list, start: date, end: date = None, log: list = None) -> int:
+        """Fetch and store the bars missing for start..end; returns the number of source calls.
+
+        Batches run concurrently (self.workers, self.limiter) and are saved as they arrive; a batch
+        that still fails after retries is noted in `log` and skipped.
+        """
+        start, end = _as_date(start), _as_date(end or date.today())
+        if not self.missing(tickers, start, end):
+            return 0
+        with self._fetch_lock:
+            # again under the lock: another session may have fetched these gaps while this one waited
+            jobs = [(group[i:i + BATCH_SIZE], g_start, g_end)
+                    for (g_start, g_end), group in self.missing(tickers, start, end).items()
+                    for i in range(0, len(group), BATCH_SIZE)]
+            if jobs:
+                self._fetch(jobs, log)
+        return len(jobs)
+
+    def _fetch(self, jobs: list, log: list = None):
+        """Run (batch, start, end) fetch jobs on a thread pool, saving each batch as it arrives."""
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+            futures = [(job, pool.submit(_fetch_with_retry, self.source, self.limiter, *job)) for job in jobs]
+            for (batch, g_start, g_end), fut in futures:
+                try:
+                    empty = self._save(batch, g_start, g_end, fut.result())
+                except Exception as e:
+                    if log is not None:
+                        log.append(f"Price fetch failed for {len(batch)} tickers ({batch[0]}, ...) "
+                                   f"{g_start}..{g_end}: {type(e).__name__}: {e}")
+                    continue
+                if empty and log is not None:
+                    log.append(f"No bars for {len(empty)} tickers ({', '.join(empty[:5])}"
+                               f"{', ...' if len(empty) > 5 else ''}) {g_start}..{g_end}; retried on the next read")
+
+    def _save(self, tickers: list, start: date, end: date, bars: pd.DataFrame) -> list:
+        """Store `bars` and mark start..end covered for the tickers that returned any; returns the others.
+
+        A failed or rate-limited symbol often comes back empty rather than raising, so an empty
+        ticker is left uncovered (fetched again next time) unless the range has no weekday at all.
+        """
+        days = np.datetime_as_string(pd.to_datetime(bars["date"]).to_numpy().astype("datetime64[D]"))
+        values = [bars[c].to_numpy(dtype="float64").tolist() for c in BAR_COLUMNS[2:]]   # NaN binds as NULL
+        got = set(bars["ticker"].unique())
+        trading = np.busday_count(start, end + timedelta(days=1)) > 0
+        empty = [t for t in tickers if t not in got] if trading else []
+        covered = [t for t in tickers if t in got or not trading]
+        now = time.time()
+        with self._connect() as con:
+            con.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            zip(bars["ticker"].tolist(), days.tolist(), *values))
+            cov = self._coverage(con, covered)
+            con.executemany(
+                "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)",
+                [(t, min(start, cov[t][0]).isoformat() if t in cov else start.isoformat(),
+                  max(end, cov[t][1]).isoformat() if t in cov else end.isoformat(), now) for t in covered])
+        return empty
+
+    # --- reads ---
+    def bars(self, tickers: list, start, end=None, fetch: bool = True, log: list = None) -> pd.DataFrame:
+        """Long-format bars for start..end (default today), fetching any gaps first."""
+        tickers = list(dict.fromkeys(tickers))
+        start, end = _as_date(start), _as_date(end or date.today())
+        if fetch:
+            self.update(tickers, start, end, log)
+        parts = []
+        with self._connect() as con:
+            for i in range(0, len(tickers), _SQL_PARAMS):
+                part = tickers[i:i + _SQL_PARAMS]
+                parts.append(pd.read_sql_query(
+                    f"SELECT * FROM bars WHERE ticker IN ({','.join('?' * len(part))}) AND date BETWEEN ? AND ? "
+                    f"ORDER BY ticker, date", con, params=[*part, start.isoformat(), end.isoformat()]))
+        out = pd.concat(parts, ignore_index=True) if parts else _empty_bars()
+        out["date"] = pd.to_datetime(out["date"])
+        return out
+
+    def frames(self, tickers: list, start, end=None, log: list = None) -> dict:
+        """ticker -> OHLCV frame indexed by date with yf.download's column names (Adj Close, ...)."""
+        bars = self.bars(tickers, start, end, log=log)
+        groups = {t: g for t, g in bars.groupby("ticker", sort=False)}
+        return {t: groups[t].set_index("date")[list(FRAME_COLUMNS)].rename(columns=FRAME_COLUMNS).rename_axis("Date")
+                for t in dict.fromkeys(tickers) if t in groups}
+
+    def closes(self, tickers: list, start, end=None, field: str = "adj_close", log: list = None) -> pd.DataFrame:
+        """Dates x tickers matrix of `field` (float64; NaN where a ticker has no bar that day)."""
+        return self.panel(tickers, start, end, fields=(field,), log=log)[field]
+
+    def panel(self, tickers: list, start, end=None, fields=("open", "high", "low", "close", "adj_close", "volume"),
+              log: list = None) -> dict:
+        """field -> dates x tickers matrix, every field on the same dates and columns (one read).
+
+        Tickers without any stored bar are left out; with none at all every matrix is empty.
+        """
+        bars = self.bars(tickers, start, end, log=log)
+        order = [t for t in dict.fromkeys(tickers) if t in set(bars["ticker"])]
+        if bars.empty:
+            index = pd.DatetimeIndex([], name="date")
+            return {f: pd.DataFrame(index=index, columns=pd.Index(order, name="ticker"), dtype="float64")
+                    for f in fields}
+        wide = bars.pivot(index="date", columns="ticker", values=list(fields))
+        return {f: wide[f].astype("float64").reindex(columns=order) for f in fields}
@@ -0,0 +1,303 @@
+# stockdash/sentiment.py
+"""News headlines and their VADER sentiment, for one company or a whole movers board.
+
+    service = SentimentService(news_source_from_env())
+    items = service.news("Infosys")                 # list of {"title", "date", "link", "media"}
+    service.summary(items)                          # Headline, Sentiment per item
+    service.board({"INFY.NS": "Infosys", ...}, budget=3.0)   # Ticker, Sentiment, Headlines, Label
+
+One service lives for the whole process: one analyzer (its lexicon is loaded once), an LRU of
+scores keyed by a hash of the headline text (a headline seen for any company, in any session,
+is scored once), news cached per query for NEWS_TTL seconds, and a thread pool that fetches
+news for many companies at once, no faster than NEWS_RATE queries per second from a remote
+source. `news` for one company takes its query out of the pool's queue rather than wait behind
+a whole board. `board` waits at most `budget` seconds: queries not back by
+then are reported as pending and keep running, so a later page load finds them cached. A failed
+fetch caches no news; the failure is remembered for FAIL_TTL seconds, during which the query is
+reported as unavailable rather than pending and is not fetched again.
+
+Sources implement `fetch(query, limit)`:
+  GoogleNewsSource     GoogleNews search over the last 7 days (needs network)
+  FixtureNewsSource    headlines from a local CSV (query, title[, date, link, media])
+  SyntheticNewsSource  deterministic made-up headlines per query, for offline runs
+news_source_from_env() picks one from STOCKDASH_NEWS_SOURCE (google | fixture | synthetic).
+"""
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from .prices import RateLimiter
+
+try:  # optional: scoring
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+except ImportError:
+    SentimentIntensityAnalyzer = None
+try:  # optional: live news
+    from GoogleNews import GoogleNews
+except ImportError:
+    GoogleNews = None
+
+# ---------- CONFIG ----------
+NEWS_SOURCE = os.environ.get("STOCKDASH_NEWS_SOURCE", "google")
+NEWS_FIXTURE = os.environ.get("STOCKDASH_NEWS_FIXTURE", "news_fixture.csv")
+NEWS_WORKERS = int(os.environ.get("STOCKDASH_NEWS_WORKERS", "8"))          # queries in flight
+NEWS_RATE = float(os.environ.get("STOCKDASH_NEWS_RATE", "1"))              # queries per second (0: unlimited)
+NEWS_TTL = int(os.environ.get("STOCKDASH_NEWS_TTL", "1800"))               # seconds a query's news is reused
+FAIL_TTL = int(os.environ.get("STOCKDASH_NEWS_FAIL_TTL", "120"))           # seconds a failed query is not retried
+PAGE_BUDGET = float(os.environ.get("STOCKDASH_SENTIMENT_BUDGET", "3.0"))   # seconds a page waits for news
+SCORE_CACHE_SIZE = 50_000   # headline scores kept (LRU)
+NEWS_LIMIT = 8              # headlines per query
+POSITIVE, NEGATIVE = 0.05, -0.05   # VADER compound thresholds
+BOARD_COLUMNS = ["Ticker", "Sentiment", "Headlines", "Label"]
+UNAVAILABLE = "⚠️ Unavailable"   # Label for a ticker whose news fetch failed
+
+def sentiment_label(score: float) -> str:
+    if pd.isna(score):
+        return "⏳ Pending"
+    if score > POSITIVE:
+        return "🟢 Positive"
+    if score < NEGATIVE:
+        return "🔴 Negative"
+    return "🟡 Neutral"
+
+# ---------- SOURCES ----------
+class NewsSource:
+    """Recent headlines for a query; subclasses implement `fetch`."""
+    name = "base"
+    remote = False   # network sources are rate limited by the service
+
+    def fetch(self, query: str, limit: int = NEWS_LIMIT) -> list:
+        """Up to `limit` items, each a dict with at least "title"."""
+        raise NotImplementedError
+
+class GoogleNewsSource(NewsSource):
+    """GoogleNews search over the last 7 days; one client per call (the client keeps state)."""
+    name = "google"
+    remote = True
+
+    def __init__(self, period: str = "7d"):
+        if GoogleNews is None:
+            raise ImportError("GoogleNewsSource needs GoogleNews (pip install GoogleNews)")
+        self.period = period
+
+    def fetch(self, query: str, limit: int = NEWS_LIMIT) -> list:
+        client = GoogleNews(period=self.period)
+        client.search(query)
+        return [{k: item.get(k) for k in ("title", "date", "link", "media")} for item in client.result()[:limit]]
+
+class FixtureNewsSource(NewsSource):
+    """Headlines from a local CSV or DataFrame with `query` and `title` columns (query matched
+    case-insensitively); stands in for the live source in tests and offline runs."""
+    name = "fixture"
+
+    def __init__(self, items=NEWS_FIXTURE):
+        frame = pd.read_csv(items, dtype=str, keep_default_na=False) if isinstance(items, str) else items
+        self._items = {}
+        for query, group in frame.groupby(frame["query"].str.upper(), sort=False):
+            self._items[query] = group.drop(columns="query").to_dict("records")
+
+    def fetch(self, query: str, limit: int = NEWS_LIMIT) -> list:
+        return self._items.get(query.upper(), [])[:limit]
+
+_TEMPLATES = [
+    "{c} shares surge after strong quarterly results", "{c} wins major order, brokerages upgrade target",
+    "{c} reports record profit and higher dividend", "{c} stock rallies as demand outlook improves",
+    "{c} shares fall after weak earnings miss", "{c} faces regulatory probe, stock slumps",
+    "{c} cuts guidance amid rising costs and losses", "{c} downgraded as margins come under pressure",
+    "{c} to hold board meeting next week", "{c} announces management change",
+    "{c} trading volumes in focus today", "{c} files quarterly shareholding pattern",
+]
+
+class SyntheticNewsSource(NewsSource):
+    """Made-up headlines from fixed templates, the same for a query all day (no network)."""
+    name = "synthetic"
+
+    def __init__(self, seed: int = 0, delay: float = 0.0):
+        self.seed = seed
+        self.delay = delay   # seconds per fetch, to mimic a network source
+        self.calls = 0
+
+    def fetch(self, query: str, limit: int = NEWS_LIMIT) -> list:
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        rng = np.random.default_rng([zlib.crc32(query.upper().encode()), date.today().toordinal(), self.seed])
+        picks = rng.choice(len(_TEMPLATES), size=min(limit, int(rng.integers(2, 9))), replace=False)
+        return [{"title": _TEMPLATES[i].format(c=query), "date": date.today().isoformat(), "link": "",
+                 "media": "synthetic"} for i in picks]
+
+def news_source_from_env(kind: str = NEWS_SOURCE) -> NewsSource:
+    """The source named by STOCKDASH_NEWS_SOURCE (google, fixture or synthetic)."""
+    if kind == "google":
+        return GoogleNewsSource()
+    if kind == "fixture":
+        return FixtureNewsSource(NEWS_FIXTURE)
+    if kind == "synthetic":
+        return SyntheticNewsSource()
+    raise ValueError(f"Unknown news source {kind!r}; expected google, fixture or synthetic")
+
+# ---------- SERVICE ----------
+def _headline_key(text: str) -> bytes:
+    return hashlib.blake2b(" ".join(text.split()).encode("utf-8"), digest_size=16).digest()
+
+class SentimentService:
+    """Long-lived analyzer, score LRU, per-query news cache and fetch pool; safe to share."""
+    def __init__(self, source: NewsSource = None, workers: int = NEWS_WORKERS,
+                 cache_size: int = SCORE_CACHE_SIZE, news_ttl: int = NEWS_TTL, fail_ttl: int = FAIL_TTL,
+                 rate: float = None):
+        if SentimentIntensityAnalyzer is None:
+            raise ImportError("SentimentService needs vaderSentiment (pip install vaderSentiment)")
+        self.source = source or news_source_from_env()
+        self.analyzer = SentimentIntensityAnalyzer()
+        self.cache_size = cache_size
+        self.news_ttl = news_ttl
+        self.fail_ttl = fail_ttl
+        self.limiter = RateLimiter(rate if rate is not None else NEWS_RATE if self.source.remote else 0)
+        self.stats = {"hits": 0, "misses": 0, "fetches": 0, "fetch_errors": 0}
+        self._scores = OrderedDict()   # headline hash -> compound score, least recently used first
+        self._news = {}                # query -> (fetched at, items)
+        self._pending = {}             # query -> Future
+        self._failed = {}              # query -> time of the last failed fetch
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="news")
+
+    # --- scoring ---
+    def score(self, headlines: list) -> np.ndarray:
+        """VADER compound score per headline; repeated and previously seen headlines are not re-scored."""
+        keys = [_headline_key(h or "") for h in headlines]
+        out = np.empty(len(keys))
+        todo = {}
+        with self._lock:
+            for i, k in enumerate(keys):
+                if k in self._scores:
+                    self._scores.move_to_end(k)
+                    out[i] = self._scores[k]
+                    self.stats["hits"] += 1
+                else:
+                    todo.setdefault(k, []).append(i)
+        for k, rows in todo.items():   # outside the lock: scoring is the slow part
+            out[rows] = self.analyzer.polarity_scores(headlines[rows[0]] or "")["compound"]
+        with self._lock:
+            self.stats["misses"] += len(todo)
+            for k, rows in todo.items():
+                self._scores[k] = out[rows[0]]
+            while len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+        return out
+
+    def summary(self, items: list) -> pd.DataFrame:
+        """Headline and Sentiment per news item."""
+        titles = [item.get("title") or "" for item in items]
+        return pd.DataFrame({"Headline": titles, "Sentiment": self.score(titles)})
+
+    # --- news ---
+    def _fetch(self, query: str, limit: int) -> list:
+        self.limiter.acquire()
+        try:
+            items = self.source.fetch(query, limit)
+        except Exception:   # no news cached; retried once fail_ttl has passed
+            with self._lock:
+                self.stats["fetch_errors"] += 1
+                self._failed[query] = time.time()
+                self._pending.pop(query, None)
+            return []
+        with self._lock:
+            self.stats["fetches"] += 1
+            self._news[query] = (time.time(), items)
+            self._failed.pop(query, None)
+            self._pending.pop(query, None)
+        return items
+
+    def _recently_failed(self, query: str) -> bool:
+        failed_at = self._failed.get(query)
+        return failed_at is not None and time.time() - failed_at <= self.fail_ttl
+
+    def failed(self, query: str) -> bool:
+        """True if the last fetch for `query` failed less than fail_ttl seconds ago."""
+        with self._lock:
+            return self._recently_failed(query)
+
+    def _cached(self, query: str):
+        hit = self._news.get(query)
+        if hit is not None and time.time() - hit[0] <= self.news_ttl:
+            return hit[1]
+        return None
+
+    def submit(self, queries: list, limit: int = NEWS_LIMIT) -> dict:
+        """Start fetching every query not cached, recently failed or already in flight; query -> Future."""
+        futures = {}
+        with self._lock:
+            for q in dict.fromkeys(queries):
+                if self._cached(q) is not None or (q not in self._pending and self._recently_failed(q)):
+                    continue
+                if q not in self._pending:
+                    self._pending[q] = self._pool.submit(self._fetch, q, limit)
+                futures[q] = self._pending[q]
+        return futures
+
+    def news(self, query: str, limit: int = NEWS_LIMIT) -> list:
+        """Headlines for one query (cached for news_ttl seconds).
+
+        Fetched in the calling thread unless a pool worker has already started on it, so it does
+        not wait behind other queued queries.
+        """
+        with self._lock:
+            items = self._cached(query)
+            if items is not None:
+                return items[:limit]
+            queued = self._pending.get(query)
+            if queued is None and self._recently_failed(query):
+                return []
+            here = queued is None or queued.cancel()   # still queued: take it out and fetch it here
+            if here:
+                queued = self._pending[query] = Future()
+        if here:
+            queued.set_result(self._fetch(query, limit))
+        return queued.result()[:limit]
+
+    def news_many(self, queries: list, budget: float = PAGE_BUDGET, limit: int = NEWS_LIMIT) -> dict:
+        """query -> items, or None for queries still being fetched after `budget` seconds or failed
+        (see `failed`).
+
+        Queries are started in the given order, so put the ones shown first at the front.
+        """
+        wait(list(self.submit(queries, limit).values()), timeout=budget)
+        with self._lock:
+            return {q: self._cached(q) for q in dict.fromkeys(queries)}
+
+    # --- boards ---
+    def board(self, companies: dict, budget: float = PAGE_BUDGET) -> pd.DataFrame:
+        """BOARD_COLUMNS for ticker -> company name: mean headline sentiment (NaN while pending).
+
+        Every company's news is requested; those not back within `budget` seconds are pending,
+        those whose fetch failed are labelled UNAVAILABLE.
+        """
+        news = self.news_many(list(dict.fromkeys(companies.values())), budget)
+        titles, owners, counts, failed = [], [], {}, set()
+        for ticker, name in companies.items():
+            items = news.get(name)
+            if items is None:
+                if self.failed(name):
+                    failed.add(ticker)
+                continue
+            counts[ticker] = len(items)
+            for item in items:
+                titles.append(item.get("title") or "")
+                owners.append(ticker)
+        scores = pd.Series(self.score(titles), index=owners, dtype="float64")
+        means = scores.groupby(level=0).mean()
+        board = pd.DataFrame({"Ticker": list(companies)})
+        board["Sentiment"] = board["Ticker"].map(means).round(3)
+        board["Headlines"] = board["Ticker"].map(counts).astype("Int64")
+        board["Label"] = board["Sentiment"].map(sentiment_label)
+        board.loc[board["Headlines"].eq(0).fillna(False).to_numpy(bool), "Label"] = "— No news"
+        board.loc[board["Ticker"].isin(failed).to_numpy(bool), "Label"] = UNAVAILABLE
+        return board[BOARD_COLUMNS]
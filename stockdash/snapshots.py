@@ -0,0 +1,289 @@
+# stockdash/snapshots.py
+"""Precomputed dashboard analytics, refreshed in the background and read by every session.
+
+    scheduler = SnapshotScheduler(store, symbols, sentiment=service)
+    scheduler.start()                        # in-process: one daemon thread per process
+    snap = scheduler.current                 # latest Snapshot (None until the first build)
+    snap.board(30, tickers)                  # movers for a lookback, restricted to a universe
+    snap.correlation(top_tickers)            # clustered correlation sub-matrix
+    snap.sentiment_for(tickers)              # news sentiment per ticker
+    snap.screener_for(tickers)               # latest technical indicators per ticker
+
+    python -m stockdash --every 600          # sidecar: same builds, published to SNAPSHOT_DIR
+    reader = SnapshotReader(SNAPSHOT_DIR)    # app side: reader.current reloads when a new version lands
+
+A build covers the whole symbol universe (every series, stocks and funds), so a session's
+series / kind filter is applied when reading and every session shares one snapshot: movers for
+each of LOOKBACKS from one close matrix, one correlation matrix in cluster order (a top-N
+heatmap is a sub-matrix of it), the latest technical indicators (screener) and news sentiment
+for every ticker. News goes through the sentiment service's rate limit, so a build waits at
+most SENTIMENT_TIMEOUT for it and asks for the top and bottom SHOWN_MOVERS of each board first;
+the rest arrive over later builds. Snapshots are immutable and carry a version number: a
+refresh builds a new one and swaps the reference, readers keep the one they started with.
+Published snapshots are written to `v<version>/` and then made current by
+atomically replacing the CURRENT file, so a reader never sees half a snapshot.
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+
+from .correlation import CorrelationEngine
+from .indicators import HISTORY, PANEL_FIELDS, IndicatorEngine
+from .movers import MOVER_COLUMNS, rank_movers
+from .prices import PriceStore, period_start
+from .sentiment import BOARD_COLUMNS
+from .symbols import load_symbols, universe
+
+# ---------- CONFIG ----------
+SNAPSHOT_MODE = os.environ.get("STOCKDASH_SNAPSHOTS", "inprocess")   # inprocess | sidecar | off
+SNAPSHOT_DIR = os.environ.get("STOCKDASH_SNAPSHOT_DIR", "snapshots")
+REFRESH_EVERY = int(os.environ.get("STOCKDASH_REFRESH_EVERY", "600"))   # seconds between builds
+LOOKBACKS = (7, 14, 30, 90)
+SENTIMENT_TIMEOUT = 120.0   # seconds a build waits for news before publishing what it has
+SHOWN_MOVERS = 10           # gainers and losers per board whose news is fetched first
+KEEP_VERSIONS = 3           # published versions kept on disk
+
+# ---------- SNAPSHOT ----------
+class Snapshot:
+    """One build's results; read-only (accessors return new frames)."""
+    def __init__(self, version: int, created: float, movers: dict, corr: pd.DataFrame,
+                 sentiment: pd.DataFrame = None, as_of=None, timings: dict = None, screener: pd.DataFrame = None):
+        self.version = version
+        self.created = created
+        self.as_of = as_of            # last bar date in the data
+        self.timings = dict(timings or {})
+        self._movers = dict(movers)   # lookback days -> MOVER_COLUMNS over the whole universe, ranked
+        self._corr = corr             # clustered correlation over the whole universe
+        self._position = {t: i for i, t in enumerate(corr.index)}
+        self._sentiment = sentiment   # BOARD_COLUMNS or None
+        self._screener = screener     # IndicatorEngine.latest() over the whole universe, or None
+
+    @property
+    def lookbacks(self) -> list:
+        return sorted(self._movers)
+
+    def age(self) -> float:
+        return time.time() - self.created
+
+    def board(self, days: int, tickers=None) -> pd.DataFrame:
+        """Ranked movers for `days` (one of LOOKBACKS), only `tickers` if given."""
+        board = self._movers[days]
+        if tickers is not None:
+            board = board[board["Ticker"].isin(set(tickers))]
+        return board.reset_index(drop=True)
+
+    def correlation(self, tickers) -> pd.DataFrame:
+        """Correlations among `tickers`, in the snapshot's cluster order."""
+        picked = sorted((self._position[t] for t in set(tickers) if t in self._position))
+        return self._corr.iloc[picked, picked].copy()
+
+    def sentiment_for(self, tickers) -> pd.DataFrame:
+        """BOARD_COLUMNS for `tickers` (empty if sentiment was not built)."""
+        if self._sentiment is None:
+            return pd.DataFrame(columns=BOARD_COLUMNS)
+        return self._sentiment[self._sentiment["Ticker"].isin(set(tickers))].reset_index(drop=True)
+
+    def screener_for(self, tickers) -> pd.DataFrame:
+        """Latest indicators for `tickers` (None if the snapshot has no screener)."""
+        if self._screener is None:
+            return None
+        return self._screener[self._screener["Ticker"].isin(set(tickers))].reset_index(drop=True)
+
+# ---------- BUILDING ----------
+class SnapshotScheduler:
+    """Builds a Snapshot every `every` seconds on a daemon thread; `current` is the latest.
+
+    The price store, correlation and indicator engines and sentiment service live as long as the
+    scheduler, so each build only fetches new bars, adds new returns (O(N^2) per bar) and
+    indicator states (O(N) per bar), and scores new headlines.
+    """
+    def __init__(self, store: PriceStore, symbols: pd.DataFrame, sentiment=None, every: int = REFRESH_EVERY,
+                 lookbacks=LOOKBACKS, publish_dir: str = None):
+        self.store = store
+        self.sentiment = sentiment
+        self.every = every
+        self.lookbacks = tuple(lookbacks)
+        self.publish_dir = publish_dir
+        self.tickers = universe(symbols)
+        self.names = dict(zip(symbols["Ticker"], symbols["Company Name"]))
+        self.engine = CorrelationEngine(self.tickers)
+        self.indicators = IndicatorEngine(self.tickers)
+        self.current = None
+        self.log = []   # build messages and errors, newest last
+        self._version = _published_version(publish_dir) if publish_dir else 0
+        self._built = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._build_lock = threading.Lock()
+
+    def refresh(self) -> Snapshot:
+        """Build and publish one snapshot now."""
+        with self._build_lock:
+            timings = {}
+            t0 = time.perf_counter()
+            log = []
+            start = period_start(f"{max(self.lookbacks)}d")
+            if self.indicators.last_date is None:   # first build: enough history to warm up the indicators
+                start = min(start, period_start(HISTORY))
+            panel = self.store.panel(self.tickers, start, fields=PANEL_FIELDS, log=log)
+            closes = panel["adj_close"]
+            timings["prices"] = time.perf_counter() - t0
+            t = time.perf_counter()
+            movers = {}
+            for days in self.lookbacks:
+                window = closes[closes.index >= pd.Timestamp(period_start(f"{days}d"))]
+                movers[days] = rank_movers(window, self.names)
+            timings["movers"] = time.perf_counter() - t
+            t = time.perf_counter()
+            self.engine.update(closes)
+            corr = self.engine.clustered()
+            timings["correlation"] = time.perf_counter() - t
+            t = time.perf_counter()
+            self.indicators.update(panel)
+            screener = self.indicators.latest()
+            timings["indicators"] = time.perf_counter() - t
+            mood = None
+            if self.sentiment is not None:
+                t = time.perf_counter()
+                shown = [tk for board in movers.values()
+                         for tk in pd.concat([board.head(SHOWN_MOVERS), board.tail(SHOWN_MOVERS)])["Ticker"]]
+                mood = self.sentiment.board({tk: self.names.get(tk, tk) for tk in dict.fromkeys(shown + self.tickers)},
+                                            budget=min(SENTIMENT_TIMEOUT, self.every))
+                timings["sentiment"] = time.perf_counter() - t
+            timings["total"] = time.perf_counter() - t0
+            self._version += 1
+            snap = Snapshot(self._version, time.time(), movers, corr, mood,
+                            as_of=closes.index.max() if len(closes) else None, timings=timings, screener=screener)
+            if self.publish_dir:
+                publish(snap, self.publish_dir)
+            self.current = snap
+            self._built.set()
+            self.log = (self.log + log + [f"Snapshot v{snap.version}: {len(self.tickers)} tickers in "
+                                          f"{timings['total']:.2f}s"])[-50:]
+            return snap
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:   # keep serving the previous snapshot
+                self.log = (self.log + [f"Snapshot build failed: {type(e).__name__}: {e}"])[-50:]
+            self._stop.wait(self.every)
+
+    def start(self):
+        """Start the background thread (idempotent)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="stockdash-snapshots", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def wait(self, timeout: float = None) -> Snapshot:
+        """The current snapshot, waiting up to `timeout` seconds for the first build (None if not ready)."""
+        self._built.wait(timeout)
+        return self.current
+
+# ---------- PUBLISHING ----------
+def _published_version(directory: str) -> int:
+    try:
+        with open(os.path.join(directory, "CURRENT"), encoding="utf-8") as fh:
+            return int(fh.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+def publish(snap: Snapshot, directory: str = SNAPSHOT_DIR):
+    """Write `snap` to `directory/v<version>/`, then point CURRENT at it; older versions beyond
+    KEEP_VERSIONS are removed."""
+    target = os.path.join(directory, f"v{snap.version:06d}")
+    tmp = target + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for days, board in snap._movers.items():
+        board.to_parquet(os.path.join(tmp, f"movers_{days}.parquet"), index=False)
+    snap._corr.to_parquet(os.path.join(tmp, "correlation.parquet"))
+    for name, frame in (("sentiment", snap._sentiment), ("screener", snap._screener)):
+        if frame is not None:
+            frame.to_parquet(os.path.join(tmp, f"{name}.parquet"), index=False)
+    meta = {"version": snap.version, "created": snap.created, "lookbacks": snap.lookbacks,
+            "as_of": None if snap.as_of is None else pd.Timestamp(snap.as_of).isoformat(), "timings": snap.timings}
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    pointer = os.path.join(directory, "CURRENT.tmp")
+    with open(pointer, "w", encoding="utf-8") as fh:
+        fh.write(str(snap.version))
+    os.replace(pointer, os.path.join(directory, "CURRENT"))
+    versions = sorted(n for n in os.listdir(directory) if n.startswith("v") and not n.endswith(".tmp"))
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+
+def load(directory: str = SNAPSHOT_DIR, version: int = None) -> Snapshot:
+    """A published snapshot (default: the current one), or None if nothing is published."""
+    version = version or _published_version(directory)
+    if not version:
+        return None
+    path = os.path.join(directory, f"v{version:06d}")
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+        meta = json.load(fh)
+    movers = {d: pd.read_parquet(os.path.join(path, f"movers_{d}.parquet"))[MOVER_COLUMNS] for d in meta["lookbacks"]}
+    optional = {}
+    for name in ("sentiment", "screener"):
+        file = os.path.join(path, f"{name}.parquet")
+        optional[name] = pd.read_parquet(file) if os.path.exists(file) else None
+    return Snapshot(meta["version"], meta["created"], movers, pd.read_parquet(os.path.join(path, "correlation.parquet")),
+                    optional["sentiment"], as_of=meta["as_of"] and pd.Timestamp(meta["as_of"]), timings=meta["timings"],
+                    screener=optional["screener"])
+
+class SnapshotReader:
+    """The current published snapshot of a sidecar; reloaded only when CURRENT changes."""
+    def __init__(self, directory: str = SNAPSHOT_DIR):
+        self.directory = directory
+        self._snap = None
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Snapshot:
+        version = _published_version(self.directory)
+        with self._lock:
+            if version and (self._snap is None or self._snap.version != version):
+                try:
+                    self._snap = load(self.directory, version)
+                except FileNotFoundError:   # pruned while we looked: keep the one we have
+                    pass
+            return self._snap
+
+# ---------- SIDECAR ----------
+def main(argv: list = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m stockdash", description="Build dashboard snapshots on a cadence.")
+    ap.add_argument("--dir", default=SNAPSHOT_DIR, help=f"publish directory (default: {SNAPSHOT_DIR})")
+    ap.add_argument("--every", type=int, default=REFRESH_EVERY, help="seconds between builds")
+    ap.add_argument("--symbols", default=None, help="symbol master CSV (default: STOCKDASH_SYMBOLS)")
+    ap.add_argument("--no-sentiment", action="store_true", help="skip news sentiment")
+    ap.add_argument("--once", action="store_true", help="build one snapshot and exit")
+    args = ap.parse_args(argv)
+
+    from .sentiment import SentimentService
+    symbols = load_symbols(args.symbols) if args.symbols else load_symbols()
+    scheduler = SnapshotScheduler(PriceStore(), symbols, None if args.no_sentiment else SentimentService(),
+                                  every=args.every, publish_dir=args.dir)
+    while True:
+        t0 = time.monotonic()
+        try:
+            snap = scheduler.refresh()
+            print(f"v{snap.version}: " + ", ".join(f"{k} {v:.2f}s" for k, v in snap.timings.items()), flush=True)
+        except Exception as e:
+            print(f"Snapshot build failed: {type(e).__name__}: {e}", flush=True)
+            if args.once:
+                return 1
+        if args.once:
+            return 0
+        time.sleep(max(0.0, args.every - (time.monotonic() - t0)))
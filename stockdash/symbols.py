@@ -0,0 +1,164 @@
+# stockdash/symbols.py
+"""NSE symbol master: loading, and a ranked search index over symbol, company name and ISIN.
+
+The index is built once per symbol file and answers each query without scanning the table:
+  prefix index   every key (symbol, ISIN, full name, each word of the name) sorted once, so all
+                 keys starting with the query are one contiguous range found by binary search
+                 (a trie flattened into a sorted array)
+  trigram index  character 3-gram -> row ids, for typo-tolerant matches ("relaince", "hdfc bnk"):
+                 a row qualifies when it has MIN_COVERAGE of the query's trigrams
+Matches are ranked by kind (exact symbol, exact ISIN, symbol prefix, name prefix, word prefix,
+fuzzy), then by trigram similarity (mean of query coverage and Dice), then by series (EQ first). A series filter is applied
+before ranking.
+"""
+import bisect
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# ---------- CONFIG ----------
+SYMBOLS_PATH = os.environ.get("STOCKDASH_SYMBOLS", "nse_stocks.csv")
+TICKER_SUFFIX = ".NS"   # Yahoo Finance suffix for NSE listings
+SERIES_PRIORITY = ["EQ", "BE", "BZ", "SM", "ST"]   # ties go to the normal equity segment first
+MIN_COVERAGE = 0.5      # fuzzy-only matches need at least this share of the query's trigrams
+FUND_SERIES = {"MF"}    # mutual fund units; ETFs trade as EQ but carry a fund ISIN
+FUND_ISIN_PREFIX = "INF"
+_NGRAM = 3
+_NON_ALNUM_RE = re.compile(r"[^0-9A-Z&]+")
+_KIND_WEIGHTS = {   # (key kind, exact) -> rank weight; similarity (0..1) is added on top
+    ("symbol", True): 7.0, ("isin", True): 6.0, ("name", True): 5.0, ("symbol", False): 4.0,
+    ("name", False): 3.0, ("word", True): 2.5, ("word", False): 2.0, ("isin", False): 1.5,
+}
+_KINDS = ["symbol", "isin", "name", "word"]
+_MATCH_NAMES = {7.0: "symbol", 6.0: "isin", 5.0: "name", 4.0: "symbol prefix", 3.0: "name prefix",
+                2.5: "word", 2.0: "word prefix", 1.5: "isin prefix", 0.0: "fuzzy"}
+
+# ---------- LOADING ----------
+def load_symbols(path: str = SYMBOLS_PATH) -> pd.DataFrame:
+    """The symbol master as Ticker, Symbol, SERIES, ISIN, Company Name (padding stripped)."""
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    df.columns = df.columns.str.strip()
+    for col in ("Symbol", "SERIES", "ISIN", "Company Name"):
+        df[col] = df[col].astype(str).str.strip() if col in df.columns else ""
+    df["Ticker"] = df["Symbol"] + TICKER_SUFFIX
+    return df[["Ticker", "Symbol", "SERIES", "ISIN", "Company Name"]]
+
+def is_fund(symbols: pd.DataFrame) -> pd.Series:
+    """True for mutual fund and ETF rows: MF series or a fund ISIN (INF...)."""
+    return symbols["SERIES"].isin(FUND_SERIES) | symbols["ISIN"].str.startswith(FUND_ISIN_PREFIX)
+
+def universe(symbols: pd.DataFrame, series=None, kind: str = None) -> list:
+    """Tickers (each once, file order) in `series` (None: every series) of one `kind`: "stock",
+    "fund" (MF / ETF) or None for both. Applied before any price is fetched."""
+    keep = pd.Series(True, index=symbols.index)
+    if series:
+        keep &= symbols["SERIES"].isin([series] if isinstance(series, str) else list(series))
+    if kind is not None:
+        if kind not in ("stock", "fund"):
+            raise ValueError(f"kind must be 'stock', 'fund' or None, got {kind!r}")
+        keep &= is_fund(symbols) == (kind == "fund")
+    return list(dict.fromkeys(symbols.loc[keep, "Ticker"]))
+
+def normalize(text: str) -> str:
+    """Upper case, runs of punctuation and spaces collapsed to one space ("Tata-Motors ltd." -> "TATA MOTORS LTD")."""
+    return _NON_ALNUM_RE.sub(" ", str(text).upper()).strip()
+
+def _grams(text: str) -> set:
+    padded = f" {text} "
+    return {padded[i:i + _NGRAM] for i in range(len(padded) - _NGRAM + 1)}
+
+# ---------- INDEX ----------
+class SymbolIndex:
+    """Prefix and trigram index over a load_symbols() frame; `search` returns ranked rows."""
+    def __init__(self, symbols: pd.DataFrame):
+        self.frame = symbols.reset_index(drop=True)
+        n = len(self.frame)
+        entries = []
+        grams = {}
+        self._gram_counts = np.zeros(n, dtype="int32")
+        for row, (sym, isin, name) in enumerate(zip(self.frame["Symbol"], self.frame["ISIN"],
+                                                   self.frame["Company Name"])):
+            sym, isin, name = normalize(sym), normalize(isin), normalize(name)
+            entries += [(sym, row, 0), (isin, row, 1), (name, row, 2)]
+            entries += [(word, row, 3) for word in set(name.split()) if word != name]
+            row_grams = _grams(sym) | _grams(name)
+            self._gram_counts[row] = len(row_grams)
+            for g in row_grams:
+                grams.setdefault(g, []).append(row)
+        entries = sorted(e for e in entries if e[0])
+        self._keys = [e[0] for e in entries]
+        self._key_array = np.array(self._keys, dtype=object)
+        self._rows = np.array([e[1] for e in entries], dtype="int64")
+        kinds = [_KINDS[e[2]] for e in entries]
+        self._exact_weight = np.array([_KIND_WEIGHTS[(k, True)] for k in kinds])
+        self._prefix_weight = np.array([_KIND_WEIGHTS[(k, False)] for k in kinds])
+        self._postings = {g: np.array(rows, dtype="int64") for g, rows in grams.items()}
+        order = {s: i for i, s in enumerate(SERIES_PRIORITY)}
+        self._series_rank = self.frame["SERIES"].map(order).fillna(len(order)).to_numpy()
+        self._series = self.frame["SERIES"].to_numpy()
+        self._columns = {c: self.frame[c].to_numpy() for c in self.frame.columns}   # results built from these
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def series(self) -> list:
+        """Series present in the master, in SERIES_PRIORITY order then alphabetical."""
+        present = set(self._series)
+        return [s for s in SERIES_PRIORITY if s in present] + sorted(present - set(SERIES_PRIORITY))
+
+    def _prefix_matches(self, q: str) -> tuple:
+        """(rows, weight) for rows with a key starting with `q`; each row's best exact/prefix weight."""
+        lo = bisect.bisect_left(self._keys, q)
+        hi = bisect.bisect_left(self._keys, q + "\uffff", lo)
+        rows = self._rows[lo:hi]
+        w = np.where(self._key_array[lo:hi] == q, self._exact_weight[lo:hi], self._prefix_weight[lo:hi])
+        order = np.lexsort((w, rows))
+        rows, w = rows[order], w[order]
+        last = np.append(rows[1:] != rows[:-1], True) if len(rows) else np.zeros(0, dtype=bool)
+        return rows[last], w[last]
+
+    def _gram_matches(self, q: str) -> tuple:
+        """(rows, coverage, similarity) for rows sharing a trigram with `q`: the share of the
+        query's trigrams found in the row's symbol and name, and the mean of that and their Dice
+        coefficient."""
+        q_grams = _grams(q)
+        postings = [self._postings[g] for g in q_grams if g in self._postings]
+        if not postings:
+            return np.zeros(0, dtype="int64"), np.zeros(0), np.zeros(0)
+        rows, hits = np.unique(np.concatenate(postings), return_counts=True)
+        coverage = hits / len(q_grams)
+        return rows, coverage, (coverage + 2.0 * hits / (len(q_grams) + self._gram_counts[rows])) / 2
+
+    def search(self, query: str, limit: int = 10, series=None) -> pd.DataFrame:
+        """Up to `limit` rows matching `query`, best first, with `score` and `match` columns.
+
+        `series` (a name or list of names, e.g. ["EQ"]) keeps only those series. The work
+        depends on the number of candidate rows, not the size of the master.
+        """
+        q = normalize(query)
+        if not q:
+            return pd.DataFrame(columns=[*self._columns, "score", "match"])
+        prefix_rows, prefix_w = self._prefix_matches(q)
+        gram_rows, coverage, gram_sim = self._gram_matches(q)
+        rows = np.union1d(prefix_rows, gram_rows[coverage >= MIN_COVERAGE])
+        weights = np.zeros(len(rows))
+        weights[np.searchsorted(rows, prefix_rows)] = prefix_w
+        sim = np.zeros(len(rows))
+        found = np.isin(gram_rows, rows)
+        sim[np.searchsorted(rows, gram_rows[found])] = gram_sim[found]
+        if series:
+            keep = np.isin(self._series[rows], [series] if isinstance(series, str) else list(series))
+            rows, weights, sim = rows[keep], weights[keep], sim[keep]
+        score = weights + sim
+        order = np.lexsort((rows, self._series_rank[rows], -score))[:limit]
+        picked = rows[order]
+        return pd.DataFrame({**{c: values[picked] for c, values in self._columns.items()},
+                             "score": np.round(score[order], 3),
+                             "match": [_MATCH_NAMES[w] for w in weights[order]]})
+
+    def best(self, query: str, series=None):
+        """The top-ranked row (a Series) or None."""
+        found = self.search(query, limit=1, series=series)
+        return None if found.empty else found.iloc[0]
@@ -0,0 +1,17 @@
+# tests/test_dates.py
+import pandas as pd
+
+from autoclean.dates import infer_date_format, parse_date_column
+
+def test_mixed_formats_parse_element_wise():
+    s = pd.Series(["2021-01-05", "01/06/2021", "Jan 7, 2021", "8 Jan 2021", "20210109", None, "unknown"])
+    assert infer_date_format(s) is None
+    expected = [pd.Timestamp(f"2021-01-0{d}") for d in range(5, 10)] + [pd.NaT, pd.NaT]
+    assert parse_date_column(s).tolist() == expected
+
+def test_values_the_format_rejects_are_reparsed():
+    s = pd.Series(["2021-01-05"] * 6 + ["20210108", "2021/01/09", "n/a"])
+    assert infer_date_format(s) == "%Y-%m-%d"
+    out = parse_date_column(s)
+    assert out.iloc[6] == pd.Timestamp("2021-01-08") and out.iloc[7] == pd.Timestamp("2021-01-09")
+    assert out.isna().tolist() == [False] * 8 + [True]
@@ -0,0 +1,16 @@
+# tests/test_indicators.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockdash.indicators import smooth
+
+@pytest.mark.parametrize("alpha, min_periods", [(2 / 21, 20), (1 / 14, 14), (0.5, 1)])
+def test_smooth_matches_pandas_ewm(alpha, min_periods):
+    rng = np.random.default_rng(0)
+    x = rng.normal(100, 5, (300, 6))
+    x[rng.random(x.shape) < 0.2] = np.nan   # missing bars
+    x[:15, 2] = np.nan                      # a late listing
+    x[:, 5] = np.nan                        # never traded
+    expected = pd.DataFrame(x).ewm(alpha=alpha, adjust=False, ignore_na=True, min_periods=min_periods).mean()
+    np.testing.assert_allclose(smooth(x, alpha, min_periods), expected.to_numpy(), rtol=0, atol=1e-9)
@@ -0,0 +1,38 @@
+# tests/test_prices.py
+import threading
+from datetime import date
+
+import pandas as pd
+
+from stockdash.prices import FixtureSource, PriceStore, SyntheticSource
+
+START, END = date(2024, 1, 1), date(2024, 1, 31)
+
+def _fixture() -> FixtureSource:
+    return FixtureSource(SyntheticSource().fetch(["AAA.NS"], START, END))
+
+def test_closes_without_bars_is_empty(tmp_path):
+    store = PriceStore(str(tmp_path / "prices.sqlite"), _fixture())
+    for tickers in (["ZZZ.NS"], []):
+        closes = store.closes(tickers, START, END)
+        assert closes.empty and isinstance(closes.index, pd.DatetimeIndex)
+        assert list(closes.columns) == []
+    panel = store.panel(["ZZZ.NS"], START, END)
+    assert all(frame.empty for frame in panel.values())
+    assert all((frame.dtypes == "float64").all() for frame in panel.values())
+
+def test_closes_keep_tickers_with_bars(tmp_path):
+    store = PriceStore(str(tmp_path / "prices.sqlite"), _fixture())
+    closes = store.closes(["ZZZ.NS", "AAA.NS"], START, END)
+    assert list(closes.columns) == ["AAA.NS"]
+    assert len(closes) == len(pd.bdate_range(START, END))
+
+def test_concurrent_reads_fetch_a_gap_once(tmp_path):
+    source = _fixture()
+    store = PriceStore(str(tmp_path / "prices.sqlite"), source)
+    threads = [threading.Thread(target=store.closes, args=(["AAA.NS"], START, END)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert source.calls == 1
@@ -1,76 +1,116 @@
 import streamlit as st
 import pandas as pd
-import yfinance as yf
 import plotly.express as px
-import seaborn as sns
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from GoogleNews import GoogleNews
+
+from stockdash.backtest import backtest, momentum, sweep
+from stockdash.correlation import CORR_WINDOW, CorrelationEngine
+from stockdash.indicators import HISTORY, PANEL_FIELDS, compute, screen
+from stockdash.movers import rank_movers
+from stockdash.prices import PriceStore, period_start
+from stockdash.sentiment import UNAVAILABLE, SentimentService, sentiment_label
+from stockdash.snapshots import SNAPSHOT_DIR, SNAPSHOT_MODE, SnapshotReader, SnapshotScheduler
+from stockdash.symbols import SERIES_PRIORITY, SymbolIndex, load_symbols, universe
 
 st.set_page_config(page_title="Indian Stock Insights", layout="wide")
 
 # ----------------- LOAD NSE DATA -----------------
-@st.cache_data
+@st.cache_resource
 def load_nse_symbols():
-    df = pd.read_csv("nse_stocks.csv")
-    df.columns = df.columns.str.strip()
-    df['Ticker'] = df['Symbol'].astype(str).str.strip() + ".NS"
-    df['Company Name'] = df['Company Name'].astype(str).str.strip()
-    return df[['Ticker', 'Company Name']]
-
-nse_df = load_nse_symbols()
-ticker_list = nse_df['Ticker'].tolist()
+    """Symbol master plus its search index, built once per process and shared by every session."""
+    return SymbolIndex(load_symbols("nse_stocks.csv"))
+
+symbol_index = load_nse_symbols()
+nse_df = symbol_index.frame
 ticker_map = dict(zip(nse_df['Ticker'], nse_df['Company Name']))
 
 # ----------------- PRICE FETCHING -----------------
-@st.cache_data(ttl=60*10)
+@st.cache_resource
+def price_store():
+    """On-disk bar store shared by every session; the source comes from STOCKDASH_PRICE_SOURCE."""
+    return PriceStore()
+
 def get_prices(tickers, period="1mo"):
-    data = yf.download(tickers, period=period, interval="1d", group_by="ticker", progress=False)
-    prices = {}
-    for t in tickers:
-        try:
-            if isinstance(data.columns, pd.MultiIndex):
-                df = data[t].dropna()
-            else:
-                df = data
-            prices[t] = df
-        except KeyError:
-            continue
-    return prices
-
-def calc_returns(df):
-    col = 'Adj Close' if 'Adj Close' in df.columns else 'Close'
-    return df[col].pct_change().dropna()
+    """ticker -> daily OHLCV frame for `period`; only bars not stored yet are downloaded."""
+    return price_store().frames(tickers, period_start(period))
+
+@st.cache_resource(max_entries=8)
+def correlation_engine(tickers):
+    """One engine per ticker set, shared by sessions; later runs only feed it new bars."""
+    return CorrelationEngine(list(tickers))
 
 # ----------------- MOVERS -----------------
-def get_top_movers(days=30):
-    data = get_prices(ticker_list[:100], period=f"{days}d")  # limit to first 100 to keep fast
-    movers = []
-    for t, df in data.items():
-        if df.empty: continue
-        col = 'Adj Close' if 'Adj Close' in df.columns else 'Close'
-        start, end = df[col].iloc[0], df[col].iloc[-1]
-        change = (end - start) / start * 100
-        movers.append([t, ticker_map.get(t, ""), end, round(change, 2)])
-    df = pd.DataFrame(movers, columns=["Ticker", "Company", "Last Price", "% Change"])
-    return df.sort_values("% Change", ascending=False)
+UNIVERSE_KINDS = {"Stocks, funds & ETFs": None, "Stocks": "stock", "Funds & ETFs": "fund"}
+
+@st.cache_data(ttl=60*10, show_spinner=False)
+def get_top_movers(days=30, series=(), kind=None):
+    """Every ticker in the chosen series / kind, ranked by % change over `days`."""
+    tickers = universe(nse_df, list(series), kind)   # filtered before anything is fetched
+    closes = price_store().closes(tickers, period_start(f"{days}d"))
+    return rank_movers(closes, ticker_map)
+
+# ----------------- INDICATORS -----------------
+@st.cache_data(ttl=60*10, show_spinner=False)
+def get_screener(series=(), kind=None):
+    """Latest indicators for every ticker in the chosen series / kind (when no snapshot is ready)."""
+    tickers = universe(nse_df, list(series), kind)
+    return screen(price_store().panel(tickers, period_start(HISTORY), fields=PANEL_FIELDS))
+
+def get_indicators(ticker):
+    """Indicator series for one ticker over HISTORY, as one dates x indicators frame."""
+    panel = price_store().panel([ticker], period_start(HISTORY), fields=PANEL_FIELDS)
+    series = compute(panel)
+    frame = pd.DataFrame({name: values[ticker] for name, values in series.items()})
+    frame.insert(0, "close", panel["adj_close"][ticker])
+    return frame
+
+# ----------------- BACKTESTS -----------------
+REBALANCE_RULES = {"Weekly": "W", "Monthly": "M", "Quarterly": "Q"}
+
+@st.cache_data(ttl=60*60, show_spinner=False)
+def run_backtests(series=(), kind=None, period="3y", lookbacks=(), top_ns=(), rebalance="M", cost_bps=10.0):
+    """Sweep of "buy the top-N gainers over a lookback" on the chosen universe, plus the best run."""
+    tickers = universe(nse_df, list(series), kind)
+    closes = price_store().closes(tickers, period_start(period))
+    table = sweep(closes, lookbacks, top_ns, rebalance=rebalance, cost_bps=cost_bps)
+    if table.empty:
+        return table, None
+    best = table.iloc[0]
+    result = backtest(closes, momentum(int(best["lookback"])), int(best["top_n"]), rebalance, cost_bps)
+    return table, pd.DataFrame({"Equity": result.equity, "Drawdown": result.drawdown})
 
 # ----------------- NEWS & SENTIMENT -----------------
-@st.cache_data(ttl=60*30)
+@st.cache_resource
+def sentiment_service():
+    """Analyzer, score cache and news fetch pool shared by every session (STOCKDASH_NEWS_SOURCE)."""
+    return SentimentService()
+
 def fetch_news(company, limit=8):
-    googlenews = GoogleNews(period='7d')
-    googlenews.search(company)
-    return googlenews.result()[:limit]
+    return sentiment_service().news(company, limit)
 
 def sentiment_summary(news_list):
-    analyzer = SentimentIntensityAnalyzer()
-    results = []
-    for n in news_list:
-        text = n.get('title') or ''
-        score = analyzer.polarity_scores(text)
-        results.append({"Headline": text, "Sentiment": score['compound']})
-    return pd.DataFrame(results)
+    return sentiment_service().summary(news_list)
+
+def board_sentiment(movers):
+    """News sentiment for every ticker on the board, shown rows first, within the page budget."""
+    shown = list(movers.head(10)['Ticker']) + list(movers.tail(10)['Ticker'])
+    tickers = list(dict.fromkeys(shown + list(movers['Ticker'])))
+    return sentiment_service().board({t: ticker_map.get(t, t) for t in tickers})
+
+# ----------------- SNAPSHOTS -----------------
+@st.cache_resource
+def snapshot_source():
+    """Where precomputed movers / correlations / sentiment come from (STOCKDASH_SNAPSHOTS):
+    one background scheduler per process, a sidecar's published snapshots, or None (off)."""
+    if SNAPSHOT_MODE == "inprocess":
+        return SnapshotScheduler(price_store(), nse_df, sentiment_service()).start()
+    if SNAPSHOT_MODE == "sidecar":
+        return SnapshotReader(SNAPSHOT_DIR)
+    return None
+
+def current_snapshot():
+    """The latest snapshot, or None until the first one is built (pages then compute on demand)."""
+    source = snapshot_source()
+    return source.current if source is not None else None
 
 # ----------------- UI -----------------
 st.title("🇮🇳 Indian Stock Insights Dashboard")
@@ -79,12 +119,43 @@ st.title("🇮🇳 Indian Stock Insights Dashboard")
 st.sidebar.header("Controls")
 lookback = st.sidebar.selectbox("Lookback Period (for Movers)", ["7", "14", "30", "90"], index=2)
 lookback_days = int(lookback)
+movers_news = st.sidebar.checkbox("News sentiment on movers", value=True)
+movers_kind = st.sidebar.selectbox("Movers universe", list(UNIVERSE_KINDS))
+movers_series = st.sidebar.multiselect(
+    "Movers series", symbol_index.series(),
+    default=[s for s in SERIES_PRIORITY if s in symbol_index.series()], help="Empty: every series.")
 
-search = st.sidebar.text_input("🔍 Search company / symbol")
+search = st.sidebar.text_input("🔍 Search company / symbol / ISIN")
+search_series = st.sidebar.multiselect("Series", symbol_index.series(), help="Only search these series (empty: all).")
+matches = symbol_index.search(search, limit=10, series=search_series) if search else None
+if matches is not None and not matches.empty:
+    pick = st.sidebar.selectbox(
+        "Matches", range(len(matches)),
+        format_func=lambda i: f"{matches.at[i, 'Symbol']} · {matches.at[i, 'Company Name']} ({matches.at[i, 'SERIES']})")
 
 # --- Display Movers ---
-with st.spinner("Fetching top gainers & losers..."):
-    movers = get_top_movers(lookback_days)
+snap = current_snapshot()
+if snap is not None and lookback_days in snap.lookbacks:
+    movers = snap.board(lookback_days, universe(nse_df, movers_series, UNIVERSE_KINDS[movers_kind]))
+else:
+    with st.spinner("Fetching top gainers & losers..."):
+        movers = get_top_movers(lookback_days, tuple(movers_series), UNIVERSE_KINDS[movers_kind])
+source_note = (f"snapshot v{snap.version}, built {snap.age() / 60:.0f} min ago" if snap is not None
+               else "computed for this page")
+st.caption(f"{len(movers)} tickers ranked ({movers_kind.lower()}, series: {', '.join(movers_series) or 'all'}; "
+           f"{source_note})")
+if movers_news and not movers.empty:
+    if snap is not None:
+        mood = snap.sentiment_for(movers['Ticker'])
+    else:
+        with st.spinner("Scoring news sentiment..."):
+            mood = board_sentiment(movers)
+    movers = movers.merge(mood[["Ticker", "Sentiment", "Label"]], on="Ticker", how="left")
+    pending = int(mood["Label"].str.startswith("⏳").sum())
+    unavailable = int(mood["Label"].eq(UNAVAILABLE).sum())
+    st.caption(f"News sentiment for {len(mood) - pending - unavailable}/{len(mood)} tickers"
+               + (f"; {pending} still loading, refresh to see them" if pending else "")
+               + (f"; {unavailable} unavailable (news fetch failed)" if unavailable else "") + ".")
 
 col1, col2 = st.columns(2)
 col1.subheader(f"Top 10 Gainers (Last {lookback_days}D)")
@@ -99,59 +170,123 @@ col2.plotly_chart(fig2, use_container_width=True)
 
 # --- Heatmap ---
 st.markdown("### 🔥 Heatmap of Stock Correlations")
-top_n = movers.head(20)['Ticker'].tolist()
-prices = get_prices(top_n, period="1mo")
-returns = pd.DataFrame({t: calc_returns(df) for t, df in prices.items() if not df.empty})
-corr = returns.corr()
+heat_max = min(300, len(movers))
+heat_n = st.slider("Tickers (top movers)", 10, heat_max, min(20, heat_max), step=10) if heat_max > 10 else heat_max
+top_n = tuple(movers.head(heat_n)['Ticker'])
+if snap is not None:
+    corr = snap.correlation(top_n)
+else:
+    engine = correlation_engine(top_n)
+    engine.update(price_store().closes(list(top_n), period_start(f"{engine.window * 2}d")))
+    corr = engine.clustered()
+
+if corr.empty:
+    st.info("No price history for the selected universe.")
+else:
+    fig = px.imshow(corr, color_continuous_scale="RdBu_r", zmin=-1, zmax=1, aspect="auto",
+                    title=f"Correlation of daily returns, last {CORR_WINDOW} bars (clustered)")
+    st.plotly_chart(fig, use_container_width=True)
 
-fig, ax = plt.subplots(figsize=(10, 7))
-sns.heatmap(corr, cmap="coolwarm", ax=ax)
-st.pyplot(fig)
+# --- Screener ---
+st.markdown("### 🧮 Technical Screener")
+screener = (snap.screener_for(universe(nse_df, movers_series, UNIVERSE_KINDS[movers_kind]))
+            if snap is not None else None)
+if screener is None:
+    with st.spinner("Computing indicators..."):
+        screener = get_screener(tuple(movers_series), UNIVERSE_KINDS[movers_kind])
+screener.insert(1, "Company", screener["Ticker"].map(ticker_map))
+f1, f2, f3 = st.columns(3)
+rsi_range = f1.slider("RSI (14)", 0, 100, (0, 100))
+trend = f2.selectbox("Trend", ["Any", "Above SMA 50", "Below SMA 50"])
+macd_filter = f3.selectbox("MACD", ["Any", "Above signal", "Below signal"])
+keep = screener["rsi_14"].between(*rsi_range)
+if rsi_range == (0, 100):
+    keep |= screener["rsi_14"].isna()
+if trend != "Any":
+    keep &= (screener["close"] > screener["sma_50"]) == (trend == "Above SMA 50")
+    keep &= screener["sma_50"].notna()
+if macd_filter != "Any":
+    keep &= (screener["macd_hist"] > 0) == (macd_filter == "Above signal")
+    keep &= screener["macd_hist"].notna()
+screened = screener[keep].sort_values("rsi_14", ascending=False, na_position="last")
+st.caption(f"{len(screened)} of {len(screener)} tickers match")
+st.dataframe(screened.round(2), hide_index=True)
+
+# --- Backtest ---
+with st.expander("🧪 Backtest: buy the top gainers"):
+    b1, b2, b3, b4 = st.columns(4)
+    bt_period = b1.selectbox("History", ["1y", "3y", "5y", "10y"], index=1)
+    bt_rebalance = b2.selectbox("Rebalance", list(REBALANCE_RULES), index=1)
+    bt_lookbacks = b3.multiselect("Lookbacks (trading days)", [5, 10, 20, 60, 120], default=[5, 20, 60])
+    bt_top = b4.multiselect("Top N", [5, 10, 20, 50], default=[5, 10, 20])
+    bt_cost = st.number_input("Cost per trade (bps)", 0.0, 100.0, 10.0, step=5.0)
+    if st.button("Run backtest") and bt_lookbacks and bt_top:
+        with st.spinner("Backtesting..."):
+            bt_table, bt_best = run_backtests(tuple(movers_series), UNIVERSE_KINDS[movers_kind], bt_period,
+                                              tuple(bt_lookbacks), tuple(bt_top), REBALANCE_RULES[bt_rebalance], bt_cost)
+        if bt_best is None:
+            st.info("No price history for the selected universe.")
+        else:
+            st.dataframe(bt_table.round(2), hide_index=True)
+            best = bt_table.iloc[0]
+            fig = px.line(bt_best, x=bt_best.index, y="Equity",
+                          title=f"Best: top {best['top_n']:.0f} by {best['lookback']:.0f}-day change, "
+                                f"{bt_rebalance.lower()} (net of costs)")
+            st.plotly_chart(fig, use_container_width=True)
 
 # --- Company Search ---
 st.markdown("---")
 st.subheader("📈 Company Analysis")
 
 if search:
-    # Find closest ticker
-    match = nse_df[nse_df['Company Name'].str.contains(search, case=False, na=False)]
-    if match.empty:
-        match = nse_df[nse_df['Ticker'].str.contains(search.upper(), na=False)]
-    if match.empty:
+    if matches.empty:
         st.warning("No matching company found.")
     else:
-        selected = match.iloc[0]['Ticker']
+        selected = matches.at[pick, 'Ticker']
         st.success(f"Showing results for **{ticker_map[selected]} ({selected})**")
 
         colA, colB = st.columns(2)
         with colA:
             st.write("Last 30 Days Performance")
-            hist_30 = yf.download(selected, period="1mo", interval="1d")
+            hist_30 = get_prices([selected], period="1mo").get(selected, pd.DataFrame(columns=["Adj Close"]))
             fig = px.line(hist_30, x=hist_30.index, y="Adj Close", title="Last 30 Days")
             st.plotly_chart(fig, use_container_width=True)
         with colB:
             st.write("Last 7 Days Performance")
-            hist_7 = yf.download(selected, period="7d", interval="1d")
+            hist_7 = hist_30[hist_30.index >= pd.Timestamp(period_start("7d"))]   # same history, no second download
             fig = px.line(hist_7, x=hist_7.index, y="Adj Close", title="Last 7 Days")
             st.plotly_chart(fig, use_container_width=True)
 
+        # Technical indicators
+        st.subheader("📐 Technical Indicators")
+        ind = get_indicators(selected)
+        if ind["close"].notna().any():
+            fig = px.line(ind, x=ind.index, y=["close", "sma_20", "sma_50", "bb_upper", "bb_lower"],
+                          title=f"Price, SMA and Bollinger bands ({HISTORY})")
+            st.plotly_chart(fig, use_container_width=True)
+            colC, colD = st.columns(2)
+            fig = px.line(ind, x=ind.index, y="rsi_14", title="RSI (14)", range_y=[0, 100])
+            fig.add_hline(y=70, line_dash="dot")
+            fig.add_hline(y=30, line_dash="dot")
+            colC.plotly_chart(fig, use_container_width=True)
+            fig = px.line(ind, x=ind.index, y=["macd", "macd_signal"], title="MACD (12, 26, 9)")
+            colD.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No price history for indicators.")
+
         # News & sentiment
         st.subheader("📰 Latest News & Sentiment")
         news = fetch_news(ticker_map[selected])
-        if not news:
+        if not news and sentiment_service().failed(ticker_map[selected]):
+            st.warning("⚠️ News is unavailable right now (the news source failed); it is retried shortly.")
+        elif not news:
             st.info("No recent news found.")
         else:
             news_df = sentiment_summary(news)
             st.dataframe(news_df)
 
             avg_sentiment = news_df["Sentiment"].mean()
-            if avg_sentiment > 0.05:
-                sentiment_label = "🟢 Positive"
-            elif avg_sentiment < -0.05:
-                sentiment_label = "🔴 Negative"
-            else:
-                sentiment_label = "🟡 Neutral"
-            st.metric("Overall Sentiment", sentiment_label, f"{avg_sentiment:.2f}")
+            st.metric("Overall Sentiment", sentiment_label(avg_sentiment), f"{avg_sentiment:.2f}")
 
 else:
     st.info("Search a company name or symbol in the sidebar to view insights.")